@@ -0,0 +1,221 @@
+"""Content-addressed response cache for agent invocations.
+
+Responses are keyed by a hash of the agent name, its instructions, the
+deployment, and the exact prompt. A bounded in-memory LRU (with TTL and
+byte-size eviction) sits in front of an optional SQLite tier that several
+processes can share.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_CACHED_AGENTS = ("resume_info_collector", "resume_job_analyzer")
+
+
+def make_cache_key(agent_name: str, instructions: str, deployment: str, prompt: str) -> str:
+    """Return the content hash identifying one agent invocation."""
+    material = json.dumps([agent_name, instructions, deployment, prompt], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Hit/miss counters, overall and per agent."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.by_agent: dict[str, dict[str, int]] = {}
+
+    def record(self, agent_name: str, hit: bool) -> None:
+        """Count one lookup for ``agent_name``."""
+        field = "hits" if hit else "misses"
+        setattr(self, field, getattr(self, field) + 1)
+        counters = self.by_agent.setdefault(agent_name, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def as_dict(self) -> dict:
+        """Return a JSON-serializable snapshot."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "by_agent": {name: dict(counters) for name, counters in self.by_agent.items()},
+        }
+
+
+class SQLiteCacheTier:
+    """On-disk cache tier shared between processes via SQLite (WAL mode)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS agent_cache ("
+            "key TEXT PRIMARY KEY, agent TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """Return ``(value, expires_at)`` for a live entry, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM agent_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM agent_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+
+    def set(self, key: str, agent_name: str, value: str, expires_at: float) -> None:
+        """Insert or replace an entry."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO agent_cache (key, agent, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, agent_name, value, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM agent_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM agent_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """In-memory LRU with TTL and size-based eviction plus optional SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+        disk: Optional[SQLiteCacheTier] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, agent_name: str = "") -> Optional[str]:
+        """Return a cached response (promoting it to most-recent) or ``None``."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.record(agent_name, hit=True)
+                    return value
+                self._discard(key)
+
+        if self.disk is not None:
+            row = self.disk.get(key)
+            if row is not None:
+                value, expires_at = row
+                with self._lock:
+                    self._store(key, value, expires_at)
+                    self.stats.record(agent_name, hit=True)
+                return value
+
+        with self._lock:
+            self.stats.record(agent_name, hit=False)
+        return None
+
+    def set(self, key: str, value: str, agent_name: str = "") -> None:
+        """Cache ``value`` in memory and, if configured, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, agent_name, value, expires_at)
+
+    def delete(self, key: str) -> None:
+        """Remove one entry from memory and, if configured, from disk."""
+        with self._lock:
+            self._discard(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the disk tier is left intact)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, key: str, value: str, expires_at: float) -> None:
+        """Insert an entry and evict least-recently-used ones over budget."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.stats.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        """Remove an entry and release its byte budget."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+def cache_from_env() -> ResponseCache:
+    """Build a response cache from ``AGENT_CACHE_*`` environment settings."""
+    disk = None
+    sqlite_path = os.getenv("AGENT_CACHE_SQLITE_PATH")
+    if sqlite_path:
+        disk = SQLiteCacheTier(sqlite_path)
+    return ResponseCache(
+        max_entries=int(os.getenv("AGENT_CACHE_MAX_ENTRIES", "1024")),
+        max_bytes=int(os.getenv("AGENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        ttl_seconds=float(os.getenv("AGENT_CACHE_TTL_SECONDS", "3600")),
+        disk=disk,
+    )
+
+
+def cached_agents_from_env() -> set[str]:
+    """Return agent names opted in to caching via ``AGENT_CACHE_AGENTS``."""
+    raw = os.getenv("AGENT_CACHE_AGENTS")
+    if raw is None:
+        return set(DEFAULT_CACHED_AGENTS)
+    return {name.strip() for name in raw.split(",") if name.strip()}
@@ -1,16 +1,37 @@
 """Shared helpers for Agent Framework client, agent, and workflow execution."""
 
 import os
+import json
 import asyncio
-from typing import Any, Optional
+import atexit
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Coroutine, Iterator, Optional, TypeVar
 
 from dotenv import load_dotenv
 from azure.identity import AzureCliCredential
 from agent_framework.azure import AzureOpenAIChatClient
 
+from agent_cache import ResponseCache, cache_from_env, cached_agents_from_env, make_cache_key
+from agent_metrics import AGENT_CALLS_IN_FLIGHT, AGENT_ERRORS, STAGE_LATENCY, STAGES_IN_FLIGHT, record_agent_call
+from agent_scheduler import current_lane, estimate_tokens, get_scheduler
+from agent_tracing import add_span_event, trace_span
+
 load_dotenv()
 
+T = TypeVar("T")
+
 _client: Optional[AzureOpenAIChatClient] = None
+_loop_runner: Optional["LoopRunner"] = None
+_loop_runner_lock = threading.Lock()
+_response_cache: Optional[ResponseCache] = None
+# Instructions and cache opt-in per agent name, recorded by create_agent.
+_agent_specs: dict[str, dict[str, Any]] = {}
+# Receives stage and token events for the current run (set by streaming callers).
+_event_sink: ContextVar[Optional[Callable[[dict[str, Any]], None]]] = ContextVar("event_sink", default=None)
 
 
 def _build_client() -> AzureOpenAIChatClient:
@@ -37,43 +58,381 @@ def _build_client() -> AzureOpenAIChatClient:
     return AzureOpenAIChatClient(credential=AzureCliCredential(), **kwargs)
 
 
+def get_data_dir() -> Path:
+    """Return (and create) the directory for local stores such as SQLite files."""
+    default = Path(__file__).resolve().parent / ".agent_data"
+    data_dir = Path(os.getenv("AGENT_DATA_DIR") or default)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
 def get_client() -> AzureOpenAIChatClient:
-    """Return a cached Azure OpenAI chat client instance."""
+    """Return the cached chat client.
+
+    ``AGENT_CLIENT=fake`` selects the offline :class:`fake_chat_client.FakeChatClient`
+    (canned outputs, simulated latency) instead of Azure OpenAI.
+    """
     global _client
     if _client is None:
-        _client = _build_client()
+        if os.getenv("AGENT_CLIENT", "azure").lower() == "fake":
+            from fake_chat_client import FakeChatClient
+
+            _client = FakeChatClient.from_env()
+        else:
+            _client = _build_client()
     return _client
 
 
-def create_agent(*, name: str, instructions: str, tools=None):
-    """Create an agent bound to the shared chat client."""
+def set_client(client) -> None:
+    """Use ``client`` (anything with ``as_agent``) for agents created from now on."""
+    global _client
+    _client = client
+
+
+def create_agent(
+    *,
+    name: str,
+    instructions: str,
+    tools=None,
+    cache: Optional[bool] = None,
+    response_format: Optional[dict[str, Any]] = None,
+):
+    """Create an agent bound to the shared chat client.
+
+    ``cache`` opts the agent in or out of response caching; when omitted,
+    the ``AGENT_CACHE_AGENTS`` list decides (tool-using agents never cache).
+    ``response_format`` (an OpenAI ``json_schema`` response format) constrains
+    every response to a schema and keys the cache along with the instructions.
+    """
+    if cache is None:
+        cache = tools is None and name in cached_agents_from_env()
+    spec_instructions = instructions
+    if response_format is not None:
+        spec_instructions += "\n" + json.dumps(response_format, sort_keys=True)
+    _agent_specs[name] = {"instructions": spec_instructions, "cache": bool(cache)}
     client = get_client()
-    return client.as_agent(name=name, instructions=instructions, tools=tools)
+    if response_format is None:
+        return client.as_agent(name=name, instructions=instructions, tools=tools)
+    return client.as_agent(
+        name=name, instructions=instructions, tools=tools, default_options={"response_format": response_format}
+    )
 
 
-def run_agent_sync(agent, prompt: str, **kwargs) -> str:
-    """Run an async agent call synchronously in non-async contexts."""
-    async def _run() -> str:
-        response = await agent.run(prompt, **kwargs)
-        return response.text if hasattr(response, "text") else str(response)
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or ``None`` when disabled."""
+    global _response_cache
+    if os.getenv("AGENT_CACHE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    if _response_cache is None:
+        _response_cache = cache_from_env()
+    return _response_cache
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """Return hit/miss counters for the shared response cache."""
+    cache = get_response_cache()
+    return cache.stats.as_dict() if cache is not None else {}
+
+
+def _cache_key_for(agent, prompt: str) -> Optional[str]:
+    """Return the cache key for an opted-in agent, or ``None``."""
+    name = getattr(agent, "name", None)
+    spec = _agent_specs.get(name or "")
+    if not spec or not spec["cache"]:
+        return None
+    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "")
+    return make_cache_key(name, spec["instructions"], deployment, prompt)
 
+
+@contextmanager
+def use_event_sink(sink: Callable[[dict[str, Any]], None]) -> Iterator[None]:
+    """Route stage/token events raised in this context to ``sink``."""
+    token = _event_sink.set(sink)
     try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        return asyncio.run(_run())
-    raise RuntimeError("run_agent_sync cannot be called from a running event loop.")
+        yield
+    finally:
+        _event_sink.reset(token)
+
+
+@contextmanager
+def tag_events(**fields: Any) -> Iterator[None]:
+    """Add ``fields`` to every event raised in this context (no-op without a sink)."""
+    sink = _event_sink.get()
+    if sink is None:
+        yield
+        return
+    with use_event_sink(lambda event: sink({**event, **fields})):
+        yield
+
 
+def current_event_sink() -> Optional[Callable[[dict[str, Any]], None]]:
+    """Return the sink events raised in this context go to, if any."""
+    return _event_sink.get()
 
-def run_workflow_sync(workflow, prompt: str):
-    """Run an async workflow synchronously in non-async contexts."""
-    async def _run():
-        result = await workflow.run(prompt)
-        if hasattr(result, "get_outputs"):
-            return result.get_outputs()
-        return result
 
+def emit_event(event: dict[str, Any]) -> None:
+    """Send an event to the active sink, if any."""
+    sink = _event_sink.get()
+    if sink is not None:
+        sink(event)
+
+
+@asynccontextmanager
+async def observe_stage(name: str) -> AsyncIterator[None]:
+    """Emit ``stage_start``/``stage_end`` events, a trace span, and latency metrics around a stage."""
+    emit_event({"event": "stage_start", "stage": name})
+    STAGES_IN_FLIGHT.inc(stage=name)
+    started = time.perf_counter()
+    error: Optional[str] = None
     try:
-        asyncio.get_running_loop()
-    except RuntimeError:
-        return asyncio.run(_run())
-    raise RuntimeError("run_workflow_sync cannot be called from a running event loop.")
+        with trace_span(f"stage:{name}", stage=name):
+            yield
+    except Exception as exc:
+        error = str(exc)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGES_IN_FLIGHT.dec(stage=name)
+        STAGE_LATENCY.observe(elapsed, stage=name, outcome="error" if error is not None else "ok")
+        duration_ms = round(elapsed * 1000, 1)
+        event = {"event": "stage_end", "stage": name, "duration_ms": duration_ms}
+        if error is not None:
+            event["error"] = error
+        emit_event(event)
+
+
+async def _stream_agent(agent, prompt: str, sink: Callable[[dict[str, Any]], None], **kwargs) -> str:
+    """Run an agent with the streaming API, forwarding each text delta to ``sink``."""
+    name = getattr(agent, "name", None) or ""
+    run_stream = getattr(agent, "run_stream", None)
+    if run_stream is not None:
+        updates = run_stream(prompt, **kwargs)
+    else:
+        updates = agent.run(prompt, stream=True, **kwargs)
+    parts: list[str] = []
+    async for update in updates:
+        delta = getattr(update, "text", None)
+        if delta:
+            parts.append(delta)
+            sink({"event": "token", "agent": name, "text": delta})
+    return "".join(parts)
+
+
+def _usage_tokens(response) -> Optional[tuple[int, int]]:
+    """Return ``(input_tokens, output_tokens)`` reported by a response, if any."""
+    usage = getattr(response, "usage_details", None)
+    if usage is None:
+        return None
+    input_tokens = getattr(usage, "input_token_count", None)
+    output_tokens = getattr(usage, "output_token_count", None)
+    if input_tokens is None and output_tokens is None:
+        return None
+    return int(input_tokens or 0), int(output_tokens or 0)
+
+
+async def _invoke(agent, prompt: str, sink, **kwargs) -> tuple[str, tuple[int, int]]:
+    """Call the agent once and return its text with (input, output) token counts."""
+    if sink is not None:
+        text = await _stream_agent(agent, prompt, sink, **kwargs)
+        usage = None
+    else:
+        response = await agent.run(prompt, **kwargs)
+        text = response.text if hasattr(response, "text") else str(response)
+        usage = _usage_tokens(response)
+    if usage is None:
+        instructions = _agent_specs.get(getattr(agent, "name", None) or "", {}).get("instructions", "")
+        usage = (estimate_tokens(instructions + prompt), estimate_tokens(text))
+    return text, usage
+
+
+async def run_agent(
+    agent,
+    prompt: str,
+    *,
+    stream_tokens: bool = False,
+    validate: Optional[Callable[[str], bool]] = None,
+    **kwargs,
+) -> str:
+    """Run an agent on the current event loop and return its text output.
+
+    Calls without extra run options are served from the response cache
+    when the agent has opted in. Other calls are admitted by the
+    deployment's scheduler (rate limits, lane priority, retries). With
+    ``stream_tokens`` and an active event sink, text deltas are forwarded
+    as ``token`` events while generating; if a retry follows streamed
+    tokens, a ``token_reset`` event tells the consumer to discard that
+    agent's text so far. With ``validate``, only text it
+    accepts is cached, and a cached entry it rejects is evicted and rerun.
+    """
+    sink = _event_sink.get() if stream_tokens else None
+    name = getattr(agent, "name", None) or ""
+    with trace_span(f"agent:{name}", agent=name) as span:
+        cache = get_response_cache()
+        key = _cache_key_for(agent, prompt) if cache is not None and not kwargs else None
+        if key is not None:
+            cached = cache.get(key, name)
+            if cached is not None and validate is not None and not validate(cached):
+                cache.delete(key)
+                cached = None
+            if cached is not None:
+                if span is not None:
+                    span.set(cached=True)
+                if sink is not None:
+                    sink({"event": "token", "agent": name, "text": cached})
+                return cached
+
+        scheduler = get_scheduler(os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", ""))
+        instructions = _agent_specs.get(name, {}).get("instructions", "")
+        completion_estimate = int(os.getenv("AGENT_COMPLETION_TOKENS_ESTIMATE", "1000"))
+        estimated = estimate_tokens(instructions + prompt) + completion_estimate
+
+        streamed = 0
+
+        def _forward(event: dict[str, Any]) -> None:
+            nonlocal streamed
+            streamed += 1
+            sink(event)
+
+        def _on_retry(attempt: int, delay: float, exc: BaseException) -> None:
+            nonlocal streamed
+            add_span_event("retry", attempt=attempt, delay_s=round(delay, 3), error=str(exc))
+            emit_event(
+                {"event": "retry", "agent": name, "attempt": attempt, "delay_s": round(delay, 3), "error": str(exc)}
+            )
+            if streamed:
+                # The failed attempt already streamed tokens; the next one starts over.
+                sink({"event": "token_reset", "agent": name, "attempt": attempt})
+                streamed = 0
+
+        AGENT_CALLS_IN_FLIGHT.inc(agent=name)
+        started = time.perf_counter()
+        try:
+            text, usage = await scheduler.run(
+                lambda: _invoke(agent, prompt, _forward if sink is not None else None, **kwargs),
+                estimated,
+                on_retry=_on_retry,
+            )
+        except Exception:
+            AGENT_ERRORS.inc(agent=name)
+            raise
+        finally:
+            AGENT_CALLS_IN_FLIGHT.dec(agent=name)
+        record_agent_call(name, time.perf_counter() - started, usage)
+        scheduler.settle(estimated, sum(usage))
+        if span is not None:
+            span.set(cached=False, lane=current_lane(), prompt_tokens=usage[0], completion_tokens=usage[1])
+        if key is not None and (validate is None or validate(text)):
+            cache.set(key, text, name)
+        return text
+
+
+async def run_workflow(workflow, message: Any):
+    """Run a workflow on the current event loop and return its outputs."""
+    result = await workflow.run(message)
+    if hasattr(result, "get_outputs"):
+        return result.get_outputs()
+    return result
+
+
+class LoopRunner:
+    """Long-lived event loop on a daemon thread for synchronous callers.
+
+    Keeping one loop alive lets the shared chat client reuse its HTTP
+    connection pool across calls instead of rebuilding it per request.
+    """
+
+    def __init__(self, name: str = "agent-framework-loop") -> None:
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        """Run the loop forever on the background thread."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Return the background event loop."""
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Submit a coroutine to the background loop and block for its result."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopRunner.run cannot block on its own loop thread; await the coroutine instead.")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def stop(self) -> None:
+        """Stop the loop and wait for the background thread to exit."""
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
+def get_loop_runner() -> LoopRunner:
+    """Return the process-wide background loop runner, starting it on demand."""
+    global _loop_runner
+    if _loop_runner is None:
+        with _loop_runner_lock:
+            if _loop_runner is None:
+                _loop_runner = LoopRunner()
+                atexit.register(_loop_runner.stop)
+    return _loop_runner
+
+
+def run_coroutine_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the shared background loop from synchronous code."""
+    return get_loop_runner().run(coro, timeout)
+
+
+class WorkflowPool:
+    """Pool of idle workflow instances so concurrent runs never share one.
+
+    Agent Framework workflows reject overlapping runs on the same instance,
+    so each run borrows an idle instance (building a new one if none is
+    free) and returns it afterwards.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_idle: int = 32) -> None:
+        self._factory = factory
+        self._max_idle = max_idle
+        self._idle: list[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Borrow an idle workflow or build a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._factory()
+
+    def release(self, workflow) -> None:
+        """Return a workflow to the idle list."""
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append(workflow)
+
+    async def run(self, message: Any):
+        """Run ``message`` through a borrowed workflow and return its outputs."""
+        workflow = self.acquire()
+        outputs = await run_workflow(workflow, message)
+        # Failed runs drop their instance rather than recycling unknown state.
+        self.release(workflow)
+        return outputs
+
+
+def run_agent_sync(agent, prompt: str, **kwargs) -> str:
+    """Run an async agent call synchronously via the shared background loop."""
+    return run_coroutine_sync(run_agent(agent, prompt, **kwargs))
+
+
+def run_workflow_sync(workflow, prompt: Any):
+    """Run an async workflow synchronously via the shared background loop."""
+    return run_coroutine_sync(run_workflow(workflow, prompt))
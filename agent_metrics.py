@@ -0,0 +1,261 @@
+"""Dependency-free Prometheus metrics for the gateway, pipeline stages, and agents.
+
+Metrics are kept in a process-wide :data:`REGISTRY` and rendered in the
+Prometheus text exposition format (0.0.4) by :func:`render_metrics`, which
+the gateway serves at ``GET /metrics``.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans fast cache hits up to multi-minute full pipelines.
+LATENCY_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+Sample = tuple[dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value (backslash, double quote, newline)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    """Render a label set as ``{a="x",b="y"}`` (empty string when none)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value the way Prometheus expects."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base for labelled metrics sharing one lock."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        """Return the label values in declaration order."""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        """Return the label dict for a stored key."""
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> list[str]:
+        """Return exposition lines for this metric."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """Return ``(sample_name, labels, value)`` triples."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the counter for ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for ``labels``."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Subtract ``amount`` from the gauge for ``labels``."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed observations with ``_sum`` and ``_count`` per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One slot per bucket, then sum and count.
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        samples = []
+        for key, series in items:
+            labels = self._labels(key)
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += series[index]
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, series[-2]))
+            samples.append((f"{self.name}_count", labels, series[-1]))
+        return samples
+
+
+class Registry:
+    """Ordered collection of metrics plus callbacks for computed values."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._callbacks: list[Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric (re-registering a name returns the existing one)."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Register and return a counter."""
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Register and return a gauge."""
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Register and return a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def add_callback(self, callback: Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]) -> None:
+        """Register a function yielding ``(name, type, help, samples)`` at scrape time."""
+        self._callbacks.append(callback)
+
+    def render(self) -> str:
+        """Return the full exposition text."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for callback in self._callbacks:
+            try:
+                families = list(callback())
+            except Exception:  # pragma: no cover - a broken collector must not break scrapes
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter(
+    "agent_gateway_requests_total", "HTTP requests handled by the gateway.", ("method", "route", "status")
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "agent_gateway_request_duration_seconds", "Gateway request latency, including streamed bodies.", ("route",)
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "agent_gateway_requests_in_flight", "Gateway requests currently being handled.", ("route",)
+)
+STAGE_LATENCY = REGISTRY.histogram(
+    "agent_stage_duration_seconds",
+    "Latency of graph executors and code assistant participants.",
+    ("stage", "outcome"),
+)
+STAGES_IN_FLIGHT = REGISTRY.gauge("agent_stages_in_flight", "Pipeline stages currently running.", ("stage",))
+AGENT_CALL_LATENCY = REGISTRY.histogram(
+    "agent_llm_call_duration_seconds", "Latency of model calls per agent, including retries.", ("agent",)
+)
+AGENT_CALLS_IN_FLIGHT = REGISTRY.gauge("agent_llm_calls_in_flight", "Model calls currently running.", ("agent",))
+PROMPT_TOKENS = REGISTRY.counter("agent_prompt_tokens_total", "Prompt tokens sent per agent.", ("agent",))
+COMPLETION_TOKENS = REGISTRY.counter(
+    "agent_completion_tokens_total", "Completion tokens received per agent.", ("agent",)
+)
+AGENT_ERRORS = REGISTRY.counter("agent_llm_call_errors_total", "Model calls that failed after retries.", ("agent",))
+
+
+def render_metrics() -> str:
+    """Return all registered metrics in Prometheus text format."""
+    return REGISTRY.render()
+
+
+def record_agent_call(agent: str, seconds: float, usage: Optional[tuple[int, int]]) -> None:
+    """Record one completed (uncached) agent call."""
+    AGENT_CALL_LATENCY.observe(seconds, agent=agent)
+    if usage is not None:
+        PROMPT_TOKENS.inc(usage[0], agent=agent)
+        COMPLETION_TOKENS.inc(usage[1], agent=agent)
+
+
+def cache_families(stats: dict[str, Any]) -> list[tuple[str, str, str, list[Sample]]]:
+    """Convert response-cache stats into metric families."""
+    if not stats:
+        return []
+    by_agent = stats.get("by_agent", {})
+    hits = [({"agent": name}, counters.get("hits", 0)) for name, counters in by_agent.items()]
+    misses = [({"agent": name}, counters.get("misses", 0)) for name, counters in by_agent.items()]
+    return [
+        ("agent_cache_hits_total", "counter", "Response cache hits per agent.", hits),
+        ("agent_cache_misses_total", "counter", "Response cache misses per agent.", misses),
+        ("agent_cache_evictions_total", "counter", "Response cache evictions.", [({}, stats.get("evictions", 0))]),
+        ("agent_cache_hit_ratio", "gauge", "Response cache hit ratio since start.", [({}, stats.get("hit_ratio", 0.0))]),
+    ]
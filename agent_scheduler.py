@@ -0,0 +1,312 @@
+"""Rate-limit-aware admission and retry for Azure OpenAI agent calls.
+
+Every agent call passes through an :class:`AgentScheduler` for its
+deployment. The scheduler estimates the call's token cost, waits for room
+in per-deployment RPM/TPM token buckets, and retries throttling (429) and
+server (5xx) errors with jittered exponential backoff that honors
+``Retry-After``. Calls run in one of two lanes: ``interactive`` (default)
+and ``batch``. Batch calls draw from a capped share of the budget and
+yield to waiting interactive calls, so bulk jobs never starve live
+requests.
+
+Schedulers are process-wide and shared by every event loop (the gateway's
+and the background ``LoopRunner``'s), so their state is guarded by
+``threading`` locks and all waiting is done with sleeps on the caller's loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+_lane: ContextVar[str] = ContextVar("agent_lane", default=INTERACTIVE)
+_schedulers: dict[str, "AgentScheduler"] = {}
+_schedulers_lock = threading.Lock()
+# How often a batch call rechecks for waiting interactive calls.
+_YIELD_POLL_SECONDS = 0.05
+
+
+@contextmanager
+def use_lane(lane: str) -> Iterator[None]:
+    """Run agent calls made in this context in ``lane``."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    """Return the lane for agent calls in the current context."""
+    return _lane.get()
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of ``text`` (about 4 chars per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    A rate of zero or less means unlimited. Callers reserve tokens up front
+    (the balance may go negative) and sleep until their reservation is
+    covered, which keeps waiters in FIFO order without an event-loop-bound
+    lock.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        """Return whether the bucket imposes no limit."""
+        return self.per_minute <= 0
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """Wait until ``amount`` tokens are available and take them (FIFO).
+
+        Returns the amount actually taken (capped at the capacity, 0 when
+        unlimited), which is what a later refund should give back.
+        """
+        if self.unlimited:
+            return 0.0
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            wait = -self._tokens * 60.0 / self.per_minute
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.adjust(-amount)
+                raise
+        return amount
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact."""
+        if self.unlimited:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for retryable errors."""
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the sleep before retry ``attempt`` (0-based), honoring ``Retry-After``."""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+def _iter_causes(exc: BaseException) -> Iterator[BaseException]:
+    """Yield ``exc`` and the exceptions it wraps."""
+    seen: set[int] = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = getattr(current, "inner_exception", None) or current.__cause__ or current.__context__
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by ``exc`` or any wrapped exception."""
+    for error in _iter_causes(exc):
+        response = getattr(error, "response", None)
+        for candidate in (getattr(error, "status_code", None), getattr(response, "status_code", None)):
+            if isinstance(candidate, int):
+                return candidate
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Return the server's ``Retry-After`` hint (seconds) if present."""
+    for error in _iter_causes(exc):
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = headers.get(name)
+            if value is None:
+                continue
+            try:
+                return max(0.0, float(value) * scale)
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return whether ``exc`` is a throttling, server, or transient network error."""
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return any(isinstance(error, (asyncio.TimeoutError, ConnectionError)) for error in _iter_causes(exc))
+
+
+class AgentScheduler:
+    """Admission control, lane priority, and retries for one deployment."""
+
+    def __init__(
+        self,
+        deployment: str = "",
+        rpm: float = 0,
+        tpm: float = 0,
+        batch_share: float = 0.5,
+        retry: Optional[RetryPolicy] = None,
+    ) -> None:
+        self.deployment = deployment
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.batch_requests = TokenBucket(rpm * batch_share)
+        self.batch_tokens = TokenBucket(tpm * batch_share)
+        self.retry = retry or RetryPolicy()
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0, "queued_seconds": 0.0}
+        self._interactive_waiting = 0
+        self._lock = threading.Lock()
+
+    def _count(self, stat: str, amount: float = 1) -> None:
+        """Add ``amount`` to a counter in :attr:`stats`."""
+        with self._lock:
+            self.stats[stat] += amount
+
+    async def _admit(self, lane: str, estimated_tokens: int) -> float:
+        """Wait for budget in ``lane`` and return seconds spent queued."""
+        started = time.monotonic()
+        if lane == BATCH:
+            while self._interactive_waiting:
+                await asyncio.sleep(_YIELD_POLL_SECONDS)
+            await self._acquire_all(
+                (self.batch_requests, 1),
+                (self.batch_tokens, estimated_tokens),
+                (self.requests, 1),
+                (self.tokens, estimated_tokens),
+            )
+            return time.monotonic() - started
+
+        with self._lock:
+            self._interactive_waiting += 1
+        try:
+            await self._acquire_all((self.requests, 1), (self.tokens, estimated_tokens))
+        finally:
+            with self._lock:
+                self._interactive_waiting -= 1
+        return time.monotonic() - started
+
+    @staticmethod
+    async def _acquire_all(*steps: tuple[TokenBucket, float]) -> None:
+        """Acquire from each bucket in order, refunding earlier ones if a later wait is cancelled."""
+        taken: list[tuple[TokenBucket, float]] = []
+        try:
+            for bucket, amount in steps:
+                taken.append((bucket, await bucket.acquire(amount)))
+        except BaseException:
+            for bucket, amount in taken:
+                bucket.adjust(-amount)
+            raise
+
+    def settle(self, estimated_tokens: int, actual_tokens: int, lane: Optional[str] = None) -> None:
+        """Correct the token budget once actual usage is known."""
+        delta = actual_tokens - estimated_tokens
+        self.tokens.adjust(delta)
+        if (lane or current_lane()) == BATCH:
+            self.batch_tokens.adjust(delta)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        lane: Optional[str] = None,
+        on_retry: Optional[Callable[[int, float, BaseException], None]] = None,
+    ) -> T:
+        """Admit and run ``call``, retrying retryable failures."""
+        lane = lane or current_lane()
+        attempt = 0
+        while True:
+            self._count("queued_seconds", await self._admit(lane, estimated_tokens))
+            self._count("calls")
+            try:
+                return await call()
+            except Exception as exc:
+                if attempt >= self.retry.max_retries or not is_retryable(exc):
+                    self._count("failures")
+                    raise
+                if error_status(exc) == 429:
+                    self._count("throttled")
+                delay = self.retry.delay(attempt, retry_after_seconds(exc))
+                self._count("retries")
+                if on_retry is not None:
+                    on_retry(attempt + 1, delay, exc)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+def get_scheduler(deployment: str = "") -> AgentScheduler:
+    """Return the scheduler for ``deployment``, configured from the environment.
+
+    ``AZURE_OPENAI_RPM`` / ``AZURE_OPENAI_TPM`` set the quota (0 = unlimited),
+    ``AGENT_BATCH_SHARE`` caps the batch lane's share of it, and
+    ``AGENT_MAX_RETRIES`` / ``AGENT_RETRY_BASE_DELAY`` / ``AGENT_RETRY_MAX_DELAY``
+    tune the retry policy.
+    """
+    scheduler = _schedulers.get(deployment)
+    if scheduler is not None:
+        return scheduler
+    with _schedulers_lock:
+        scheduler = _schedulers.get(deployment)
+        if scheduler is not None:
+            return scheduler
+        scheduler = AgentScheduler(
+            deployment=deployment,
+            rpm=float(os.getenv("AZURE_OPENAI_RPM", "0")),
+            tpm=float(os.getenv("AZURE_OPENAI_TPM", "0")),
+            batch_share=float(os.getenv("AGENT_BATCH_SHARE", "0.5")),
+            retry=RetryPolicy(
+                max_retries=int(os.getenv("AGENT_MAX_RETRIES", "5")),
+                base_delay=float(os.getenv("AGENT_RETRY_BASE_DELAY", "1.0")),
+                max_delay=float(os.getenv("AGENT_RETRY_MAX_DELAY", "30")),
+            ),
+        )
+        _schedulers[deployment] = scheduler
+    return scheduler
+
+
+def scheduler_stats() -> dict[str, dict[str, Any]]:
+    """Return counters for every deployment's scheduler."""
+    return {deployment or "default": dict(s.stats) for deployment, s in list(_schedulers.items())}
@@ -0,0 +1,312 @@
+"""Per-request span trees kept in an in-memory ring buffer.
+
+A trace starts with :func:`open_trace` or :func:`start_trace` (the gateway
+opens one per request); :func:`trace_span` records nested spans for
+executors, agent calls, and so on while a trace is active and is a no-op
+otherwise. Traces are kept in a bounded :class:`TraceStore`, rendered as a
+JSON waterfall, and optionally appended to an OTLP/JSON lines file
+(``AGENT_TRACE_EXPORT_PATH``) for offline analysis.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+SERVICE_NAME = "resume-generate-agent"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_store: Optional["TraceStore"] = None
+_store_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "events", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.events: list[dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        """Return the id of the trace this span belongs to."""
+        return self.trace.trace_id
+
+    def set(self, **attributes: Any) -> None:
+        """Add or overwrite span attributes."""
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event (for example, a retry) on the span."""
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Close the span."""
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = error
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, trace_id: Optional[str] = None) -> None:
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, parent_id: Optional[str], attributes: dict[str, Any]) -> Span:
+        """Create and register a span."""
+        span = Span(self, name, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def root(self) -> Optional[Span]:
+        """Return the first span (the request itself)."""
+        return self.spans[0] if self.spans else None
+
+    def waterfall(self) -> dict[str, Any]:
+        """Render the span tree as a JSON waterfall ordered by start time."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        root = self.root
+        origin = root.start_ns if root is not None else 0
+        now = time.time_ns()
+        depths: dict[str, int] = {}
+        rows = []
+        for span in spans:
+            depth = depths.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            depths[span.span_id] = depth
+            end = span.end_ns if span.end_ns is not None else now
+            row = {
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "depth": depth,
+                "start_ms": round((span.start_ns - origin) / 1e6, 3),
+                "duration_ms": round((end - span.start_ns) / 1e6, 3),
+                "attributes": dict(span.attributes),
+            }
+            if span.events:
+                row["events"] = [
+                    {
+                        "name": event["name"],
+                        "at_ms": round((event["time_ns"] - origin) / 1e6, 3),
+                        "attributes": event["attributes"],
+                    }
+                    for event in span.events
+                ]
+            if span.end_ns is None:
+                row["in_progress"] = True
+            if span.error is not None:
+                row["error"] = span.error
+            rows.append(row)
+        duration = rows[0]["duration_ms"] if rows else 0.0
+        return {"trace_id": self.trace_id, "name": root.name if root else "", "duration_ms": duration, "spans": rows}
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Return the trace as an OTLP/JSON ``ExportTraceServiceRequest``."""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": "agent_tracing"}, "spans": [_otlp_span(s) for s in spans]}],
+                }
+            ]
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Encode an attribute value as an OTLP ``AnyValue``."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    """Encode one OTLP key/value attribute."""
+    return {"key": key, "value": _otlp_value(value)}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    """Encode a span in OTLP/JSON form."""
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "events": [
+            {
+                "timeUnixNano": str(event["time_ns"]),
+                "name": event["name"],
+                "attributes": [_otlp_attribute(key, value) for key, value in event["attributes"].items()],
+            }
+            for event in span.events
+        ],
+        "status": {"code": 2, "message": span.error} if span.error is not None else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class TraceStore:
+    """Ring buffer of the most recent ``capacity`` traces, with optional file export."""
+
+    def __init__(self, capacity: int = 1000, export_path: Optional[str] = None) -> None:
+        self.capacity = max(1, capacity)
+        self.export_path = export_path
+        self._traces: OrderedDict[str, Trace] = OrderedDict()
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        """Keep a trace, evicting the oldest beyond capacity."""
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            self._traces.move_to_end(trace.trace_id)
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        """Return a stored trace (finished or still running)."""
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def export(self, trace: Trace) -> None:
+        """Append a finished trace to the OTLP/JSON lines file, if configured."""
+        if not self.export_path:
+            return
+        line = json.dumps(trace.to_otlp(), ensure_ascii=False, default=str)
+        with self._export_lock, open(self.export_path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+def get_trace_store() -> TraceStore:
+    """Return the process-wide trace store (``AGENT_TRACE_BUFFER`` / ``AGENT_TRACE_EXPORT_PATH``)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TraceStore(
+                    capacity=int(os.getenv("AGENT_TRACE_BUFFER", "1000")),
+                    export_path=os.getenv("AGENT_TRACE_EXPORT_PATH") or None,
+                )
+    return _store
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if a trace is being recorded."""
+    return _current_span.get()
+
+
+def tracing_enabled() -> bool:
+    """Return whether traces are recorded (``AGENT_TRACING_ENABLED``, default on)."""
+    return os.getenv("AGENT_TRACING_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def open_trace(name: str, **attributes: Any) -> Optional[Span]:
+    """Create and store a new trace, returning its root span (``None`` when disabled)."""
+    if not tracing_enabled():
+        return None
+    trace = Trace()
+    root = trace.new_span(name, None, attributes)
+    get_trace_store().add(trace)
+    return root
+
+
+def finish_trace(root: Optional[Span], error: Optional[str] = None) -> None:
+    """Close a root span from :func:`open_trace` and export its trace."""
+    if root is None or root.end_ns is not None:
+        return
+    root.finish(error)
+    get_trace_store().export(root.trace)
+
+
+@contextmanager
+def use_span(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Make ``span`` the parent of spans recorded in this context."""
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record a whole trace around the block and return its root span."""
+    root = open_trace(name, **attributes)
+    error: Optional[str] = None
+    try:
+        with use_span(root):
+            yield root
+    except Exception as exc:
+        error = str(exc) or type(exc).__name__
+        raise
+    finally:
+        finish_trace(root, error)
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record a child span of the active span; yields ``None`` when not tracing."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = parent.trace.new_span(name, parent.span_id, attributes)
+    token = _current_span.set(span)
+    error: Optional[str] = None
+    try:
+        yield span
+    except BaseException as exc:
+        error = str(exc) or type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish(error)
+
+
+def annotate_span(**attributes: Any) -> None:
+    """Add attributes to the active span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**attributes)
+
+
+def add_span_event(name: str, **attributes: Any) -> None:
+    """Record an event on the active span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.add_event(name, **attributes)
@@ -0,0 +1,173 @@
+"""Local fake Azure OpenAI chat-completions endpoint that can return 429s.
+
+Point the agents at it to exercise the scheduler's rate limiting and retry
+handling without touching a real deployment:
+
+    python3 benchmarks/fake_azure_openai_server.py --port 9000 --throttle-rate 0.3
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:9000 AZURE_OPENAI_API_KEY=fake \\
+    AZURE_OPENAI_DEPLOYMENT_NAME=fake python3 run_demo.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class FakeAzureOpenAIHandler(BaseHTTPRequestHandler):
+    """Serve ``/openai/deployments/<name>/chat/completions`` with canned replies."""
+
+    server_version = "FakeAzureOpenAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    throttle_rate = 0.0
+    server_error_rate = 0.0
+    retry_after = 1.0
+    latency = 0.05
+    rpm_limit = 0
+    counters = {"requests": 0, "throttled": 0, "server_errors": 0, "ok": 0}
+    _window: list[float] = []
+    _lock = threading.Lock()
+
+    def _send_json(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        """Send a JSON response with optional extra headers."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _over_rpm(self) -> bool:
+        """Return whether the sliding one-minute window exceeds ``rpm_limit``."""
+        if not self.rpm_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            self._window[:] = [t for t in self._window if now - t < 60]
+            if len(self._window) >= self.rpm_limit:
+                return True
+            self._window.append(now)
+        return False
+
+    def _count(self, key: str) -> None:
+        """Increment a request counter."""
+        with self._lock:
+            self.counters[key] += 1
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Expose request counters at ``/stats``."""
+        if self.path == "/stats":
+            self._send_json(HTTPStatus.OK, dict(self.counters))
+            return
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Return a completion, a throttling error, or a server error."""
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self._count("requests")
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": {"message": "Not found"}})
+            return
+
+        if self._over_rpm() or random.random() < self.throttle_rate:
+            self._count("throttled")
+            self._send_json(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"error": {"code": "429", "message": "Rate limit is exceeded. Try again later."}},
+                {"Retry-After": str(self.retry_after), "retry-after-ms": str(int(self.retry_after * 1000))},
+            )
+            return
+        if random.random() < self.server_error_rate:
+            self._count("server_errors")
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": {"message": "Service unavailable"}})
+            return
+
+        time.sleep(self.latency)
+        self._count("ok")
+        prompt = json.dumps(request.get("messages", []))
+        text = f"Fake completion for a {len(prompt)}-character prompt."
+        if request.get("stream"):
+            self._send_stream(text)
+            return
+        self._send_json(HTTPStatus.OK, _completion(text, len(prompt) // 4))
+
+    def _send_stream(self, text: str) -> None:
+        """Send the completion as OpenAI-style server-sent events."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for start in range(0, len(text), 8):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "fake",
+                "choices": [{"index": 0, "delta": {"content": text[start : start + 8]}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+
+def _completion(text: str, prompt_tokens: int) -> dict[str, Any]:
+    """Build a chat.completion response body."""
+    completion_tokens = max(1, len(text) // 4)
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main() -> None:
+    """Parse CLI options and run the fake endpoint."""
+    parser = argparse.ArgumentParser(description="Fake Azure OpenAI endpoint for rate-limit testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction answered with 503")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Return 429 above this many requests per minute")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    FakeAzureOpenAIHandler.throttle_rate = args.throttle_rate
+    FakeAzureOpenAIHandler.server_error_rate = args.server_error_rate
+    FakeAzureOpenAIHandler.retry_after = args.retry_after
+    FakeAzureOpenAIHandler.rpm_limit = args.rpm
+    FakeAzureOpenAIHandler.latency = args.latency
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeAzureOpenAIHandler)
+    print(f"Fake Azure OpenAI listening on http://{args.host}:{args.port} (stats at /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
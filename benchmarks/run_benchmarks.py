@@ -0,0 +1,322 @@
+"""Offline benchmarks for the orchestrators, gateway routes, and demos.
+
+Runs every scenario against the fake chat client (``AGENT_CLIENT=fake``) at
+increasing concurrency and reports throughput, latency percentiles, and
+peak RSS. Results are written as JSON so runs can be compared across
+commits:
+
+    python3 benchmarks/run_benchmarks.py --concurrency 1,4,16,64 --requests 64
+    python3 benchmarks/run_benchmarks.py --compare benchmarks/results/<earlier>.json
+
+Simulated model latency is configured with the ``FAKE_LLM_*`` variables
+documented in ``fake_chat_client.py`` (``--latency`` sets ``FAKE_LLM_LATENCY``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SAMPLE_RESUME = """Alex Doe | alex@example.com
+Skills: Python, Go, PostgreSQL, Docker
+Experience: Backend Engineer at Example Corp (2022 - Present)
+- Built REST APIs serving 2M requests/day
+"""
+
+SAMPLE_JD = """Senior Backend Engineer - FinTech
+Requirements: Python or Go, microservices, PostgreSQL, Redis, Docker, Kubernetes.
+Nice to have: AWS, Kafka, mentoring.
+"""
+
+SAMPLE_CODE = """def process_data(items):
+    result = []
+    for item in items:
+        if item > 0:
+            result.append(item * 2)
+    return result
+"""
+
+Scenario = Callable[[int], Awaitable[None]]
+
+
+def _configure_environment(args: argparse.Namespace) -> None:
+    """Point the project at the fake client and a throwaway data directory."""
+    os.environ["AGENT_CLIENT"] = "fake"
+    if args.latency:
+        os.environ["FAKE_LLM_LATENCY"] = args.latency
+    os.environ.setdefault("AGENT_DATA_DIR", tempfile.mkdtemp(prefix="agent-bench-"))
+    if not args.keep_caches:
+        os.environ["AGENT_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("AGENT_TRACE_BUFFER", "256")
+    sys.path.insert(0, str(ROOT))
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _peak_rss_mb() -> float:
+    """Return the process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit() -> Optional[str]:
+    """Return the current commit hash, if run inside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _http_request(port: int, method: str, path: str, payload: Optional[dict] = None) -> tuple[int, bytes]:
+    """Send one HTTP/1.1 request to the local gateway and read the full response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload or {}).encode("utf-8") if method == "POST" else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    status_line = raw.split(b"\r\n", 1)[0].decode("latin-1")
+    return int(status_line.split()[1]), raw
+
+
+def _build_scenarios(port: int) -> dict[str, Scenario]:
+    """Return the benchmark scenarios keyed by name."""
+    from code_assistant.definition import orchestrator_async as code_orchestrator_async
+    from resume_assistant.definition import orchestrator_async as resume_orchestrator_async
+
+    async def resume_orchestrator(i: int) -> None:
+        # Unique inputs per request so caches and coalescing don't short-circuit work.
+        await resume_orchestrator_async(f"{SAMPLE_RESUME}\nRequest {i}", f"{SAMPLE_JD}\nPosting {i}")
+
+    async def code_orchestrator(i: int) -> None:
+        await code_orchestrator_async(f"Explain and refactor this (request {i})", SAMPLE_CODE)
+
+    async def _gateway_post(path: str, payload: dict) -> None:
+        status, raw = await _http_request(port, "POST", path, payload)
+        if status != 200 or b'"event": "error"' in raw:
+            raise RuntimeError(f"{path} returned {status}")
+
+    async def gateway_resume_run(i: int) -> None:
+        await _gateway_post(
+            "/v1/resume/run", {"user_input": f"{SAMPLE_RESUME}\n{i}", "job_description": f"{SAMPLE_JD}\n{i}"}
+        )
+
+    async def gateway_code_run(i: int) -> None:
+        await _gateway_post("/v1/code/run", {"user_request": f"Explain this ({i})", "code": SAMPLE_CODE})
+
+    async def gateway_resume_stream(i: int) -> None:
+        await _gateway_post(
+            "/v1/resume/stream?format=ndjson",
+            {"user_input": f"{SAMPLE_RESUME}\n{i}", "job_description": f"{SAMPLE_JD}\n{i}"},
+        )
+
+    async def gateway_health(i: int) -> None:
+        status, _ = await _http_request(port, "GET", "/health")
+        if status != 200:
+            raise RuntimeError(f"/health returned {status}")
+
+    return {
+        "resume_orchestrator": resume_orchestrator,
+        "code_orchestrator": code_orchestrator,
+        "gateway_health": gateway_health,
+        "gateway_resume_run": gateway_resume_run,
+        "gateway_code_run": gateway_code_run,
+        "gateway_resume_stream": gateway_resume_stream,
+        "resume_demo": _demo_scenario("run_demo"),
+        "code_demo": _demo_scenario("code_assistant.demo"),
+    }
+
+
+def _demo_scenario(module_name: str) -> Scenario:
+    """Wrap a demo's blocking ``run_demo()`` so it runs in a worker thread."""
+
+    async def run(i: int) -> None:
+        module = __import__(module_name, fromlist=["run_demo"])
+        await asyncio.to_thread(module.run_demo)
+
+    return run
+
+
+async def _run_level(scenario: Scenario, concurrency: int, requests: int) -> dict[str, Any]:
+    """Run ``requests`` calls with at most ``concurrency`` in flight."""
+    latencies: list[float] = []
+    errors: list[str] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def _one(i: int) -> None:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await scenario(i)
+            except Exception as exc:
+                errors.append(str(exc) or type(exc).__name__)
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    """Start an in-process gateway and run the selected scenarios."""
+    import external_gateway
+
+    external_gateway.configure_run_limit(args.max_concurrent_runs)
+    gateway = external_gateway.AsyncAgentGateway(host="127.0.0.1", port=0)
+    await gateway.start()
+    port = gateway.address[1]
+    serving = asyncio.ensure_future(gateway.serve_forever())
+
+    scenarios = _build_scenarios(port)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(scenarios)}")
+
+    results = []
+    try:
+        for name in selected:
+            for concurrency in args.concurrency:
+                requests = max(args.requests, concurrency)
+                # Demos print a lot; silence stdout while they run.
+                quiet = contextlib.redirect_stdout(io.StringIO()) if name.endswith("_demo") else contextlib.nullcontext()
+                with quiet:
+                    level = await _run_level(scenarios[name], concurrency, requests)
+                level["scenario"] = name
+                results.append(level)
+                _print_row(level)
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        await external_gateway.get_job_pool().stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fake_llm_latency": os.getenv("FAKE_LLM_LATENCY", "fixed:0.05"),
+            "fake_llm_latency_by_agent": os.getenv("FAKE_LLM_LATENCY_BY_AGENT") or None,
+            "caches_enabled": args.keep_caches,
+            "max_concurrent_runs": args.max_concurrent_runs,
+        },
+        "results": results,
+    }
+
+
+def _print_row(level: dict[str, Any]) -> None:
+    """Print one result line."""
+    latency = level["latency_ms"]
+    print(
+        f"{level['scenario']:<24} c={level['concurrency']:<4} n={level['requests']:<5} "
+        f"{level['throughput_rps']:>9.2f} rps  p50={latency['p50']:>9.1f}ms  p95={latency['p95']:>9.1f}ms  "
+        f"p99={latency['p99']:>9.1f}ms  errors={level['errors']:<3} rss={level['peak_rss_mb']:.1f}MiB",
+        file=sys.stderr,
+    )
+
+
+def _compare(current: dict[str, Any], baseline_path: Path) -> None:
+    """Print throughput and p95 changes against an earlier results file."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    print(f"\nCompared with {baseline_path} ({baseline.get('meta', {}).get('git_commit')}):", file=sys.stderr)
+    for row in current["results"]:
+        old = previous.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        rps_delta = _relative(row["throughput_rps"], old["throughput_rps"])
+        p95_delta = _relative(row["latency_ms"]["p95"], old["latency_ms"]["p95"])
+        print(
+            f"{row['scenario']:<24} c={row['concurrency']:<4} throughput {rps_delta:>+7.1f}%  p95 {p95_delta:>+7.1f}%",
+            file=sys.stderr,
+        )
+
+
+def _relative(new: float, old: float) -> float:
+    """Return the percentage change from ``old`` to ``new``."""
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main() -> None:
+    """Parse CLI options, run the benchmarks, and save the JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark the agents offline with the fake chat client.")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda raw: [int(part) for part in raw.split(",")],
+        default=[1, 4, 16, 64],
+        help="Comma-separated concurrency levels (default: 1,4,16,64)",
+    )
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level (at least the concurrency)")
+    parser.add_argument("--scenarios", default="", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--latency", default="", help="FAKE_LLM_LATENCY spec, e.g. lognormal:0.2,0.5")
+    parser.add_argument("--max-concurrent-runs", type=int, default=64, help="Gateway run limit (default: 64)")
+    parser.add_argument("--keep-caches", action="store_true", help="Leave the agent response cache enabled")
+    parser.add_argument("--output", type=Path, default=None, help="Results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    _configure_environment(args)
+    report = asyncio.run(_run(args))
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"{stamp}_{report['meta']['git_commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nSaved {output}", file=sys.stderr)
+    if args.compare is not None:
+        _compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
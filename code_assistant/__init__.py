@@ -1,6 +1,22 @@
 """Public exports for the code assistant package."""
 
-from .agents import document_code, explain_code, refactor_code
-from .definition import orchestrator
+from .agents import (
+    document_code,
+    document_code_async,
+    explain_code,
+    explain_code_async,
+    refactor_code,
+    refactor_code_async,
+)
+from .definition import orchestrator, orchestrator_async
 
-__all__ = ["orchestrator", "explain_code", "refactor_code", "document_code"]
+__all__ = [
+    "orchestrator",
+    "orchestrator_async",
+    "explain_code",
+    "refactor_code",
+    "document_code",
+    "explain_code_async",
+    "refactor_code_async",
+    "document_code_async",
+]
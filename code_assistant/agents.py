@@ -1,8 +1,8 @@
-"""Code assistant agents and synchronous execution helpers."""
+"""Code assistant agents with async and synchronous execution helpers."""
 
 from __future__ import annotations
 
-from agent_framework_utils import create_agent, run_agent_sync
+from agent_framework_utils import create_agent, run_agent, run_agent_sync
 
 _agent_explainer = None
 _agent_refactor = None
@@ -101,6 +101,37 @@ def _build_doc_prompt(code: str, doc_style: str) -> str:
     return f"{style_guide}\n\nAdd documentation to this code:\n\n{code}"
 
 
+def _refactor_prompt(code: str, refactor_goal: str | None) -> str:
+    """Build the refactor prompt with an optional focus goal."""
+    if refactor_goal:
+        return f"Refactor this code with focus on: {refactor_goal}\n\n{code}"
+    return f"Refactor this code:\n\n{code}"
+
+
+async def explain_code_async(code: str, stream: bool = False) -> str:
+    """Async variant of :func:`explain_code` for use inside event loops."""
+    response = await run_agent(_get_explainer(), f"Explain this code:\n\n{code}", stream_tokens=True)
+    if stream:
+        print(response)
+    return response
+
+
+async def refactor_code_async(code: str, refactor_goal: str | None = None, stream: bool = False) -> str:
+    """Async variant of :func:`refactor_code` for use inside event loops."""
+    response = await run_agent(_get_refactor(), _refactor_prompt(code, refactor_goal), stream_tokens=True)
+    if stream:
+        print(response)
+    return response
+
+
+async def document_code_async(code: str, doc_style: str = "google", stream: bool = False) -> str:
+    """Async variant of :func:`document_code` for use inside event loops."""
+    response = await run_agent(_get_documenter(), _build_doc_prompt(code, doc_style), stream_tokens=True)
+    if stream:
+        print(response)
+    return response
+
+
 def explain_code(code: str, stream: bool = False) -> str:
     """Return a plain-English explanation of the given code."""
     response = run_agent_sync(_get_explainer(), f"Explain this code:\n\n{code}")
@@ -111,11 +142,7 @@ def explain_code(code: str, stream: bool = False) -> str:
 
 def refactor_code(code: str, refactor_goal: str | None = None, stream: bool = False) -> str:
     """Return a refactored version of the given code snippet."""
-    if refactor_goal:
-        prompt = f"Refactor this code with focus on: {refactor_goal}\n\n{code}"
-    else:
-        prompt = f"Refactor this code:\n\n{code}"
-    response = run_agent_sync(_get_refactor(), prompt)
+    response = run_agent_sync(_get_refactor(), _refactor_prompt(code, refactor_goal))
     if stream:
         print(response)
     return response
@@ -1,38 +1,51 @@
 """Tool and orchestrator definitions for the code assistant package."""
 
+import asyncio
+from typing import Iterable, Optional
+
 from agent_framework import tool
-from agent_framework_utils import run_workflow_sync
-from .agents import explain_code, refactor_code, document_code
-from .workflows.concurrent import build_concurrent_workflow
+from agent_framework_utils import observe_stage, run_agent, run_coroutine_sync
+from .agents import (
+    document_code_async,
+    explain_code_async,
+    get_documenter_agent,
+    get_explainer_agent,
+    get_refactor_agent,
+    refactor_code_async,
+)
+from .triage import classify_operations, normalize_operations
 
-_concurrent_workflow = None
+_PARTICIPANTS = {
+    "explain": get_explainer_agent,
+    "refactor": get_refactor_agent,
+    "document": get_documenter_agent,
+}
 
 
 @tool
-def explain_code_tool(code: str) -> str:
+async def explain_code_tool(code: str) -> str:
     """Explain what the provided code does."""
-    return explain_code(code, stream=False)
+    return await explain_code_async(code, stream=False)
 
 
 @tool
-def refactor_code_tool(code: str, refactor_goal: str = "none") -> str:
+async def refactor_code_tool(code: str, refactor_goal: str = "none") -> str:
     """Refactor code with an optional refactor goal."""
     goal = None if refactor_goal.lower() == "none" else refactor_goal
-    return refactor_code(code, refactor_goal=goal, stream=False)
+    return await refactor_code_async(code, refactor_goal=goal, stream=False)
 
 
 @tool
-def document_code_tool(code: str, doc_style: str = "google") -> str:
+async def document_code_tool(code: str, doc_style: str = "google") -> str:
     """Add documentation to code using a specified docstring style."""
-    return document_code(code, doc_style=doc_style, stream=False)
+    return await document_code_async(code, doc_style=doc_style, stream=False)
 
 
-def _get_concurrent_workflow():
-    """Create or return the cached concurrent workflow instance."""
-    global _concurrent_workflow
-    if _concurrent_workflow is None:
-        _concurrent_workflow = build_concurrent_workflow()
-    return _concurrent_workflow
+async def _run_participant(operation: str, prompt: str) -> str:
+    """Run one participant agent as an observed stage, streaming its tokens."""
+    agent = _PARTICIPANTS[operation]()
+    async with observe_stage(agent.name):
+        return await run_agent(agent, prompt, stream_tokens=True)
 
 
 def _messages_to_text(messages) -> str:
@@ -46,8 +59,20 @@ def _messages_to_text(messages) -> str:
     return "\n\n".join(parts)
 
 
-def orchestrator(user_request: str, code: str, stream: bool = False) -> str:
-    """Run the concurrent code assistant workflow for a user request."""
+async def orchestrator_async(
+    user_request: str,
+    code: str,
+    stream: bool = False,
+    operations: Optional[Iterable[str]] = None,
+) -> str:
+    """Fan the request out to the needed participants on the running loop.
+
+    Only the participants needed for the request are dispatched: either the
+    explicit ``operations`` (explain/refactor/document) or those picked by
+    local triage of ``user_request``. The response mirrors the concurrent
+    workflow output it replaced: the prompt followed by each participant's reply.
+    """
+    selected = normalize_operations(operations) or classify_operations(user_request)
     prompt = (
         "User request:\n"
         f"{user_request}\n\n"
@@ -55,9 +80,19 @@ def orchestrator(user_request: str, code: str, stream: bool = False) -> str:
         f"{code}\n\n"
         "Decide which operation(s) are needed and respond with the best output."
     )
-    outputs = run_workflow_sync(_get_concurrent_workflow(), prompt)
-    response = _messages_to_text(outputs)
+    replies = await asyncio.gather(*(_run_participant(op, prompt) for op in selected))
+    response = _messages_to_text([prompt, *replies])
 
     if stream:
         print(response)
     return response
+
+
+def orchestrator(
+    user_request: str,
+    code: str,
+    stream: bool = False,
+    operations: Optional[Iterable[str]] = None,
+) -> str:
+    """Run the code assistant fan-out for a user request."""
+    return run_coroutine_sync(orchestrator_async(user_request, code, stream=stream, operations=operations))
@@ -0,0 +1,42 @@
+"""Local intent triage that picks which code assistant participants to run."""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+OPERATIONS = ("explain", "refactor", "document")
+
+_OPERATION_PATTERNS = {
+    "explain": re.compile(
+        r"\b(explain|what\s+does|what'?s\s+going\s+on|understand|how\s+does|walk\s+me\s+through|describe)\b"
+    ),
+    "refactor": re.compile(
+        r"\b(refactor|clean\s*up|improve|readab\w*|efficien\w*|optimi[sz]\w*|performance|simplif\w*|restructure)\b"
+    ),
+    "document": re.compile(r"\b(document\w*|docstrings?|comments?|annotate)\b"),
+}
+
+
+def classify_operations(user_request: str) -> tuple[str, ...]:
+    """Return the operations a request asks for, or all of them if unclear."""
+    text = user_request.lower()
+    selected = tuple(op for op in OPERATIONS if _OPERATION_PATTERNS[op].search(text))
+    return selected or OPERATIONS
+
+
+def normalize_operations(operations: Optional[Iterable[str]]) -> Optional[tuple[str, ...]]:
+    """Validate an explicit operations list, returning them in canonical order.
+
+    Raises:
+        ValueError: If an unknown operation is requested.
+    """
+    if operations is None:
+        return None
+    requested = {str(op).strip().lower() for op in operations if str(op).strip()}
+    unknown = requested.difference(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unknown operation(s): {', '.join(sorted(unknown))}")
+    if not requested:
+        return None
+    return tuple(op for op in OPERATIONS if op in requested)
@@ -1,3 +0,0 @@
-"""Workflow exports for the code assistant package."""
-
-__all__ = ["concurrent"]
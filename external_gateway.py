@@ -3,23 +3,732 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import contextvars
 import json
+import os
+import time
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from typing import Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
 
+from agent_framework_utils import current_event_sink, get_cache_stats, get_data_dir, run_coroutine_sync, use_event_sink
+from agent_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from agent_metrics import REGISTRY, REQUEST_LATENCY, REQUESTS, REQUESTS_IN_FLIGHT, cache_families, render_metrics
+from agent_scheduler import scheduler_stats
+from agent_tracing import (
+    Span,
+    current_span,
+    finish_trace,
+    get_trace_store,
+    open_trace,
+    start_trace,
+    trace_span,
+    use_span,
+)
 from code_assistant.definition import orchestrator as code_orchestrator
+from code_assistant.definition import orchestrator_async as code_orchestrator_async
+from code_assistant.triage import normalize_operations
+from job_queue import JobStore, JobWorkerPool
+from resume_assistant.ats import score_resume
+from resume_assistant.checkpoints import RUN_ID_PATTERN, CheckpointConflict, get_checkpoint_store, new_run_id
 from resume_assistant.definition import orchestrator as resume_orchestrator
+from resume_assistant.definition import batch_orchestrator_async as resume_batch_orchestrator_async
+from resume_assistant.definition import multi_jd_orchestrator_async as resume_multi_jd_orchestrator_async
+from resume_assistant.definition import orchestrator_async as resume_orchestrator_async
+from resume_assistant.jd_store import analyze_job_with_store, get_jd_store, register_job_description
+from resume_assistant.models import to_jsonable
+from resume_assistant.routing import MODES as RESUME_MODES
+from resume_assistant.routing import normalize_mode
+from resume_assistant.sessions import SESSION_ID_PATTERN, SessionPlanError, get_session_store, new_session_id
+from singleflight import SingleFlight, canonical_key
 
+ROUTES_SUMMARY = (
+    "Routes: GET /health, POST /v1/resume/run, POST /v1/code/run, POST /v1/jds, "
+    "POST /v1/resume/stream, POST /v1/code/stream, POST /v1/resume/batch, POST /v1/resume/multi, "
+    "POST /v1/resume/score, "
+    "POST /v1/jobs, GET /v1/jobs/{id}, GET /v1/traces/{id}, GET /v1/sessions/{id}, GET /v1/stats, GET /metrics"
+)
 
-def run_resume_agent(user_input: str, job_description: str = "") -> str:
+# Caps simultaneous agent pipelines for the process; /health is never limited.
+_run_slots: Optional[asyncio.Semaphore] = None
+_max_concurrent_runs = 64
+# Identical /run requests that arrive while one is in flight share its result.
+_coalescer = SingleFlight()
+# Durable background jobs; started with the server so restarts resume queued work.
+_job_pool: Optional[JobWorkerPool] = None
+_job_workers = int(os.getenv("AGENT_JOB_WORKERS", "4"))
+# Upper bound for GET /v1/jobs/{id}?wait=<seconds> long-polls.
+MAX_JOB_WAIT_SECONDS = 60.0
+
+
+def run_resume_agent(
+    user_input: str,
+    job_description: str = "",
+    mode: Optional[str] = None,
+    session_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> str:
     """Run the resume assistant orchestrator with user and job inputs."""
-    return resume_orchestrator(user_input=user_input, job_description=job_description, stream=False)
+    return resume_orchestrator(
+        user_input=user_input,
+        job_description=job_description,
+        stream=False,
+        mode=mode,
+        session_id=session_id,
+        run_id=run_id,
+    )
 
 
-def run_code_agent(user_request: str, code: str) -> str:
+def run_code_agent(user_request: str, code: str, operations: Optional[list[str]] = None) -> str:
     """Run the code assistant orchestrator for a code-focused request."""
-    return code_orchestrator(user_request=user_request, code=code, stream=False)
+    return code_orchestrator(user_request=user_request, code=code, stream=False, operations=operations)
+
+
+async def run_resume_agent_async(
+    user_input: str,
+    job_description: str = "",
+    mode: Optional[str] = None,
+    session_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> str:
+    """Await the resume assistant orchestrator on the running loop."""
+    return await resume_orchestrator_async(
+        user_input=user_input, job_description=job_description, mode=mode, session_id=session_id, run_id=run_id
+    )
+
+
+async def run_code_agent_async(user_request: str, code: str, operations: Optional[list[str]] = None) -> str:
+    """Await the code assistant orchestrator on the running loop."""
+    return await code_orchestrator_async(user_request=user_request, code=code, operations=operations)
+
+
+def configure_run_limit(max_concurrent_runs: int) -> None:
+    """Set the maximum number of agent pipelines executing at once."""
+    global _max_concurrent_runs, _run_slots
+    if max_concurrent_runs < 1:
+        raise ValueError("max_concurrent_runs must be at least 1")
+    _max_concurrent_runs = max_concurrent_runs
+    _run_slots = None
+
+
+def configure_job_workers(workers: int) -> None:
+    """Set how many background jobs run at once (before the pool starts)."""
+    global _job_workers
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    _job_workers = workers
+
+
+async def _run_job(kind: str, run: Callable[..., Awaitable[str]], args: dict[str, Any]) -> dict[str, Any]:
+    """Run a queued job under a gateway run slot, recording it as its own trace."""
+    with start_trace("job.run", type=kind) as root:
+        async with _get_run_slots():
+            output = await run(**args)
+    result: dict[str, Any] = {"output": output}
+    if root is not None:
+        result["trace_id"] = root.trace_id
+    return result
+
+
+async def _run_resume_job(args: dict[str, Any]) -> dict[str, Any]:
+    """Run a queued resume job."""
+    return await _run_job("resume", run_resume_agent_async, args)
+
+
+async def _run_code_job(args: dict[str, Any]) -> dict[str, Any]:
+    """Run a queued code job."""
+    return await _run_job("code", run_code_agent_async, args)
+
+
+def get_job_pool() -> JobWorkerPool:
+    """Return the process-wide job worker pool (``JOB_STORE_PATH`` / ``AGENT_JOB_WORKERS``)."""
+    global _job_pool
+    if _job_pool is None:
+        path = os.getenv("JOB_STORE_PATH") or str(get_data_dir() / "jobs.sqlite3")
+        _job_pool = JobWorkerPool(
+            JobStore(path, float(os.getenv("AGENT_JOB_LEASE_SECONDS", "60"))),
+            {"resume": _run_resume_job, "code": _run_code_job},
+            workers=_job_workers,
+            retention_seconds=float(os.getenv("AGENT_JOB_RETENTION_SECONDS", str(7 * 24 * 3600))),
+        )
+    return _job_pool
+
+
+def _get_run_slots() -> asyncio.Semaphore:
+    """Create or return the semaphore guarding concurrent pipeline runs."""
+    global _run_slots
+    if _run_slots is None:
+        _run_slots = asyncio.Semaphore(_max_concurrent_runs)
+    return _run_slots
+
+
+def parse_json_body(raw: bytes) -> dict[str, Any]:
+    """Parse a JSON object from a raw request body."""
+    data = raw.decode("utf-8")
+    if not data.strip():
+        return {}
+    parsed = json.loads(data)
+    if not isinstance(parsed, dict):
+        raise ValueError("JSON body must be an object")
+    return parsed
+
+
+def _resolve_job_description(payload: dict[str, Any]) -> Optional[str]:
+    """Return the JD text from ``job_description`` or a registered ``jd_id``."""
+    jd_id = str(payload.get("jd_id", "")).strip()
+    if jd_id:
+        return get_jd_store().get_text(jd_id)
+    return str(payload.get("job_description", ""))
+
+
+class EventStream:
+    """Streaming response body: an async iterator of events sent as SSE or NDJSON."""
+
+    def __init__(self, events: AsyncIterator[dict[str, Any]], fmt: str = "sse") -> None:
+        self.events = events
+        self.fmt = fmt
+        self.trace_id: Optional[str] = None
+
+    @property
+    def content_type(self) -> str:
+        """Return the Content-Type header for the chosen format."""
+        if self.fmt == "ndjson":
+            return "application/x-ndjson; charset=utf-8"
+        return "text/event-stream; charset=utf-8"
+
+    def encode(self, event: dict[str, Any]) -> bytes:
+        """Encode one event in the chosen wire format."""
+        data = json.dumps(event, ensure_ascii=False)
+        if self.fmt == "ndjson":
+            return (data + "\n").encode("utf-8")
+        return f"event: {event.get('event', 'message')}\ndata: {data}\n\n".encode("utf-8")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield encoded events until the stream ends."""
+        async for event in self.events:
+            yield self.encode(event)
+
+
+async def stream_run(
+    run: Callable[[], Awaitable[str]], result_fields: Optional[dict[str, Any]] = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Run a pipeline while yielding its stage/token events, then its result.
+
+    The run holds a concurrency slot for its whole duration and is cancelled
+    if the consumer stops reading (for example, the client disconnects).
+    ``result_fields`` are merged into the final ``result`` event.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _run_with_sink() -> str:
+        with use_event_sink(queue.put_nowait):
+            async with _get_run_slots():
+                return await run()
+
+    task = asyncio.create_task(_run_with_sink())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            break
+        if task.exception() is not None:
+            yield {"event": "error", "error": str(task.exception())}
+        else:
+            yield {"event": "result", "output": task.result(), **(result_fields or {})}
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+class TextResponse:
+    """Plain (non-JSON) response body such as the Prometheus exposition."""
+
+    def __init__(self, body: str, content_type: str = "text/plain; charset=utf-8") -> None:
+        self.body = body.encode("utf-8")
+        self.content_type = content_type
+
+
+def _stream_format(query: dict[str, list[str]], default: str = "sse") -> str:
+    """Return the requested stream format (``sse`` or ``ndjson``)."""
+    fmt = (query.get("format") or [default])[0].lower()
+    return "ndjson" if fmt == "ndjson" else "sse"
+
+
+class RequestError(Exception):
+    """Client error raised while validating a request payload."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _resume_args(payload: dict[str, Any]) -> dict[str, Any]:
+    """Validate a resume request and return orchestrator keyword arguments."""
+    user_input = str(payload.get("user_input", "")).strip()
+    if not user_input:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: user_input")
+    job_description = _resolve_job_description(payload)
+    if job_description is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, "Unknown jd_id")
+    mode = None
+    if payload.get("mode"):
+        mode = normalize_mode(str(payload["mode"]))
+        if mode is None:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST,
+                f"Invalid mode; expected one of: {', '.join(RESUME_MODES)}",
+            )
+    args = {"user_input": user_input, "job_description": job_description, "mode": mode}
+    session_id = _session_id(payload)
+    if session_id:
+        args["session_id"] = session_id
+    run_id = _run_id(payload)
+    if run_id:
+        args["run_id"] = run_id
+    return args
+
+
+def _session_id(payload: dict[str, Any]) -> Optional[str]:
+    """Return the request's session id, minting one for ``"session": true``."""
+    if payload.get("session_id"):
+        session_id = str(payload["session_id"])
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "session_id must be 1-64 letters, digits, '-' or '_'")
+        return session_id
+    if payload.get("session") is True:
+        return new_session_id()
+    return None
+
+
+def _run_id(payload: dict[str, Any]) -> Optional[str]:
+    """Return the caller's checkpoint ``run_id``, if any."""
+    if not payload.get("run_id"):
+        return None
+    run_id = str(payload["run_id"])
+    if not RUN_ID_PATTERN.match(run_id):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "run_id must be 1-128 letters, digits, '-', '_' or ':'")
+    return run_id
+
+
+def _code_args(payload: dict[str, Any]) -> dict[str, Any]:
+    """Validate a code request and return orchestrator keyword arguments."""
+    user_request = str(payload.get("user_request", "")).strip()
+    code = str(payload.get("code", ""))
+    if not user_request:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: user_request")
+    if not code.strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: code")
+    operations = payload.get("operations")
+    if operations is not None:
+        if not isinstance(operations, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "operations must be a list")
+        try:
+            operations = list(normalize_operations(operations) or ()) or None
+        except ValueError as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+    return {"user_request": user_request, "code": code, "operations": operations}
+
+
+async def _run_coalesced(route: str, args: dict[str, Any], run: Callable[..., Awaitable[str]]) -> str:
+    """Run a pipeline once per distinct validated request, sharing in-flight results.
+
+    The shared execution is recorded in the trace of the request that
+    started it; requests that joined it link to that trace through their
+    span's ``execution_trace_id``. Its events reach every caller's event sink.
+    """
+    caller = current_span()
+
+    async def _execute(publish: Callable[[dict[str, Any]], None]) -> tuple[str, Optional[str]]:
+        # Runs in SingleFlight's neutral context, so re-attach the starting request's span.
+        with use_span(caller), trace_span("gateway.execution", route=route) as span, use_event_sink(publish):
+            async with _get_run_slots():
+                output = await run(**args)
+        return output, span.trace_id if span is not None else None
+
+    output, trace_id = await _coalescer.do(canonical_key(route, args), _execute, current_event_sink())
+    if caller is not None and trace_id is not None and trace_id != caller.trace_id:
+        caller.set(execution_trace_id=trace_id)
+    return output
+
+
+async def _handle_resume_run(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Validate and execute a resume pipeline request."""
+    args = _resume_args(payload)
+    output = await _run_coalesced("/v1/resume/run", args, run_resume_agent_async)
+    if args.get("session_id"):
+        return HTTPStatus.OK, {"output": output, "session_id": args["session_id"]}
+    return HTTPStatus.OK, {"output": output}
+
+
+async def _handle_code_run(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Validate and execute a code assistant request."""
+    args = _code_args(payload)
+    output = await _run_coalesced("/v1/code/run", args, run_code_agent_async)
+    return HTTPStatus.OK, {"output": output}
+
+
+async def _handle_submit_job(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Queue a resume or code run and return its job id immediately."""
+    kind = str(payload.get("type", "")).strip().lower()
+    if kind == "resume":
+        args = _resume_args(payload)
+        # Checkpoint every queued resume run so a job re-queued after a restart resumes mid-pipeline.
+        args.setdefault("run_id", new_run_id())
+    elif kind == "code":
+        args = _code_args(payload)
+    else:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "type must be 'resume' or 'code'")
+    pool = get_job_pool()
+    await pool.start()
+    job = pool.submit(kind, args)
+    if args.get("session_id"):
+        job = {**job, "session_id": args["session_id"]}
+    return HTTPStatus.ACCEPTED, job
+
+
+async def _handle_get_job(job_id: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Return a job's status and result, long-polling with ``?wait=<seconds>``."""
+    try:
+        wait = float((query.get("wait") or ["0"])[0])
+    except ValueError as exc:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "wait must be a number of seconds") from exc
+    job = await get_job_pool().wait(job_id, min(max(wait, 0.0), MAX_JOB_WAIT_SECONDS))
+    if job is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, "Unknown job id")
+    return HTTPStatus.OK, job
+
+
+async def _handle_get_trace(trace_id: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Return a recorded request trace as a JSON waterfall."""
+    trace = get_trace_store().get(trace_id)
+    if trace is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, "Unknown or evicted trace id")
+    return HTTPStatus.OK, trace.waterfall()
+
+
+async def _handle_get_session(session_id: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Return the stored state of a resume session."""
+    state = get_session_store().get(session_id)
+    if state is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, "Unknown or expired session id")
+    return HTTPStatus.OK, {"session_id": session_id, **{key: to_jsonable(value) for key, value in state.items()}}
+
+
+async def _handle_stats(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Report coalescing, job queue, response cache, scheduler, session, and checkpoint counters."""
+    return HTTPStatus.OK, {
+        "coalescing": _coalescer.as_dict(),
+        "jobs": get_job_pool().stats(),
+        "cache": get_cache_stats(),
+        "scheduler": scheduler_stats(),
+        "sessions": get_session_store().stats(),
+        "checkpoints": get_checkpoint_store().stats(),
+    }
+
+
+async def _handle_resume_stream(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Stream stage and writer/reviewer token events for a resume run."""
+    args = _resume_args(payload)
+    session = {"session_id": args["session_id"]} if args.get("session_id") else None
+    events = stream_run(lambda: run_resume_agent_async(**args), session)
+    return HTTPStatus.OK, EventStream(events, _stream_format(query))
+
+
+async def _handle_code_stream(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Stream participant stage and token events for a code assistant run."""
+    args = _code_args(payload)
+    events = stream_run(lambda: run_code_agent_async(**args))
+    return HTTPStatus.OK, EventStream(events, _stream_format(query))
+
+
+async def _handle_resume_batch(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Tailor a list of resumes to one JD, streaming NDJSON results as they finish."""
+    user_inputs = payload.get("user_inputs")
+    if not isinstance(user_inputs, list) or not user_inputs:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: user_inputs (non-empty list)")
+    user_inputs = [str(item) for item in user_inputs]
+    if not all(item.strip() for item in user_inputs):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "user_inputs must not contain empty items")
+    job_description = _resolve_job_description(payload)
+    if job_description is None:
+        raise RequestError(HTTPStatus.NOT_FOUND, "Unknown jd_id")
+    if not job_description.strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: job_description or jd_id")
+    try:
+        concurrency = int(payload["concurrency"]) if payload.get("concurrency") else None
+    except (TypeError, ValueError) as exc:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "concurrency must be an integer") from exc
+    if concurrency is not None:
+        concurrency = max(1, min(concurrency, _max_concurrent_runs))
+    run_id = _run_id(payload)
+
+    async def _events() -> AsyncIterator[dict[str, Any]]:
+        # The whole batch occupies one gateway run slot; its own limit bounds items.
+        async with _get_run_slots():
+            async for event in resume_batch_orchestrator_async(user_inputs, job_description, concurrency, run_id):
+                yield event
+
+    return HTTPStatus.OK, EventStream(_events(), _stream_format(query, default="ndjson"))
+
+
+async def _handle_resume_multi(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Tailor one resume to many JDs (texts, a keyed map, or registered jd_ids)."""
+    user_input = str(payload.get("user_input", "")).strip()
+    if not user_input:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: user_input")
+    raw_jobs = payload.get("job_descriptions") or []
+    if isinstance(raw_jobs, dict):
+        jobs = {str(key): str(text) for key, text in raw_jobs.items()}
+    elif isinstance(raw_jobs, list):
+        jobs = {f"jd_{index}": str(text) for index, text in enumerate(raw_jobs)}
+    else:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "job_descriptions must be a list or an object")
+    for jd_id in payload.get("jd_ids") or []:
+        text = get_jd_store().get_text(str(jd_id))
+        if text is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown jd_id: {jd_id}")
+        jobs[str(jd_id)] = text
+    if not jobs or not all(text.strip() for text in jobs.values()):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Provide non-empty job_descriptions or jd_ids")
+    try:
+        concurrency = int(payload["concurrency"]) if payload.get("concurrency") else None
+    except (TypeError, ValueError) as exc:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "concurrency must be an integer") from exc
+    if concurrency is not None:
+        concurrency = max(1, min(concurrency, _max_concurrent_runs))
+    async with _get_run_slots():
+        result = await resume_multi_jd_orchestrator_async(user_input, jobs, concurrency)
+    return HTTPStatus.OK, result
+
+
+async def _handle_resume_score(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Score a resume's keyword coverage locally against a job analysis."""
+    resume = str(payload.get("resume", ""))
+    if not resume.strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Missing required field: resume")
+    job_analysis = payload.get("job_analysis")
+    if job_analysis and not isinstance(job_analysis, (str, dict)):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "job_analysis must be an object or a JSON string")
+    if not job_analysis:
+        jd_id = str(payload.get("jd_id", "")).strip()
+        job_description = str(payload.get("job_description", ""))
+        if jd_id:
+            job_analysis = get_jd_store().get_analysis(jd_id)
+            if job_analysis is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, "Unknown or unanalyzed jd_id")
+        elif job_description.strip():
+            # Stored analyses make this free; an unseen JD costs one analyzer call.
+            async with _get_run_slots():
+                job_analysis = await analyze_job_with_store(job_description)
+        else:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Provide job_analysis, jd_id, or job_description")
+    result = score_resume(resume, job_analysis)
+    if result is None:
+        raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, "job_analysis has no skills or keywords to score")
+    return HTTPStatus.OK, result
+
+
+async def _handle_register_jd(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Register (and by default pre-analyze) a job description for reuse by id."""
+    job_description = str(payload.get("job_description", ""))
+    if not job_description.strip():
+        return HTTPStatus.BAD_REQUEST, {"error": "Missing required field: job_description"}
+    analyze = bool(payload.get("analyze", True))
+    async with _get_run_slots():
+        result = await register_job_description(job_description, analyze=analyze)
+    return HTTPStatus.OK, result
+
+
+async def _handle_metrics(payload: dict[str, Any], query: dict[str, list[str]]) -> tuple[int, Any]:
+    """Expose Prometheus metrics in the text exposition format."""
+    return HTTPStatus.OK, TextResponse(render_metrics(), METRICS_CONTENT_TYPE)
+
+
+def _gateway_families():
+    """Yield scrape-time metric families for coalescing, jobs, scheduler, and cache."""
+    coalescing = _coalescer.as_dict()
+    yield (
+        "agent_gateway_coalesced_requests_total",
+        "counter",
+        "Run requests that joined an identical in-flight execution.",
+        [({"route": route}, counters["coalesced"]) for route, counters in coalescing["by_route"].items()],
+    )
+    yield (
+        "agent_gateway_coalesced_in_flight",
+        "gauge",
+        "Distinct run executions currently shared by coalesced requests.",
+        [({}, coalescing["in_flight"])],
+    )
+    if _job_pool is not None:
+        yield (
+            "agent_jobs",
+            "gauge",
+            "Background jobs by status.",
+            [({"status": status}, count) for status, count in _job_pool.store.counts().items()],
+        )
+    for name, field in (("retries", "retries"), ("throttled", "throttled"), ("failures", "failures")):
+        yield (
+            f"agent_scheduler_{name}_total",
+            "counter",
+            f"Scheduler {name} per deployment.",
+            [({"deployment": deployment}, stats[field]) for deployment, stats in scheduler_stats().items()],
+        )
+    yield from cache_families(get_cache_stats())
+
+
+REGISTRY.add_callback(_gateway_families)
+
+_GET_ROUTES = {
+    "/v1/stats": _handle_stats,
+    "/metrics": _handle_metrics,
+}
+_POST_ROUTES = {
+    "/v1/resume/run": _handle_resume_run,
+    "/v1/code/run": _handle_code_run,
+    "/v1/jds": _handle_register_jd,
+    "/v1/resume/stream": _handle_resume_stream,
+    "/v1/code/stream": _handle_code_stream,
+    "/v1/resume/batch": _handle_resume_batch,
+    "/v1/resume/multi": _handle_resume_multi,
+    "/v1/resume/score": _handle_resume_score,
+    "/v1/jobs": _handle_submit_job,
+}
+# Prefix routes whose remaining path segment is passed to the handler as an id.
+_GET_ITEM_ROUTES = {
+    "/v1/jobs/": _handle_get_job,
+    "/v1/traces/": _handle_get_trace,
+    "/v1/sessions/": _handle_get_session,
+}
+
+
+def _route_label(method: str, route: str) -> str:
+    """Return a bounded-cardinality route name for metrics."""
+    if route == "/health" or route in (_GET_ROUTES if method == "GET" else _POST_ROUTES):
+        return route
+    if method == "GET":
+        for prefix in _GET_ITEM_ROUTES:
+            if route.startswith(prefix):
+                return prefix + "{id}"
+    return "unmatched"
+
+
+async def _observe_stream(
+    events: AsyncIterator[dict[str, Any]],
+    context: contextvars.Context,
+    method: str,
+    label: str,
+    status: int,
+    started: float,
+    root: Optional[Span],
+) -> AsyncIterator[dict[str, Any]]:
+    """Pass events through, recording request metrics and closing the trace when the stream ends.
+
+    Each step runs in ``context`` (captured inside the request's trace), so
+    spans recorded while producing events attach to the request even when
+    the server pulls every chunk from a different task.
+    """
+    error: Optional[str] = None
+    try:
+        while True:
+            try:
+                event = await context.run(asyncio.ensure_future, events.__anext__())
+            except StopAsyncIteration:
+                break
+            if event.get("event") == "error":
+                error = str(event.get("error"))
+            if root is not None and event.get("event") in ("result", "error", "summary"):
+                event = {**event, "trace_id": root.trace_id}
+            yield event
+    finally:
+        await context.run(asyncio.ensure_future, events.aclose())
+        _record_request(method, label, status, started)
+        finish_trace(root, error)
+
+
+def _record_request(method: str, label: str, status: int, started: float) -> None:
+    """Record a finished request's count and latency."""
+    REQUESTS_IN_FLIGHT.dec(route=label)
+    REQUESTS.inc(method=method, route=label, status=str(int(status)))
+    REQUEST_LATENCY.observe(time.perf_counter() - started, route=label)
+
+
+def _traced(method: str, label: str) -> bool:
+    """Return whether a route's requests get a trace (observability routes do not)."""
+    return label not in ("/health", "/metrics") and not label.startswith("/v1/traces/")
+
+
+async def handle_request(method: str, path: str, payload: dict[str, Any]) -> tuple[int, Any]:
+    """Dispatch a parsed request to its route, recording metrics and a trace.
+
+    Returns the status and either a JSON-serializable dict, a
+    :class:`TextResponse`, or an :class:`EventStream` for streaming routes.
+    JSON bodies and streams carry the request's ``trace_id``. Streamed
+    requests are measured until their last event is sent.
+    """
+    parts = urlsplit(path)
+    label = _route_label(method, parts.path)
+    started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(route=label)
+    root = open_trace("gateway.request", method=method, route=label) if _traced(method, label) else None
+    try:
+        with use_span(root):
+            status, body = await _dispatch_route(method, parts.path, parse_qs(parts.query), payload)
+            context = contextvars.copy_context()
+    except BaseException as exc:
+        _record_request(method, label, HTTPStatus.INTERNAL_SERVER_ERROR, started)
+        finish_trace(root, str(exc) or type(exc).__name__)
+        raise
+    if root is not None:
+        root.set(status=int(status))
+    if isinstance(body, EventStream):
+        body.trace_id = root.trace_id if root is not None else None
+        body.events = _observe_stream(body.events, context, method, label, status, started, root)
+        return status, body
+    _record_request(method, label, status, started)
+    if root is not None:
+        error = body.get("error") if isinstance(body, dict) and int(status) >= 400 else None
+        finish_trace(root, error)
+        if isinstance(body, dict):
+            body = {**body, "trace_id": root.trace_id}
+    return status, body
+
+
+async def _dispatch_route(
+    method: str, route: str, query: dict[str, list[str]], payload: dict[str, Any]
+) -> tuple[int, Any]:
+    """Find and run the handler for ``route``."""
+    try:
+        if method == "GET":
+            if route == "/health":
+                return HTTPStatus.OK, {"status": "ok"}
+            handler = _GET_ROUTES.get(route)
+            if handler is not None:
+                return await handler(payload, query)
+            for prefix, item_handler in _GET_ITEM_ROUTES.items():
+                item_id = route[len(prefix) :] if route.startswith(prefix) else ""
+                if item_id and "/" not in item_id:
+                    return await item_handler(item_id, query)
+        elif method == "POST":
+            handler = _POST_ROUTES.get(route)
+            if handler is not None:
+                return await handler(payload, query)
+        return HTTPStatus.NOT_FOUND, {"error": "Not found"}
+    except RequestError as exc:
+        return exc.status, {"error": str(exc)}
+    except CheckpointConflict as exc:
+        return HTTPStatus.CONFLICT, {"error": str(exc)}
+    except SessionPlanError as exc:
+        return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+    except Exception as exc:  # pragma: no cover
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
 
 
 class AgentGatewayHandler(BaseHTTPRequestHandler):
@@ -42,20 +751,52 @@ class AgentGatewayHandler(BaseHTTPRequestHandler):
         if not raw_len:
             return {}
         length = int(raw_len)
-        data = self.rfile.read(length).decode("utf-8")
-        if not data.strip():
-            return {}
-        parsed = json.loads(data)
-        if not isinstance(parsed, dict):
-            raise ValueError("JSON body must be an object")
-        return parsed
+        return parse_json_body(self.rfile.read(length))
 
-    def do_GET(self) -> None:  # noqa: N802
-        """Handle health checks."""
-        if self.path == "/health":
-            self._send_json(HTTPStatus.OK, {"status": "ok"})
+    def _send_stream(self, status: int, stream: EventStream) -> None:
+        """Write a streaming body chunk by chunk, then close the connection."""
+        self.send_response(status)
+        self.send_header("Content-Type", stream.content_type)
+        self.send_header("Cache-Control", "no-cache")
+        if stream.trace_id:
+            self.send_header("X-Trace-Id", stream.trace_id)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        chunks = stream.chunks()
+        try:
+            while True:
+                try:
+                    chunk = run_coroutine_sync(chunks.__anext__())
+                except StopAsyncIteration:
+                    break
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        finally:
+            run_coroutine_sync(chunks.aclose())
+
+    def _send_text(self, status: int, response: TextResponse) -> None:
+        """Send a plain-text response."""
+        self.send_response(status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        self.wfile.write(response.body)
+
+    def _dispatch(self, method: str, payload: dict[str, Any]) -> None:
+        """Run the shared async router on the background loop and reply."""
+        status, body = run_coroutine_sync(handle_request(method, self.path, payload))
+        if isinstance(body, EventStream):
+            self._send_stream(status, body)
             return
-        self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+        if isinstance(body, TextResponse):
+            self._send_text(status, body)
+            return
+        self._send_json(status, body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Handle health checks and read-only routes."""
+        self._dispatch("GET", {})
 
     def do_POST(self) -> None:  # noqa: N802
         """Handle agent execution requests for resume/code endpoints."""
@@ -67,57 +808,232 @@ class AgentGatewayHandler(BaseHTTPRequestHandler):
         except ValueError as exc:
             self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
             return
+        self._dispatch("POST", payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Keep HTTP logs concise for local integration runs."""
+        super().log_message(format, *args)
+
+
+class AsyncAgentGateway:
+    """Single-loop HTTP/1.1 server that awaits agent workflows directly.
+
+    Connections are kept alive between requests, and every request is
+    handled as a coroutine, so slow LLM-bound runs cost no OS threads.
+    Once a request line arrives, its headers and body must follow within
+    ``read_timeout`` seconds or the connection is closed.
+    """
+
+    server_version = "AgentGateway/1.0"
+    max_header_bytes = 64 * 1024
+    max_body_bytes = 8 * 1024 * 1024
+
+    def __init__(
+        self, host: str = "0.0.0.0", port: int = 8000, keepalive_timeout: float = 15.0, read_timeout: float = 30.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.read_timeout = read_timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def address(self) -> Optional[tuple[str, int]]:
+        """Return the bound ``(host, port)`` once started (useful with port 0)."""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        """Start the job workers and bind the listening socket."""
+        await get_job_pool().start()
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.host,
+            self.port,
+            limit=self.max_header_bytes,
+        )
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Read one request; return ``None`` when the peer closed the connection."""
+        request_line = await asyncio.wait_for(reader.readline(), timeout=self.keepalive_timeout)
+        if not request_line:
+            return None
+        parts = request_line.decode("latin-1").strip().split()
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        method, path, version = parts
+        headers, body = await asyncio.wait_for(self._read_headers_and_body(reader), timeout=self.read_timeout)
+        return method.upper(), path, version, headers, body
 
+    async def _read_headers_and_body(self, reader: asyncio.StreamReader) -> tuple[dict[str, str], bytes]:
+        """Read the header block and a ``Content-Length`` body.
+
+        Raises:
+            RequestError: For chunked request bodies (411), which this server does not decode.
+        """
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() not in ("", "identity"):
+            raise RequestError(
+                HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported; send Content-Length"
+            )
+        length = int(headers.get("content-length") or 0)
+        if length > self.max_body_bytes:
+            raise ValueError("Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return headers, body
+
+    def _keep_alive(self, version: str, headers: dict[str, str]) -> bool:
+        """Apply HTTP/1.0 and HTTP/1.1 connection persistence rules."""
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+    async def _write_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        keep_alive: bool,
+    ) -> None:
+        """Serialize and write a JSON (or :class:`TextResponse`) response."""
+        if isinstance(payload, TextResponse):
+            body, content_type = payload.body, payload.content_type
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Server: {self.server_version}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _write_stream(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        stream: EventStream,
+        keep_alive: bool,
+        chunked: bool = True,
+    ) -> None:
+        """Write a streaming body using chunked transfer encoding.
+
+        Without ``chunked`` (HTTP/1.0 clients) the body is written as is and
+        ends when the connection closes, so the caller must not keep it alive.
+        """
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Server: {self.server_version}\r\n"
+            f"Content-Type: {stream.content_type}\r\n"
+            "Cache-Control: no-cache\r\n"
+            + (f"X-Trace-Id: {stream.trace_id}\r\n" if stream.trace_id else "")
+            + ("Transfer-Encoding: chunked\r\n" if chunked else "")
+            + f"Connection: {'keep-alive' if keep_alive and chunked else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+        await writer.drain()
+        chunks = stream.chunks()
+        try:
+            async for chunk in chunks:
+                writer.write(f"{len(chunk):X}\r\n".encode("latin-1") + chunk + b"\r\n" if chunked else chunk)
+                await writer.drain()
+        finally:
+            await chunks.aclose()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until it closes or idles out."""
         try:
-            if self.path == "/v1/resume/run":
-                user_input = str(payload.get("user_input", "")).strip()
-                job_description = str(payload.get("job_description", ""))
-                if not user_input:
-                    self._send_json(
-                        HTTPStatus.BAD_REQUEST,
-                        {"error": "Missing required field: user_input"},
-                    )
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
                     return
-                output = run_resume_agent(user_input=user_input, job_description=job_description)
-                self._send_json(HTTPStatus.OK, {"output": output})
-                return
-
-            if self.path == "/v1/code/run":
-                user_request = str(payload.get("user_request", "")).strip()
-                code = str(payload.get("code", ""))
-                if not user_request:
-                    self._send_json(
-                        HTTPStatus.BAD_REQUEST,
-                        {"error": "Missing required field: user_request"},
-                    )
+                except RequestError as exc:
+                    await self._write_json(writer, exc.status, {"error": str(exc)}, False)
                     return
-                if not code.strip():
-                    self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Missing required field: code"})
+                except (ValueError, asyncio.LimitOverrunError) as exc:
+                    await self._write_json(writer, HTTPStatus.BAD_REQUEST, {"error": str(exc)}, False)
+                    return
+                if request is None:
                     return
-                output = run_code_agent(user_request=user_request, code=code)
-                self._send_json(HTTPStatus.OK, {"output": output})
-                return
-
-            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
-        except Exception as exc:  # pragma: no cover
-            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
 
-    def log_message(self, format: str, *args: Any) -> None:
-        """Keep HTTP logs concise for local integration runs."""
-        super().log_message(format, *args)
+                method, path, version, headers, body = request
+                keep_alive = self._keep_alive(version, headers)
+                try:
+                    payload = parse_json_body(body) if method == "POST" else {}
+                except json.JSONDecodeError:
+                    status, response = HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON body"}
+                except ValueError as exc:
+                    status, response = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+                else:
+                    status, response = await handle_request(method, path, payload)
+                if isinstance(response, EventStream):
+                    # HTTP/1.0 has no chunked encoding: the stream ends when the connection closes.
+                    chunked = version == "HTTP/1.1"
+                    keep_alive = keep_alive and chunked
+                    await self._write_stream(writer, status, response, keep_alive, chunked)
+                else:
+                    await self._write_json(writer, status, response, keep_alive)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
 
 
 def serve(host: str = "0.0.0.0", port: int = 8000) -> None:
     """Start the gateway HTTP server."""
+    run_coroutine_sync(get_job_pool().start())
     server = ThreadingHTTPServer((host, port), AgentGatewayHandler)
     print(f"Agent gateway listening on http://{host}:{port}")
-    print("Routes: GET /health, POST /v1/resume/run, POST /v1/code/run")
+    print(ROUTES_SUMMARY)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         pass
     finally:
         server.server_close()
+        run_coroutine_sync(get_job_pool().stop())
+
+
+def serve_async(
+    host: str = "0.0.0.0", port: int = 8000, keepalive_timeout: float = 15.0, read_timeout: float = 30.0
+) -> None:
+    """Start the single-loop asyncio gateway server."""
+    gateway = AsyncAgentGateway(host=host, port=port, keepalive_timeout=keepalive_timeout, read_timeout=read_timeout)
+    print(f"Agent gateway (asyncio) listening on http://{host}:{port}")
+    print(ROUTES_SUMMARY)
+    try:
+        asyncio.run(gateway.serve_forever())
+    except KeyboardInterrupt:
+        pass
 
 
 def main() -> None:
@@ -125,8 +1041,45 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Expose resume/code agents over HTTP.")
     parser.add_argument("--host", default="0.0.0.0", help="Bind host (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=8000, help="Bind port (default: 8000)")
+    parser.add_argument(
+        "--server",
+        choices=["async", "threaded"],
+        default="async",
+        help="Server implementation (default: async)",
+    )
+    parser.add_argument(
+        "--max-concurrent-runs",
+        type=int,
+        default=64,
+        help="Maximum agent pipelines running at once (default: 64)",
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=15.0,
+        help="Idle seconds before closing keep-alive connections (async server only, default: 15)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds allowed to send a request's headers and body (async server only, default: 30)",
+    )
+    parser.add_argument(
+        "--job-workers",
+        type=int,
+        default=_job_workers,
+        help="Background jobs run at once from the durable queue (default: AGENT_JOB_WORKERS or 4)",
+    )
     args = parser.parse_args()
-    serve(host=args.host, port=args.port)
+    configure_run_limit(args.max_concurrent_runs)
+    configure_job_workers(args.job_workers)
+    if args.server == "threaded":
+        serve(host=args.host, port=args.port)
+    else:
+        serve_async(
+            host=args.host, port=args.port, keepalive_timeout=args.keepalive_timeout, read_timeout=args.read_timeout
+        )
 
 
 if __name__ == "__main__":
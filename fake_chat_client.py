@@ -0,0 +1,310 @@
+"""Deterministic offline stand-in for ``AzureOpenAIChatClient``.
+
+Select it with ``AGENT_CLIENT=fake`` (see ``agent_framework_utils.get_client``)
+to run the orchestrators, gateway, demos, and benchmarks without Azure.
+Agents return canned, schema-valid outputs keyed by agent name after a
+simulated latency drawn from a configurable distribution:
+
+- ``FAKE_LLM_LATENCY``: ``0.5``, ``fixed:0.5``, ``uniform:0.2,0.8``,
+  ``normal:1.0,0.2``, ``lognormal:1.0,0.5`` (median, sigma) or ``exp:0.5``
+- ``FAKE_LLM_LATENCY_BY_AGENT``: JSON object of per-agent overrides
+- ``FAKE_LLM_SEED``: seed for the latency RNG (default 0)
+- ``FAKE_LLM_STREAM_CHUNK_CHARS``: characters per streamed update (default 16)
+- ``FAKE_LLM_ERROR_RATE``: fraction of calls failing with a 429 (default 0)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+_COLLECTOR_OUTPUT = {
+    "name": "Alex Doe",
+    "education": ["BSc Computer Science, Example University (2018 - 2022)"],
+    "skills": ["Python", "Go", "PostgreSQL", "Docker", "Kubernetes", "AWS"],
+    "experience": [
+        "Backend Engineer | Example Corp | 2022 - Present\n  - Built REST APIs serving 2M requests/day",
+        "Software Intern | Sample Ltd | 2021\n  - Automated CI pipelines with GitLab",
+    ],
+    "projects": ["Payments sandbox: event-driven ledger using Kafka"],
+    "certifications": ["AWS Certified Developer - Associate"],
+    "summary": "Backend engineer focused on reliable distributed services.",
+}
+
+_ANALYZER_OUTPUT = {
+    "role": "Senior Backend Engineer",
+    "required_skills": ["Python", "Go", "Microservices", "PostgreSQL", "Redis", "Docker", "Kubernetes"],
+    "preferred_skills": ["AWS", "Kafka", "RabbitMQ", "Mentoring"],
+    "keywords": ["distributed systems", "payments", "CI/CD", "scalable APIs"],
+    "experience_level": "Senior",
+    "domain": "FinTech",
+}
+
+_WRITER_OUTPUT = r"""\documentclass[11pt]{article}
+\usepackage[margin=0.75in]{geometry}
+\begin{document}
+\begin{center}{\Large Alex Doe}\end{center}
+\section*{Summary}
+Backend engineer building scalable APIs and distributed systems for payments.
+\section*{Skills}
+Python, Go, PostgreSQL, Redis, Docker, Kubernetes, AWS, Kafka
+\section*{Experience}
+\textbf{Backend Engineer}, Example Corp \hfill 2022 -- Present
+\begin{itemize}
+  \item Built microservices and REST APIs serving 2M requests/day.
+  \item Introduced CI/CD pipelines with containerized deployments.
+\end{itemize}
+\section*{Education}
+BSc Computer Science, Example University \hfill 2018 -- 2022
+\end{document}
+"""
+
+_CONTENT_WRITER_OUTPUT = {
+    "name": "Alex Doe",
+    "contact": ["alex@example.com", "github.com/alexdoe"],
+    "sections": [
+        {"title": "Summary", "text": "Backend engineer building scalable APIs and distributed systems for payments."},
+        {"title": "Skills", "lines": ["Python, Go, PostgreSQL, Redis, Docker, Kubernetes, AWS, Kafka"]},
+        {
+            "title": "Experience",
+            "entries": [
+                {
+                    "title": "Backend Engineer",
+                    "org": "Example Corp",
+                    "date": "2022 - Present",
+                    "bullets": [
+                        "Built microservices and REST APIs serving 2M requests/day.",
+                        "Introduced CI/CD pipelines with containerized deployments.",
+                    ],
+                }
+            ],
+        },
+        {
+            "title": "Education",
+            "entries": [{"title": "BSc Computer Science", "org": "Example University", "date": "2018 - 2022"}],
+        },
+    ],
+}
+
+_SECTION_PROMPT = re.compile(r"^Section: (\w+)\nSection Data: (.*)$", re.MULTILINE)
+
+
+def _section_writer_output(prompt: str) -> str:
+    """Echo the prompted section back as section JSON (per-section writer)."""
+    match = _SECTION_PROMPT.search(prompt)
+    if match is None:
+        return json.dumps({"title": "Section", "text": prompt[:80]})
+    name, data = match.group(1), json.loads(match.group(2))
+    title = name.title()
+    if name == "summary":
+        return json.dumps({"title": title, "text": data.get("summary") or _COLLECTOR_OUTPUT["summary"]})
+    if name in ("experience", "projects", "education"):
+        entries = []
+        for item in data:
+            lines = [line.strip(" -") for line in str(item).splitlines() if line.strip(" -")]
+            entries.append({"title": lines[0] if lines else "", "bullets": lines[1:]})
+        return json.dumps({"title": title, "entries": entries}, ensure_ascii=False)
+    return json.dumps({"title": title, "lines": data}, ensure_ascii=False)
+
+
+_REVIEWER_OUTPUT = """## Overall Score
+8/10 - Strong backend alignment; a few keywords are missing.
+
+## Strengths
+- Clear microservices and API experience
+- Cloud and container skills match the role
+
+## Areas for Improvement
+- Quantify impact on reliability and latency
+- Mention mentoring or technical leadership
+
+## Keyword Gaps
+- RabbitMQ
+- payments
+
+## Rewrite Suggestions
+- "Built REST APIs" -> "Designed and scaled REST APIs handling 2M requests/day"
+"""
+
+# Values are fixed text or a function of the prompt.
+CANNED_OUTPUTS: dict[str, Union[str, Callable[[str], str]]] = {
+    "resume_info_collector": json.dumps(_COLLECTOR_OUTPUT, ensure_ascii=False),
+    "resume_job_analyzer": json.dumps(_ANALYZER_OUTPUT, ensure_ascii=False),
+    "resume_writer": _WRITER_OUTPUT,
+    "resume_content_writer": json.dumps(_CONTENT_WRITER_OUTPUT, ensure_ascii=False, separators=(",", ":")),
+    "resume_section_writer": _section_writer_output,
+    "resume_reviser": json.dumps(_CONTENT_WRITER_OUTPUT, ensure_ascii=False, separators=(",", ":")),
+    "resume_reviewer": _REVIEWER_OUTPUT,
+    "resume_assistant_router": "FULL_PIPELINE",
+    "code_explainer": (
+        "## Overview\nThe code defines small helpers that transform numeric input.\n\n"
+        "## Step by step\n1. `calculate` adds two values.\n2. `process_data` doubles positive items.\n"
+    ),
+    "code_refactor": (
+        "```python\ndef process_data(items: list[int]) -> list[int]:\n"
+        "    return [item * 2 for item in items if item > 0]\n```\n\n"
+        "- Replaced the loop with a comprehension\n- Added type hints\n"
+    ),
+    "code_documenter": (
+        '```python\ndef calculate(x, y):\n    """Return the sum of ``x`` and ``y``."""\n'
+        "    return x + y\n```\n"
+    ),
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Return a sampler (seconds) for a latency spec such as ``uniform:0.2,0.8``.
+
+    Raises:
+        ValueError: If the distribution name or parameters are invalid.
+    """
+    kind, _, raw = spec.strip().partition(":")
+    if not raw:
+        kind, raw = "fixed", kind
+    params = [float(part) for part in raw.split(",") if part.strip()]
+    kind = kind.lower()
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal" and len(params) == 2:
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    if kind in ("exp", "exponential") and len(params) == 1:
+        return lambda rng: rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+class _Usage:
+    """Token usage in the shape of ``usage_details`` on framework responses."""
+
+    def __init__(self, input_token_count: int, output_token_count: int) -> None:
+        self.input_token_count = input_token_count
+        self.output_token_count = output_token_count
+
+
+class FakeResponse:
+    """Minimal agent response exposing ``text`` and ``usage_details``."""
+
+    def __init__(self, text: str, usage: _Usage) -> None:
+        self.text = text
+        self.usage_details = usage
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class FakeUpdate:
+    """One streamed text delta."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class FakeThrottleError(Exception):
+    """Simulated 429 carrying ``status_code`` and ``Retry-After`` like the SDK errors."""
+
+    def __init__(self, retry_after: float = 0.05) -> None:
+        super().__init__("Rate limit is exceeded (simulated).")
+        self.status_code = 429
+        self.response = type("Response", (), {"status_code": 429, "headers": {"retry-after": str(retry_after)}})()
+
+
+class FakeAgent:
+    """Agent returning canned output for its name after a simulated delay."""
+
+    def __init__(self, client: "FakeChatClient", name: str, instructions: str, tools: Any = None) -> None:
+        self.client = client
+        self.name = name
+        self.instructions = instructions
+        self.tools = tools
+
+    def _output(self, prompt: str) -> str:
+        """Return the canned output for this agent."""
+        output = self.client.outputs.get(self.name, f"[{self.name}] {prompt[:80]}")
+        return output(prompt) if callable(output) else output
+
+    def _usage(self, prompt: str, text: str) -> _Usage:
+        """Approximate token usage (about 4 characters per token)."""
+        return _Usage(max(1, len(self.instructions + prompt) // 4), max(1, len(text) // 4))
+
+    def run(self, prompt: str, stream: bool = False, **kwargs: Any):
+        """Return an awaitable response, or an async iterator of updates when ``stream``."""
+        if stream:
+            return self.run_stream(prompt, **kwargs)
+        return self._run(prompt)
+
+    async def _run(self, prompt: str) -> FakeResponse:
+        """Return the canned response after the sampled latency."""
+        delay = self.client.begin_call(self.name)
+        await asyncio.sleep(delay)
+        text = self._output(prompt)
+        return FakeResponse(text, self._usage(prompt, text))
+
+    async def run_stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[FakeUpdate]:
+        """Yield the canned output in chunks spread across the sampled latency."""
+        delay = self.client.begin_call(self.name)
+        text = self._output(prompt)
+        size = self.client.chunk_chars
+        chunks = [text[i : i + size] for i in range(0, len(text), size)] or [""]
+        # A quarter of the latency before the first token, the rest spread over the stream.
+        await asyncio.sleep(delay * 0.25)
+        gap = delay * 0.75 / len(chunks)
+        for chunk in chunks:
+            yield FakeUpdate(chunk)
+            await asyncio.sleep(gap)
+
+
+class FakeChatClient:
+    """Drop-in replacement for ``AzureOpenAIChatClient.as_agent`` without network calls."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0.05",
+        latency_by_agent: Optional[dict[str, str]] = None,
+        seed: int = 0,
+        chunk_chars: int = 16,
+        error_rate: float = 0.0,
+        outputs: Optional[dict[str, Union[str, Callable[[str], str]]]] = None,
+    ) -> None:
+        self.default_latency = parse_latency(latency)
+        self.latency_by_agent = {name: parse_latency(spec) for name, spec in (latency_by_agent or {}).items()}
+        self.chunk_chars = max(1, chunk_chars)
+        self.error_rate = error_rate
+        self.outputs = {**CANNED_OUTPUTS, **(outputs or {})}
+        self.calls: dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FakeChatClient":
+        """Build a client from the ``FAKE_LLM_*`` environment variables."""
+        return cls(
+            latency=os.getenv("FAKE_LLM_LATENCY", "fixed:0.05"),
+            latency_by_agent=json.loads(os.getenv("FAKE_LLM_LATENCY_BY_AGENT") or "{}"),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            chunk_chars=int(os.getenv("FAKE_LLM_STREAM_CHUNK_CHARS", "16")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+        )
+
+    def as_agent(self, name: str, instructions: str, tools: Any = None, default_options: Any = None) -> FakeAgent:
+        """Create a fake agent bound to this client (``default_options`` such as a response format are ignored)."""
+        return FakeAgent(self, name, instructions, tools)
+
+    def begin_call(self, name: str) -> float:
+        """Count a call and return its sampled latency, or raise a simulated 429."""
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            sampler = self.latency_by_agent.get(name, self.default_latency)
+            delay = sampler(self._rng)
+            throttled = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if throttled:
+            raise FakeThrottleError()
+        return delay
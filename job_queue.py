@@ -0,0 +1,323 @@
+"""SQLite-backed durable job queue drained by an asyncio worker pool.
+
+Jobs are written to disk before they are acknowledged, so accepting one
+costs a single insert and queued work survives a gateway restart. A
+claimed job carries its worker's id and a lease that the worker renews
+while the job runs; jobs whose lease expired (their process died) are
+re-queued, up to ``max_attempts`` tries, and live jobs of other processes
+sharing the store are left alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+JobRunner = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class JobStore:
+    """Durable table of jobs and their status, arguments, and results.
+
+    Each store instance is one worker identity: jobs it claims are leased
+    to ``worker_id`` for ``lease_seconds`` and must be renewed with
+    :meth:`heartbeat`.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.worker_id = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, args TEXT NOT NULL, status TEXT NOT NULL, "
+            "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, worker TEXT, lease_until REAL)"
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("worker", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def enqueue(self, kind: str, args: dict[str, Any]) -> dict[str, Any]:
+        """Persist a new queued job and return its public view."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, args, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(args, ensure_ascii=False), QUEUED, time.time()),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def claim(self) -> Optional[dict[str, Any]]:
+        """Lease the oldest queued job to this worker and return it with its arguments.
+
+        The update only applies while the row is still queued, so when
+        another process claims the same row first this moves on to the next.
+        """
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, worker = ?, "
+                    "lease_until = ? WHERE id = ? AND status = ?",
+                    (RUNNING, now, self.worker_id, now + self.lease_seconds, row["id"], QUEUED),
+                )
+                self._conn.commit()
+                if cursor.rowcount == 1:
+                    break
+            claimed = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        job = self._view(claimed)
+        job["args"] = json.loads(claimed["args"])
+        return job
+
+    def heartbeat(self) -> int:
+        """Renew the lease on every job this worker is running."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, self.worker_id, RUNNING),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None) -> bool:
+        """Record a job's result, or its error if ``error`` is given.
+
+        Returns ``False`` if the job is no longer leased to this worker (its
+        lease expired and it was re-queued), in which case nothing is written.
+        """
+        status = FAILED if error is not None else SUCCEEDED
+        payload = None if error is not None else json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status = ? AND worker = ?",
+                (status, payload, error, time.time(), job_id, RUNNING, self.worker_id),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Return the public view of a job, or ``None`` if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._view(row) if row is not None else None
+
+    def recover(self, max_attempts: int) -> int:
+        """Re-queue running jobs whose lease expired; fail exhausted ones.
+
+        Jobs still leased (by this or another live process) are untouched.
+        """
+        now = time.time()
+        expired = "status = ? AND (lease_until IS NULL OR lease_until < ?)"
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL "
+                f"WHERE {expired} AND attempts >= ?",
+                (FAILED, "Job interrupted too many times", now, RUNNING, now, max_attempts),
+            )
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET status = ?, started_at = NULL, worker = NULL, lease_until = NULL WHERE {expired}",
+                (QUEUED, RUNNING, now),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def release(self) -> int:
+        """Re-queue the jobs this worker is running (used on a clean shutdown)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker = NULL, lease_until = NULL "
+                "WHERE worker = ? AND status = ?",
+                (QUEUED, self.worker_id, RUNNING),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Delete finished jobs older than the retention window."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (*FINISHED, time.time() - older_than_seconds),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of jobs in each status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, *FINISHED)}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    @staticmethod
+    def _view(row: sqlite3.Row) -> dict[str, Any]:
+        """Convert a row into the job's public JSON shape."""
+        job = {
+            "job_id": row["id"],
+            "type": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["status"] == SUCCEEDED and row["result"] is not None:
+            job["result"] = json.loads(row["result"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobWorkerPool:
+    """Drain a :class:`JobStore` with ``workers`` coroutines on one event loop.
+
+    ``runners`` maps a job type to a coroutine function taking the job's
+    arguments. Workers wake immediately on :meth:`submit` and also poll,
+    so jobs enqueued by another process are picked up too. A heartbeat task
+    renews this pool's leases and re-queues jobs whose lease expired.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runners: dict[str, JobRunner],
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        max_attempts: int = 3,
+        retention_seconds: float = 7 * 24 * 3600,
+    ) -> None:
+        self.store = store
+        self.runners = runners
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._tasks: list[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: dict[str, set[asyncio.Event]] = {}
+
+    @property
+    def running(self) -> bool:
+        """Return whether worker tasks have been started."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Recover interrupted jobs and start the workers on the running loop."""
+        if self._tasks:
+            return
+        self.store.recover(self.max_attempts)
+        if self.retention_seconds > 0:
+            self.store.purge(self.retention_seconds)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._heartbeat_task = asyncio.ensure_future(self._heartbeat())
+
+    async def stop(self) -> None:
+        """Cancel the workers and re-queue the jobs they were running."""
+        tasks, self._tasks = self._tasks, []
+        if self._heartbeat_task is not None:
+            tasks.append(self._heartbeat_task)
+            self._heartbeat_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.store.release()
+
+    def submit(self, kind: str, args: dict[str, Any]) -> dict[str, Any]:
+        """Persist a job and wake a worker; returns immediately."""
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job type: {kind}")
+        job = self.store.enqueue(kind, args)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict[str, Any]]:
+        """Long-poll: return the job once finished or after ``timeout`` seconds."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED or timeout <= 0:
+            return job
+        event = asyncio.Event()
+        waiters = self._finished.setdefault(job_id, set())
+        waiters.add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters.discard(event)
+            if not waiters and self._finished.get(job_id) is waiters:
+                del self._finished[job_id]
+        return self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            job = self.store.claim()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _heartbeat(self) -> None:
+        """Renew this pool's leases and recover expired ones until cancelled."""
+        interval = max(0.1, self.store.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            self.store.heartbeat()
+            if self.store.recover(self.max_attempts) and self._wakeup is not None:
+                self._wakeup.set()
+
+    async def _run(self, job: dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome."""
+        try:
+            result = await self.runners[job["type"]](job["args"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.store.finish(job["job_id"], error=str(exc) or type(exc).__name__)
+        else:
+            self.store.finish(job["job_id"], result=result)
+        for event in self._finished.pop(job["job_id"], ()):
+            event.set()
+
+    def stats(self) -> dict[str, Any]:
+        """Return worker count and per-status job counts."""
+        return {"workers": self.workers if self.running else 0, "jobs": self.store.counts()}
@@ -1,13 +1,42 @@
-"""Resume assistant agents and synchronous execution helpers."""
+"""Resume assistant agents with async and synchronous execution helpers."""
 
 from __future__ import annotations
 
-from agent_framework_utils import create_agent, run_agent_sync
+import asyncio
+import json
+import os
+from typing import Any, Optional, TypeVar, Union
+
+from agent_framework_utils import create_agent, emit_event, run_agent, run_agent_sync, run_coroutine_sync, tag_events
+from agent_tracing import annotate_span
+from .ats import format_coverage, score_resume
+from .latex_templates import render_resume
+from .models import (
+    JOB_ANALYSIS_FORMAT,
+    USER_PROFILE_FORMAT,
+    AnalysisLike,
+    JobAnalysis,
+    ProfileLike,
+    SchemaError,
+    UserProfile,
+)
+from .resume_parser import PROFILE_FIELDS, ProfileParse, parse_resume
+from .sections import assemble, load_profile, parse_section, section_inputs, section_prompt
 
 _agent_collector = None
 _agent_analyzer = None
 _agent_writer = None
+_agent_content_writer = None
+_agent_section_writer = None
+_agent_reviser = None
 _agent_reviewer = None
+_agent_router = None
+
+# "sections": one cached call per profile section; "structured": one call for all content JSON
+# (both rendered by latex_templates); "latex": the model writes the whole document.
+WRITER_MODE = os.getenv("RESUME_WRITER_MODE", "sections").strip().lower()
+
+_Model = TypeVar("_Model", UserProfile, JobAnalysis)
 
 
 def _get_collector():
@@ -38,6 +67,7 @@ def _get_collector():
                 "  \"summary\": \"brief professional summary string or null\"\n"
                 "}"
             ),
+            response_format=USER_PROFILE_FORMAT,
         )
     return _agent_collector
 
@@ -62,6 +92,7 @@ def _get_analyzer():
                 "}\n\n"
                 "Do not include markdown formatting. Just return the raw JSON string."
             ),
+            response_format=JOB_ANALYSIS_FORMAT,
         )
     return _agent_analyzer
 
@@ -87,6 +118,32 @@ def _get_writer():
     return _agent_writer
 
 
+def _get_content_writer():
+    """Create or return the cached structured-content resume writer agent."""
+    global _agent_content_writer
+    if _agent_content_writer is None:
+        _agent_content_writer = create_agent(
+            name="resume_content_writer",
+            instructions=(
+                "You are an expert Resume Writer.\n"
+                "Write the content of a one-page resume tailored to the 'Job Analysis' from the 'User Profile'.\n"
+                "Return ONLY compact JSON (no LaTeX, no Markdown, no code fences) with this structure:\n"
+                '{"name":"","contact":[""],"sections":['
+                '{"title":"Summary","text":""},'
+                '{"title":"Skills","lines":["Category: skill, skill"]},'
+                '{"title":"Experience","entries":[{"title":"","org":"","location":"","date":"","bullets":[""]}]}'
+                "]}\n\n"
+                "Instructions:\n"
+                "- Order sections and bullets by relevance to the job; use 'entries' for Education, Experience, "
+                "and Projects.\n"
+                "- Use professional, action-oriented language and the job's keywords where truthful.\n"
+                "- Write plain text only; layout and escaping are handled by the renderer.\n"
+                "- Omit fields that are unknown instead of using placeholders."
+            ),
+        )
+    return _agent_content_writer
+
+
 def _get_reviewer():
     """Create or return the cached resume reviewer agent."""
     global _agent_reviewer
@@ -113,6 +170,20 @@ def _get_reviewer():
     return _agent_reviewer
 
 
+def _get_router():
+    """Create or return the cached workflow router agent."""
+    global _agent_router
+    if _agent_router is None:
+        _agent_router = create_agent(
+            name="resume_assistant_router",
+            instructions=(
+                "Decide which workflow to use for a resume request.\n"
+                "Return ONLY one of: FULL_PIPELINE, WRITE_ONLY, REVIEW_ONLY, ANALYZE_ONLY."
+            ),
+        )
+    return _agent_router
+
+
 def get_collector_agent():
     """Public accessor for the collector agent instance."""
     return _get_collector()
@@ -128,49 +199,336 @@ def get_writer_agent():
     return _get_writer()
 
 
+def _get_section_writer():
+    """Create or return the cached per-section resume writer agent."""
+    global _agent_section_writer
+    if _agent_section_writer is None:
+        _agent_section_writer = create_agent(
+            name="resume_section_writer",
+            instructions=(
+                "You are an expert Resume Writer.\n"
+                "Rewrite ONE resume section from the 'Section Data', tailored to the 'Job Analysis'.\n"
+                "Return ONLY compact JSON for that section (no LaTeX, no Markdown, no code fences):\n"
+                '- summary: {"title":"Summary","text":""}\n'
+                '- skills or certifications: {"title":"","lines":[""]}\n'
+                '- experience, projects, or education: {"title":"","entries":'
+                '[{"title":"","org":"","location":"","date":"","bullets":[""]}]}\n\n'
+                "Instructions:\n"
+                "- Keep every fact from the section data; do not invent employers, dates, or degrees.\n"
+                "- Order entries and bullets by relevance and use the job's keywords where truthful.\n"
+                "- Write plain text only; layout and escaping are handled by the renderer."
+            ),
+            # Prompts hash the section data with the job analysis, so unchanged sections are reused.
+            cache=True,
+        )
+    return _agent_section_writer
+
+
+def _get_reviser():
+    """Create or return the cached resume reviser agent used for session follow-ups."""
+    global _agent_reviser
+    if _agent_reviser is None:
+        _agent_reviser = create_agent(
+            name="resume_reviser",
+            instructions=(
+                "You are an expert Resume Writer revising an existing resume.\n"
+                "Apply the 'Requested Change' to the 'Current Resume' and keep everything else as it is.\n"
+                "- If the current resume is JSON, return ONLY the complete revised JSON with the same structure "
+                "(no Markdown, no code fences).\n"
+                "- If it is LaTeX, return ONLY the complete revised LaTeX document.\n"
+                "- Keep the content tailored to the 'Job Analysis'; do not invent facts."
+            ),
+        )
+    return _agent_reviser
+
+
+def get_content_writer_agent():
+    """Public accessor for the structured-content writer agent instance."""
+    return _get_content_writer()
+
+
 def get_reviewer_agent():
     """Public accessor for the reviewer agent instance."""
     return _get_reviewer()
 
 
-def collect_info(user_input: str, stream: bool = False) -> str:
-    """Extract structured user profile fields from raw resume text."""
-    response = run_agent_sync(_get_collector(), f"User Input: {user_input}")
+def get_router_agent():
+    """Public accessor for the workflow router agent instance."""
+    return _get_router()
+
+
+def _clean_json_text(response: str, *, trim_to_object: bool = False) -> str:
+    """Strip Markdown fences (and optionally surrounding prose) from JSON output."""
     clean_response = response.replace("```json", "").replace("```", "").strip()
-    if "{" in clean_response and "}" in clean_response:
+    if trim_to_object and "{" in clean_response and "}" in clean_response:
         clean_response = clean_response[clean_response.find("{") : clean_response.rfind("}") + 1]
-    if stream:
-        print(clean_response)
     return clean_response
 
 
-def analyze_job(job_description: str, stream: bool = False) -> str:
-    """Analyze a job description and return structured JSON text."""
-    response = run_agent_sync(_get_analyzer(), f"Job Description: {job_description}")
-    clean_response = response.replace("```json", "").replace("```", "").strip()
+def _local_parse(user_input: str) -> Optional[ProfileParse]:
+    """Parse the resume locally unless disabled with ``RESUME_LOCAL_PARSER=0``."""
+    if os.getenv("RESUME_LOCAL_PARSER", "1").lower() in ("0", "false", "no"):
+        return None
+    parsed = parse_resume(user_input)
+    missing = parsed.low_confidence_fields()
+    emit_event(
+        {
+            "event": "profile_parse",
+            "sections": list(parsed.sections_found),
+            "llm_fields": missing,
+        }
+    )
+    annotate_span(profile_sections=len(parsed.sections_found), profile_llm_fields=",".join(missing))
+    return parsed
+
+
+def _collector_prompt(user_input: str, parsed: Optional[ProfileParse]) -> str:
+    """Build the collector prompt, naming only the fields the local parse could not fill."""
+    if parsed is None:
+        return f"User Input: {user_input}"
+    missing = parsed.low_confidence_fields()
+    if len(missing) == len(PROFILE_FIELDS):
+        return f"User Input: {user_input}"
+    return (
+        f"Only these fields are needed: {', '.join(missing)}. "
+        "Return the usual JSON object and leave every other field empty.\n\n"
+        f"User Input: {user_input}"
+    )
+
+
+def _merge_collected(collected: UserProfile, parsed: Optional[ProfileParse]) -> UserProfile:
+    """Fill the local parse's low-confidence fields from the collector's profile."""
+    if parsed is None or len(parsed.low_confidence_fields()) == len(PROFILE_FIELDS):
+        return collected
+    return UserProfile.from_dict(parsed.merge(collected.to_dict()))
+
+
+def _repair_prompt(prompt: str, response: str, error: str) -> str:
+    """Build the single follow-up prompt asking the model to fix schema-invalid output."""
+    return (
+        f"{prompt}\n\nYour previous output did not match the required JSON schema ({error}).\n"
+        f"Previous output:\n{response}\n\nReturn only the corrected JSON object."
+    )
+
+
+def _schema_check(model: type[_Model]):
+    """Return a predicate accepting text that parses as ``model`` (so only valid replies are cached)."""
+
+    def _valid(text: str) -> bool:
+        try:
+            model.from_json(text)
+        except SchemaError:
+            return False
+        return True
+
+    return _valid
+
+
+async def _run_validated(agent, prompt: str, model: type[_Model]) -> _Model:
+    """Run a schema-constrained agent and validate its output, with one repair attempt.
+
+    Raises:
+        SchemaError: If the repaired output is still invalid.
+    """
+    validate = _schema_check(model)
+    response = await run_agent(agent, prompt, validate=validate)
+    try:
+        return model.from_json(response)
+    except SchemaError as exc:
+        error = str(exc)
+    name = getattr(agent, "name", "")
+    annotate_span(schema_error=error)
+    emit_event({"event": "schema_repair", "agent": name, "error": error})
+    repaired = await run_agent(agent, _repair_prompt(prompt, response, error), validate=validate)
+    try:
+        return model.from_json(repaired)
+    except SchemaError as exc:
+        raise SchemaError(f"{name} output failed validation after one repair: {exc}") from exc
+
+
+def _clean_latex_text(response: str) -> str:
+    """Strip Markdown fences from LaTeX output."""
+    return response.replace("```latex", "").replace("```", "").strip()
+
+
+def _resume_content(response: str) -> Union[dict, str]:
+    """Return the writer's content JSON, or cleaned LaTeX if the model wrote a document instead."""
+    try:
+        content = json.loads(_clean_json_text(response, trim_to_object=True))
+    except json.JSONDecodeError:
+        return _clean_latex_text(response)
+    if not isinstance(content, dict) or not isinstance(content.get("sections"), list):
+        return _clean_latex_text(response)
+    return content
+
+
+def render_written_resume(resume: Union[dict, str], template: Optional[str] = None) -> str:
+    """Render structured writer output to LaTeX (LaTeX text is returned unchanged)."""
+    return render_resume(resume, template) if isinstance(resume, dict) else resume
+
+
+def _writer_prompt(user_profile: ProfileLike, job_analysis: AnalysisLike) -> str:
+    """Build the writer prompt from profile and job analysis text."""
+    return f"User Profile: {user_profile}\n\nJob Analysis Requirements: {job_analysis}"
+
+
+def _reviewer_prompt(resume_content: str, job_analysis: AnalysisLike) -> str:
+    """Build the reviewer prompt, including locally computed keyword coverage when available."""
+    prompt = f"Resume Content:\n{resume_content}\n\nJob Requirements:\n{job_analysis}"
+    coverage = score_resume(resume_content, job_analysis)
+    if coverage is None:
+        return prompt
+    annotate_span(ats_score=coverage["score"])
+    return (
+        f"{prompt}\n\nKeyword Coverage (computed exactly; base the Keyword Gaps section on it "
+        f"instead of recounting):\n{format_coverage(coverage)}"
+    )
+
+
+def _router_prompt(user_input: str, job_description: str) -> str:
+    """Build the router prompt from the request and job description."""
+    return (
+        "Choose workflow for this request. Return ONLY FULL_PIPELINE, WRITE_ONLY, REVIEW_ONLY, or ANALYZE_ONLY.\n\n"
+        f"User request:\n{user_input}\n\n"
+        f"Job description provided: {'Yes' if job_description else 'No'}\n\n"
+        f"Job description:\n{job_description}\n"
+    )
+
+
+async def route_request_async(user_input: str, job_description: str = "") -> str:
+    """Ask the router agent for a workflow mode label."""
+    response = await run_agent(_get_router(), _router_prompt(user_input, job_description))
+    return response.strip().upper()
+
+
+async def collect_info_async(user_input: str, stream: bool = False) -> UserProfile:
+    """Async variant of :func:`collect_info` for use inside event loops."""
+    parsed = _local_parse(user_input)
+    if parsed is not None and parsed.is_complete():
+        profile = UserProfile.from_dict(parsed.profile)
+    else:
+        collected = await _run_validated(_get_collector(), _collector_prompt(user_input, parsed), UserProfile)
+        profile = _merge_collected(collected, parsed)
     if stream:
-        print(clean_response)
-    return clean_response
+        print(profile.to_json())
+    return profile
+
+
+async def analyze_job_async(job_description: str, stream: bool = False) -> JobAnalysis:
+    """Async variant of :func:`analyze_job` for use inside event loops."""
+    analysis = await _run_validated(_get_analyzer(), f"Job Description: {job_description}", JobAnalysis)
+    if stream:
+        print(analysis.to_json())
+    return analysis
+
+
+async def _write_section_async(name: str, data: Any, job_analysis: AnalysisLike) -> str:
+    """Write one section, streaming its tokens tagged with the section name."""
+    with tag_events(section=name):
+        return await run_agent(_get_section_writer(), section_prompt(name, data, job_analysis), stream_tokens=True)
+
+
+async def _write_sections_async(profile: dict, job_analysis: AnalysisLike) -> dict:
+    """Write each profile section in parallel; unchanged sections come from the response cache."""
+    inputs = section_inputs(profile)
+    responses = await asyncio.gather(*(_write_section_async(name, data, job_analysis) for name, data in inputs))
+    sections = [parse_section(name, text, data) for (name, data), text in zip(inputs, responses)]
+    return assemble(profile, sections)
+
+
+async def write_resume_content_async(user_profile: ProfileLike, job_analysis: AnalysisLike) -> Union[dict, str]:
+    """Async variant of :func:`write_resume_content` for use inside event loops."""
+    profile = load_profile(user_profile) if WRITER_MODE == "sections" else None
+    if profile is not None and section_inputs(profile):
+        return await _write_sections_async(profile, job_analysis)
+    prompt = _writer_prompt(user_profile, job_analysis)
+    return _resume_content(await run_agent(_get_content_writer(), prompt, stream_tokens=True))
 
 
-def write_resume(user_profile: str, job_analysis: str, stream: bool = False) -> str:
+async def write_resume_document_async(
+    user_profile: ProfileLike, job_analysis: AnalysisLike
+) -> tuple[str, Optional[dict]]:
+    """Return the LaTeX resume and, in structured writer modes, the content it was rendered from."""
+    if WRITER_MODE == "latex":
+        response = await run_agent(_get_writer(), _writer_prompt(user_profile, job_analysis), stream_tokens=True)
+        return _clean_latex_text(response), None
+    content = await write_resume_content_async(user_profile, job_analysis)
+    return render_written_resume(content), content if isinstance(content, dict) else None
+
+
+async def revise_resume_async(
+    resume: str, revision: str, job_analysis: AnalysisLike, content: Optional[dict] = None
+) -> tuple[str, Optional[dict]]:
+    """Apply a follow-up change request to a resume with one agent call.
+
+    The stored content JSON is revised when available (and rendered
+    locally); otherwise the LaTeX document itself is edited.
+    """
+    current = json.dumps(content, ensure_ascii=False) if content is not None else resume
+    prompt = f"Current Resume:\n{current}\n\nRequested Change:\n{revision}\n\nJob Analysis:\n{job_analysis}"
+    response = await run_agent(_get_reviser(), prompt, stream_tokens=True)
+    if content is None:
+        return _clean_latex_text(response), None
+    revised = _resume_content(response)
+    if isinstance(revised, dict):
+        return render_written_resume(revised), revised
+    return revised, None
+
+
+async def write_resume_async(user_profile: ProfileLike, job_analysis: AnalysisLike, stream: bool = False) -> str:
+    """Async variant of :func:`write_resume` for use inside event loops."""
+    clean, _ = await write_resume_document_async(user_profile, job_analysis)
+    if stream:
+        print(clean)
+    return clean
+
+
+async def review_resume_async(resume_content: str, job_analysis: AnalysisLike, stream: bool = False) -> str:
+    """Async variant of :func:`review_resume` for use inside event loops."""
+    response = await run_agent(_get_reviewer(), _reviewer_prompt(resume_content, job_analysis), stream_tokens=True)
+    if stream:
+        print(response)
+    return response
+
+
+def collect_info(user_input: str, stream: bool = False) -> UserProfile:
+    """Extract structured user profile fields from raw resume text.
+
+    Clearly sectioned resumes are parsed locally; the collector agent only
+    fills fields the parser is not confident about.
+    """
+    return run_coroutine_sync(collect_info_async(user_input, stream=stream))
+
+
+def analyze_job(job_description: str, stream: bool = False) -> JobAnalysis:
+    """Analyze a job description into validated :class:`JobAnalysis` fields."""
+    return run_coroutine_sync(analyze_job_async(job_description, stream=stream))
+
+
+def write_resume_content(user_profile: ProfileLike, job_analysis: AnalysisLike) -> Union[dict, str]:
+    """Generate tailored resume content as a dict for :func:`render_written_resume`.
+
+    In ``sections`` mode each profile section is written separately and
+    cached, so regenerating after an edit only calls the model for the
+    sections that changed.
+    """
+    return run_coroutine_sync(write_resume_content_async(user_profile, job_analysis))
+
+
+def write_resume(user_profile: ProfileLike, job_analysis: AnalysisLike, stream: bool = False) -> str:
     """Generate a LaTeX resume tailored to analyzed requirements."""
-    response = run_agent_sync(
-        _get_writer(),
-        f"User Profile: {user_profile}\n\nJob Analysis Requirements: {job_analysis}",
-    )
-    clean = response.replace("```latex", "").replace("```", "").strip()
+    if WRITER_MODE == "latex":
+        clean = _clean_latex_text(run_agent_sync(_get_writer(), _writer_prompt(user_profile, job_analysis)))
+    else:
+        clean = render_written_resume(write_resume_content(user_profile, job_analysis))
     if stream:
         print(clean)
     return clean
 
 
-def review_resume(resume_content: str, job_analysis: str, stream: bool = False) -> str:
+def review_resume(resume_content: str, job_analysis: AnalysisLike, stream: bool = False) -> str:
     """Review generated resume text against job requirements."""
-    response = run_agent_sync(
-        _get_reviewer(),
-        f"Resume Content:\n{resume_content}\n\nJob Requirements:\n{job_analysis}",
-    )
+    response = run_agent_sync(_get_reviewer(), _reviewer_prompt(resume_content, job_analysis))
     if stream:
         print(response)
     return response
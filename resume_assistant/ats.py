@@ -0,0 +1,241 @@
+"""Local ATS-style keyword coverage of a resume against a job analysis.
+
+Terms from the analyzer's ``required_skills``, ``preferred_skills`` and
+``keywords`` (plus synonyms) are compiled into a word-level Aho-Corasick
+automaton, and the resume is scanned once. Tokens are lower-cased and
+lightly stemmed on both sides, so "APIs"/"API" and "mentoring"/"mentored"
+match, while word boundaries keep "Go" from matching "Google".
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from .models import JobAnalysis
+
+CATEGORIES = ("required_skills", "preferred_skills", "keywords")
+# Relative weight of each category in the overall score (renormalized over non-empty ones).
+CATEGORY_WEIGHTS = {"required_skills": 0.6, "preferred_skills": 0.25, "keywords": 0.15}
+
+# Canonical term -> alternative spellings that count as the same keyword.
+SYNONYMS: dict[str, tuple[str, ...]] = {
+    "javascript": ("js", "ecmascript"),
+    "typescript": ("ts",),
+    "golang": ("go",),
+    "go": ("golang",),
+    "kubernetes": ("k8s",),
+    "postgresql": ("postgres", "psql"),
+    "mongodb": ("mongo",),
+    "aws": ("amazon web services",),
+    "gcp": ("google cloud", "google cloud platform"),
+    "azure": ("microsoft azure",),
+    "ci/cd": ("cicd", "continuous integration", "continuous delivery", "continuous deployment"),
+    "node.js": ("nodejs", "node"),
+    "react": ("react.js", "reactjs"),
+    "next.js": ("nextjs",),
+    "machine learning": ("ml",),
+    "artificial intelligence": ("ai",),
+    "natural language processing": ("nlp",),
+    "large language models": ("llm", "llms"),
+    "rest api": ("restful", "restful api"),
+    "microservices": ("microservice", "micro-services", "microservice architecture"),
+    "distributed systems": ("distributed system", "distributed computing"),
+    "event-driven architecture": ("event-driven", "event driven", "event sourcing"),
+    "mentoring": ("mentorship", "coached"),
+    "leadership": ("led", "team lead", "team leader"),
+    "c++": ("cpp",),
+    "c#": ("csharp", ".net"),
+    "fintech": ("financial technology",),
+}
+
+# ".net" keeps its dot so it never matches the unrelated word "net".
+_TOKEN = re.compile(r"(?<![a-z0-9])\.net(?![a-z0-9])|[a-z0-9][a-z0-9+#]*(?:[.-][a-z0-9+#]+)*")
+_LATEX_COMMAND = re.compile(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?")
+# Function words dropped from both patterns and resume text so phrases match loosely.
+_STOPWORDS = frozenset(("a", "an", "and", "the", "of", "in", "on", "with", "for", "to", "or", "using"))
+
+
+def stem(token: str) -> str:
+    """Strip a plural or ``-ing``/``-ed`` suffix (light, deterministic stemming)."""
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    if token.endswith("s") and not token.endswith(("ss", "us", "sis")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Return normalized (lower-cased, stemmed, stopword-free) tokens."""
+    return [stem(token) for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def strip_latex(text: str) -> str:
+    """Remove LaTeX commands and braces, keeping their text arguments."""
+    text = _LATEX_COMMAND.sub(" ", text.replace("\\&", "&").replace("\\%", "%").replace("\\#", "#"))
+    return text.replace("{", " ").replace("}", " ").replace("~", " ")
+
+
+class KeywordAutomaton:
+    """Word-level Aho-Corasick automaton mapping token sequences to keyword ids."""
+
+    def __init__(self, patterns: list[tuple[tuple[str, ...], int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        for tokens, keyword_id in patterns:
+            if tokens:
+                self._insert(tokens, keyword_id)
+        self._build_failure_links()
+
+    def _insert(self, tokens: tuple[str, ...], keyword_id: int) -> None:
+        """Add one pattern to the trie."""
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        self._out[state].append(keyword_id)
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def scan(self, tokens: list[str]) -> dict[int, int]:
+        """Return ``{keyword_id: occurrences}`` for one pass over ``tokens``."""
+        counts: dict[int, int] = {}
+        state = 0
+        for token in tokens:
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for keyword_id in self._out[state]:
+                counts[keyword_id] = counts.get(keyword_id, 0) + 1
+        return counts
+
+
+@dataclass(frozen=True)
+class _Matcher:
+    """Compiled automaton plus the keyword list it reports against."""
+
+    automaton: KeywordAutomaton
+    terms: tuple[tuple[str, str], ...]  # (category, original term) per keyword id
+
+
+@lru_cache(maxsize=256)
+def _compile(terms: tuple[tuple[str, str], ...]) -> _Matcher:
+    """Build (and memoize per job analysis) the automaton for ``terms``."""
+    patterns: list[tuple[tuple[str, ...], int]] = []
+    for keyword_id, (_, term) in enumerate(terms):
+        lowered = term.lower().strip()
+        variants = {lowered, *SYNONYMS.get(lowered, ())}
+        # A term written as an alias (for example "k8s") also matches its canonical spelling.
+        for canonical, aliases in SYNONYMS.items():
+            if lowered in aliases:
+                variants.add(canonical)
+        for tokens in {tuple(tokenize(variant)) for variant in variants}:
+            patterns.append((tokens, keyword_id))
+    return _Matcher(KeywordAutomaton(patterns), terms)
+
+
+def _load_analysis(job_analysis: Union[JobAnalysis, str, dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """Return the analyzer JSON as a dict, tolerating Markdown fences."""
+    if isinstance(job_analysis, JobAnalysis):
+        return job_analysis.to_dict()
+    if isinstance(job_analysis, dict):
+        return job_analysis
+    text = job_analysis.replace("```json", "").replace("```", "").strip()
+    if "{" in text and "}" in text:
+        text = text[text.find("{") : text.rfind("}") + 1]
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _terms(analysis: dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    """Return deduplicated ``(category, term)`` pairs in analyzer order."""
+    seen: set[str] = set()
+    terms: list[tuple[str, str]] = []
+    for category in CATEGORIES:
+        values = analysis.get(category) or []
+        if isinstance(values, str):
+            values = [values]
+        for value in values:
+            term = str(value).strip()
+            if term and term.lower() not in seen:
+                seen.add(term.lower())
+                terms.append((category, term))
+    return tuple(terms)
+
+
+def score_resume(resume: str, job_analysis: Union[JobAnalysis, str, dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """Return keyword coverage of ``resume`` for the analysis, or ``None`` if it has no keywords."""
+    started = time.perf_counter()
+    analysis = _load_analysis(job_analysis)
+    terms = _terms(analysis) if analysis else ()
+    if not terms:
+        return None
+    matcher = _compile(terms)
+    counts = matcher.automaton.scan(tokenize(strip_latex(resume)))
+
+    categories: dict[str, dict[str, Any]] = {}
+    weighted = 0.0
+    total_weight = 0.0
+    for category in CATEGORIES:
+        ids = [index for index, (owner, _) in enumerate(matcher.terms) if owner == category]
+        if not ids:
+            continue
+        matched = [matcher.terms[index][1] for index in ids if index in counts]
+        missing = [matcher.terms[index][1] for index in ids if index not in counts]
+        coverage = len(matched) / len(ids)
+        categories[category] = {"coverage": round(coverage, 3), "matched": matched, "missing": missing}
+        weighted += CATEGORY_WEIGHTS[category] * coverage
+        total_weight += CATEGORY_WEIGHTS[category]
+
+    return {
+        "score": round(100 * weighted / total_weight, 1),
+        **categories,
+        "occurrences": {matcher.terms[index][1]: count for index, count in sorted(counts.items())},
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def format_coverage(result: dict[str, Any]) -> str:
+    """Render a coverage result as a short prompt section for the reviewer."""
+    lines = [f"ATS keyword score: {result['score']}/100"]
+    labels = {"required_skills": "Required", "preferred_skills": "Preferred", "keywords": "Keywords"}
+    for category in CATEGORIES:
+        entry = result.get(category)
+        if entry is None:
+            continue
+        total = len(entry["matched"]) + len(entry["missing"])
+        missing = ", ".join(entry["missing"]) or "none"
+        lines.append(f"- {labels[category]}: {len(entry['matched'])}/{total} matched; missing: {missing}")
+    return "\n".join(lines)
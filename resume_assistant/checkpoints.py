@@ -0,0 +1,190 @@
+"""Per-stage checkpoints so a failed graph run can be retried without redoing finished work.
+
+Each graph executor saves its output payload under the request's
+``run_id``. Retrying with the same ``run_id`` (:func:`resume_payload`)
+merges the saved payloads and starts the graph at the first stage that is
+missing: a run whose reviewer timed out after a long writer call goes
+straight back to ``review_resume``, and a run that already finished
+returns its stored output without any agent calls. A ``run_id`` is bound to
+the request that first used it: reusing it for a different request raises
+:class:`CheckpointConflict` instead of replaying the other request's stages.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from agent_framework_utils import get_data_dir
+from .models import json_default
+
+# Checkpointed executors, in pipeline order (both analyzer nodes save as ``analyze_job``).
+STAGES = ("route_request", "collect_info", "analyze_job", "write_resume", "review_resume", "emit_output")
+RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_:-]{1,128}$")
+# Payload keys that steer a single pass through the graph and must not be replayed.
+_TRANSIENT_FIELDS = ("resume_at",)
+# First executor to run once the profile and job analysis are available, per mode.
+_AFTER_ANALYSIS = {
+    "FULL_PIPELINE": "write_resume",
+    "WRITE_ONLY": "write_resume",
+    "REVIEW_ONLY": "review_resume",
+    "ANALYZE_ONLY": "emit_output",
+}
+
+_store: Optional["CheckpointStore"] = None
+_store_lock = threading.Lock()
+
+
+class CheckpointConflict(ValueError):
+    """A ``run_id`` reused for a request other than the one it was started with."""
+
+
+def new_run_id() -> str:
+    """Return a fresh random run id."""
+    return uuid.uuid4().hex
+
+
+def request_fingerprint(payload: dict[str, Any]) -> str:
+    """Return a stable hash of a graph request, ignoring its ``run_id``."""
+    request = {key: value for key, value in payload.items() if key != "run_id"}
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=json_default)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite table of stage payloads keyed by run id, expired after a TTL."""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400.0) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.saved = 0
+        self.resumed = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT NOT NULL, stage TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (run_id, stage))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS checkpoints_created ON checkpoints (created_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def bind(self, run_id: str, fingerprint: str) -> None:
+        """Tie ``run_id`` to a request fingerprint, or check it matches the one already bound.
+
+        An expired binding is replaced along with its checkpoints.
+
+        Raises:
+            CheckpointConflict: If ``run_id`` is bound to a different request.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, created_at FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is not None and row[1] > now - self.ttl_seconds:
+                if row[0] != fingerprint:
+                    raise CheckpointConflict(f"run_id {run_id!r} was already used for a different request")
+                return
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, fingerprint, created_at) VALUES (?, ?, ?)",
+                (run_id, fingerprint, now),
+            )
+            self._conn.commit()
+
+    def save(self, run_id: str, stage: str, payload: dict[str, Any]) -> None:
+        """Store the payload an executor produced for ``run_id``."""
+        state = {key: value for key, value in payload.items() if key not in _TRANSIENT_FIELDS}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, stage, payload, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, stage, json.dumps(state, ensure_ascii=False, default=json_default), time.time()),
+            )
+            self._conn.commit()
+            self.saved += 1
+
+    def load(self, run_id: str) -> dict[str, dict[str, Any]]:
+        """Return ``{stage: payload}`` for the unexpired checkpoints of ``run_id``."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, payload FROM checkpoints WHERE run_id = ? AND created_at > ?", (run_id, cutoff)
+            ).fetchall()
+        return {stage: json.loads(payload) for stage, payload in rows}
+
+    def resume(self, run_id: str) -> Optional[dict[str, Any]]:
+        """Return the payload to retry ``run_id`` from, or ``None`` if nothing was checkpointed."""
+        checkpoints = self.load(run_id)
+        if not checkpoints:
+            return None
+        with self._lock:
+            self.resumed += 1
+        return resume_payload(checkpoints)
+
+    def clear(self, run_id: Optional[str] = None) -> int:
+        """Delete one run's checkpoints, or every expired one when ``run_id`` is omitted."""
+        with self._lock:
+            if run_id is None:
+                cutoff = time.time() - self.ttl_seconds
+                cursor = self._conn.execute("DELETE FROM checkpoints WHERE created_at <= ?", (cutoff,))
+                self._conn.execute("DELETE FROM runs WHERE created_at <= ?", (cutoff,))
+            else:
+                cursor = self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+                self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        """Return stored run counts and save/resume counters."""
+        with self._lock:
+            runs, rows = self._conn.execute("SELECT COUNT(DISTINCT run_id), COUNT(*) FROM checkpoints").fetchone()
+        return {"runs": runs, "checkpoints": rows, "saved": self.saved, "resumed": self.resumed}
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Return the process-wide store (``RESUME_CHECKPOINT_PATH``, default ``.agent_data/checkpoints.sqlite3``)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = os.getenv("RESUME_CHECKPOINT_PATH") or str(get_data_dir() / "checkpoints.sqlite3")
+                _store = CheckpointStore(path, float(os.getenv("RESUME_CHECKPOINT_TTL_SECONDS", "86400")))
+                _store.clear()
+    return _store
+
+
+def resume_payload(checkpoints: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Merge a run's checkpoints into a payload that starts at the first missing stage.
+
+    A finished run yields its stored ``output``. Otherwise ``resume_at`` is
+    set once the sequential part of the pipeline is reached; before that the
+    graph restarts at the router with the saved mode, and the collector and
+    analyzer pass through the profile or analysis they already produced.
+    """
+    payload: dict[str, Any] = {}
+    for stage in STAGES:
+        payload.update(checkpoints.get(stage) or {})
+    if "emit_output" in checkpoints:
+        return payload
+    mode = payload.get("mode")
+    if "review_resume" in checkpoints:
+        payload["resume_at"] = "emit_output"
+    elif "write_resume" in checkpoints:
+        payload["resume_at"] = "review_resume" if mode == "FULL_PIPELINE" else "emit_output"
+    elif "analyze_job" in checkpoints and mode in _AFTER_ANALYSIS:
+        if mode != "FULL_PIPELINE" or "collect_info" in checkpoints:
+            payload["resume_at"] = _AFTER_ANALYSIS[mode]
+    return payload
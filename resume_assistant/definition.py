@@ -1,43 +1,54 @@
 """Tool and orchestrator definitions for the resume assistant package."""
 
+import asyncio
+import math
+import os
+import time
+from typing import AsyncIterator, Optional, Union
+
 from agent_framework import tool
-from agent_framework_utils import run_workflow_sync
-from .agents import collect_info, analyze_job, write_resume, review_resume
+from agent_framework_utils import WorkflowPool, observe_stage, run_coroutine_sync
+from agent_scheduler import BATCH, use_lane
+from .agents import collect_info_async, review_resume_async, write_resume_async
+from .checkpoints import get_checkpoint_store, request_fingerprint
+from .jd_store import analyze_job_with_store, jd_id_for
+from .models import JobAnalysis, UserProfile
+from .sessions import get_session_store, plan_follow_up
 from .workflows.graph import build_graph_workflow
 
-_graph_workflow = None
+_graph_workflow_pool = None
 
 
 @tool
-def collect_info_tool(user_input: str) -> str:
+async def collect_info_tool(user_input: str) -> str:
     """Extract structured resume data from the user's input."""
-    return collect_info(user_input, stream=False)
+    return (await collect_info_async(user_input, stream=False)).to_json()
 
 
 @tool
-def analyze_job_tool(job_description: str) -> str:
+async def analyze_job_tool(job_description: str) -> str:
     """Analyze a job description into structured requirements."""
-    return analyze_job(job_description, stream=False)
+    return (await analyze_job_with_store(job_description)).to_json()
 
 
 @tool
-def write_resume_tool(user_profile: str, job_analysis: str) -> str:
+async def write_resume_tool(user_profile: str, job_analysis: str) -> str:
     """Write a tailored resume in LaTeX given profile and job analysis."""
-    return write_resume(user_profile, job_analysis, stream=False)
+    return await write_resume_async(user_profile, job_analysis, stream=False)
 
 
 @tool
-def review_resume_tool(resume_content: str, job_analysis: str) -> str:
+async def review_resume_tool(resume_content: str, job_analysis: str) -> str:
     """Review a resume against job requirements and provide feedback."""
-    return review_resume(resume_content, job_analysis, stream=False)
+    return await review_resume_async(resume_content, job_analysis, stream=False)
 
 
-def _get_graph_workflow():
-    """Create or return the cached graph workflow instance."""
-    global _graph_workflow
-    if _graph_workflow is None:
-        _graph_workflow = build_graph_workflow()
-    return _graph_workflow
+def _get_graph_workflow_pool() -> WorkflowPool:
+    """Create or return the cached pool of graph workflow instances."""
+    global _graph_workflow_pool
+    if _graph_workflow_pool is None:
+        _graph_workflow_pool = WorkflowPool(build_graph_workflow)
+    return _graph_workflow_pool
 
 
 def _messages_to_text(messages) -> str:
@@ -53,22 +64,251 @@ def _messages_to_text(messages) -> str:
     return "\n\n".join(parts)
 
 
-def orchestrator(user_input: str, job_description: str, stream: bool = False) -> str:
-    """Route resume requests through the graph workflow and return output."""
-    prompt = (
-        "User request:\n"
-        f"{user_input}\n\n"
-        f"Job description provided: {'Yes' if job_description else 'No'}\n\n"
-        "Job description:\n"
-        f"{job_description}\n\n"
-        "Choose the best workflow and respond with the appropriate output."
-    )
+async def run_graph_async(payload: dict, fingerprint: Optional[str] = None) -> str:
+    """Run one payload through the graph, resuming from its checkpoints when it has a ``run_id``.
+
+    A retried ``run_id`` skips the stages that already finished, and a run
+    that completed returns its stored output without running the graph.
+    ``fingerprint`` identifies the caller's request (default: a hash of
+    ``payload``) so a reused ``run_id`` is checked against it.
+
+    Raises:
+        CheckpointConflict: If ``run_id`` was used for a different request.
+    """
+    if payload.get("run_id"):
+        store = get_checkpoint_store()
+        store.bind(payload["run_id"], fingerprint or request_fingerprint(payload))
+        resumed = store.resume(payload["run_id"])
+        if resumed is not None:
+            if "output" in resumed:
+                return resumed["output"]
+            payload = resumed
+    return _messages_to_text(await _get_graph_workflow_pool().run(payload))
+
+
+async def orchestrator_async(
+    user_input: str,
+    job_description: str,
+    stream: bool = False,
+    mode: Optional[str] = None,
+    session_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> str:
+    """Route resume requests through the graph workflow on the running loop.
+
+    Passing ``mode`` (one of FULL_PIPELINE, WRITE_ONLY, REVIEW_ONLY,
+    ANALYZE_ONLY) skips routing entirely. With ``session_id`` the final
+    state is saved, and a follow-up on a known session resumes from the
+    stored profile, analysis, and resume instead of rerunning the pipeline.
+    With ``run_id`` every stage is checkpointed, so retrying a failed run
+    with the same id continues from the first unfinished stage.
+    """
     payload = {
         "user_input": user_input,
         "job_description": job_description,
     }
-    outputs = run_workflow_sync(_get_graph_workflow(), payload)
-    response = _messages_to_text(outputs)
+    if mode:
+        payload["mode"] = mode
+    if session_id:
+        payload["session_id"] = session_id
+    # Hash the request before session planning, which changes once the run saves its session.
+    fingerprint = request_fingerprint(payload)
+    if session_id:
+        state = get_session_store().get(session_id)
+        if state is not None:
+            payload.update(plan_follow_up(state, user_input, job_description, mode))
+    if run_id:
+        payload["run_id"] = run_id
+    response = await run_graph_async(payload, fingerprint)
     if stream:
         print(response)
     return response
+
+
+def orchestrator(
+    user_input: str,
+    job_description: str,
+    stream: bool = False,
+    mode: Optional[str] = None,
+    session_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> str:
+    """Route resume requests through the graph workflow and return output."""
+    return run_coroutine_sync(
+        orchestrator_async(
+            user_input, job_description, stream=stream, mode=mode, session_id=session_id, run_id=run_id
+        )
+    )
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def batch_orchestrator_async(
+    user_inputs: list[str],
+    job_description: str,
+    concurrency: Optional[int] = None,
+    run_id: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """Tailor many resumes to one job description, yielding results as they finish.
+
+    The JD is analyzed once; each resume then runs collect/write/review in the
+    scheduler's batch lane under a ``concurrency`` limit (default
+    ``RESUME_BATCH_CONCURRENCY`` or 4). Items
+    are yielded in completion order, followed by a ``summary`` event with
+    throughput and per-item latency percentiles. With ``run_id`` each item is
+    checkpointed as ``<run_id>:<index>``, so rerunning a partly failed batch
+    only redoes the unfinished stages of the failed items.
+    """
+    limit = max(1, concurrency or int(os.getenv("RESUME_BATCH_CONCURRENCY", "4")))
+    started = time.perf_counter()
+    # Bulk work runs in the scheduler's batch lane so live requests go first.
+    with use_lane(BATCH):
+        job_analysis = await analyze_job_with_store(job_description)
+    yield {
+        "event": "job_analysis",
+        "job_analysis": job_analysis.to_dict(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+    slots = asyncio.Semaphore(limit)
+
+    async def _run_item(index: int, user_input: str) -> dict:
+        async with slots:
+            item_started = time.perf_counter()
+            payload = {
+                "user_input": user_input,
+                "job_description": job_description,
+                "job_analysis": job_analysis,
+                "mode": "FULL_PIPELINE",
+            }
+            if run_id:
+                payload["run_id"] = f"{run_id}:{index}"
+            try:
+                output = await run_graph_async(payload)
+                result = {"event": "item", "index": index, "status": "ok", "output": output}
+            except Exception as exc:
+                result = {"event": "item", "index": index, "status": "error", "error": str(exc)}
+            result["latency_ms"] = round((time.perf_counter() - item_started) * 1000, 1)
+            return result
+
+    with use_lane(BATCH):
+        tasks = [asyncio.ensure_future(_run_item(i, text)) for i, text in enumerate(user_inputs)]
+    latencies: list[float] = []
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            latencies.append(result["latency_ms"])
+            failed += result["status"] != "ok"
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    yield {
+        "event": "summary",
+        "count": len(user_inputs),
+        "succeeded": len(user_inputs) - failed,
+        "failed": failed,
+        "concurrency": limit,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "throughput_per_min": round(len(user_inputs) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "max": max(latencies, default=0.0),
+        },
+    }
+
+
+def _elapsed_ms(started: float) -> float:
+    """Return milliseconds elapsed since ``started`` (a perf_counter value)."""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def multi_jd_orchestrator_async(
+    user_input: str,
+    job_descriptions: Union[list[str], dict[str, str]],
+    concurrency: Optional[int] = None,
+) -> dict:
+    """Tailor one resume to many job descriptions in a single call.
+
+    The profile is extracted once, every JD is analyzed concurrently, and a
+    resume is written and reviewed per JD in parallel (bounded by
+    ``concurrency``). Results are keyed by the caller's keys when
+    ``job_descriptions`` is a dict, otherwise by each JD's ``jd_id``.
+    """
+    if isinstance(job_descriptions, dict):
+        jobs = dict(job_descriptions)
+    else:
+        jobs = {jd_id_for(text): text for text in job_descriptions}
+    limit = max(1, concurrency or int(os.getenv("RESUME_BATCH_CONCURRENCY", "4")))
+    slots = asyncio.Semaphore(limit)
+    started = time.perf_counter()
+
+    async def _profile() -> tuple[UserProfile, float]:
+        async with observe_stage("collect_info"):
+            profile = await collect_info_async(user_input)
+        return profile, _elapsed_ms(started)
+
+    async def _analysis(text: str) -> JobAnalysis:
+        async with slots, observe_stage("analyze_job"):
+            return await analyze_job_with_store(text)
+
+    # Profile extraction overlaps with JD analysis; neither depends on the other.
+    profile_task = asyncio.ensure_future(_profile())
+    analyses_started = time.perf_counter()
+    try:
+        analyses = await asyncio.gather(*(_analysis(text) for text in jobs.values()))
+        analyses_ms = _elapsed_ms(analyses_started)
+        user_profile, profile_ms = await profile_task
+    finally:
+        # Stop and reap the profile task when an analysis fails (a no-op once it finished).
+        profile_task.cancel()
+        await asyncio.gather(profile_task, return_exceptions=True)
+
+    async def _tailor(job_analysis: JobAnalysis) -> dict:
+        async with slots:
+            write_started = time.perf_counter()
+            async with observe_stage("write_resume"):
+                resume = await write_resume_async(user_profile, job_analysis)
+            write_ms = _elapsed_ms(write_started)
+            review_started = time.perf_counter()
+            async with observe_stage("review_resume"):
+                feedback = await review_resume_async(resume, job_analysis)
+            return {
+                "job_analysis": job_analysis.to_dict(),
+                "resume": resume,
+                "feedback": feedback,
+                "timings_ms": {"write_resume": write_ms, "review_resume": _elapsed_ms(review_started)},
+            }
+
+    tailoring_started = time.perf_counter()
+    tailored = await asyncio.gather(*(_tailor(analysis) for analysis in analyses))
+    return {
+        "user_profile": user_profile.to_dict(),
+        "results": dict(zip(jobs.keys(), tailored)),
+        "timings_ms": {
+            "collect_info": profile_ms,
+            "analyze_jobs": analyses_ms,
+            "tailor_resumes": _elapsed_ms(tailoring_started),
+            "total": _elapsed_ms(started),
+        },
+    }
+
+
+def multi_jd_orchestrator(
+    user_input: str,
+    job_descriptions: Union[list[str], dict[str, str]],
+    concurrency: Optional[int] = None,
+) -> dict:
+    """Synchronous wrapper for :func:`multi_jd_orchestrator_async`."""
+    return run_coroutine_sync(multi_jd_orchestrator_async(user_input, job_descriptions, concurrency))
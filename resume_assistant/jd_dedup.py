@@ -0,0 +1,110 @@
+"""MinHash/LSH index for spotting near-duplicate job descriptions in-process."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+from array import array
+from typing import Iterable, Optional
+
+_TOKEN = re.compile(r"[a-z0-9+#.]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: str, size: int = 3) -> set[int]:
+    """Return hashed word ``size``-grams of the lower-cased text."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+        for gram in grams
+    }
+
+
+class MinHashIndex:
+    """Banded LSH over 32-bit MinHash signatures.
+
+    Each stored JD costs ``num_perm * 4`` bytes plus one bucket entry per
+    band, so tens of thousands of JDs fit in a few megabytes. Candidates
+    found through band collisions are verified by estimated Jaccard
+    similarity against ``threshold``.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+        self._keys: list[str] = []
+        self._signatures: list[array] = []
+        self._positions: dict[str, int] = {}
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def signature(self, text: str) -> array:
+        """Compute the MinHash signature of ``text``."""
+        hashes = shingles(text)
+        if not hashes:
+            return array("I", [_MAX_HASH] * self.num_perm)
+        return array(
+            "I",
+            (min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH for a, b in self._perms),
+        )
+
+    def _band_keys(self, signature: array) -> Iterable[tuple[int, bytes]]:
+        """Yield ``(band, bucket_key)`` pairs for a signature."""
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        for band in range(self.bands):
+            yield band, raw[band * width : (band + 1) * width]
+
+    def add(self, key: str, signature: array) -> None:
+        """Index ``signature`` under ``key`` (re-adding a key is a no-op)."""
+        if key in self._positions:
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        self._positions[key] = position
+        for band, bucket_key in self._band_keys(signature):
+            self._buckets[band].setdefault(bucket_key, []).append(position)
+
+    def similarity(self, left: array, right: array) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        return sum(1 for a, b in zip(left, right) if a == b) / self.num_perm
+
+    def query(self, signature: array) -> Optional[tuple[str, float]]:
+        """Return the most similar stored key at or above the threshold."""
+        candidates: set[int] = set()
+        for band, bucket_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(bucket_key, ()))
+        best: Optional[tuple[str, float]] = None
+        for position in candidates:
+            score = self.similarity(signature, self._signatures[position])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (self._keys[position], score)
+        return best
+
+
+def signature_to_bytes(signature: array) -> bytes:
+    """Serialize a signature for storage (little-endian uint32)."""
+    return struct.pack(f"<{len(signature)}I", *signature)
+
+
+def signature_from_bytes(raw: bytes) -> array:
+    """Deserialize a signature produced by :func:`signature_to_bytes`."""
+    return array("I", struct.unpack(f"<{len(raw) // 4}I", raw))
@@ -0,0 +1,213 @@
+"""Persistent job-description analysis store keyed by normalized JD hash."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from agent_framework_utils import get_data_dir
+
+from .agents import analyze_job_async
+from .jd_dedup import MinHashIndex, signature_from_bytes, signature_to_bytes
+from .models import JobAnalysis, SchemaError
+
+_WHITESPACE = re.compile(r"\s+")
+
+_store: Optional["JobAnalysisStore"] = None
+_store_lock = threading.Lock()
+_index: Optional[MinHashIndex] = None
+_index_lock = threading.Lock()
+
+# Estimated Jaccard similarity above which a stored analysis is reused.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("JD_NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+
+def normalize_jd(job_description: str) -> str:
+    """Collapse whitespace and case so reformatted copies hash identically."""
+    return _WHITESPACE.sub(" ", job_description).strip().lower()
+
+
+def jd_id_for(job_description: str) -> str:
+    """Return the stable identifier for a job description."""
+    return hashlib.sha256(normalize_jd(job_description).encode("utf-8")).hexdigest()[:32]
+
+
+def _stored_analysis(text: Optional[str]) -> Optional[JobAnalysis]:
+    """Return a stored analysis as a :class:`JobAnalysis`, or ``None`` if absent or invalid."""
+    if text is None:
+        return None
+    try:
+        return JobAnalysis.from_json(text)
+    except SchemaError:
+        return None
+
+
+class JobAnalysisStore:
+    """SQLite-backed map of JD id to original text and parsed analysis JSON."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_analyses ("
+            "jd_id TEXT PRIMARY KEY, job_description TEXT NOT NULL, analysis TEXT, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jd_signatures (jd_id TEXT PRIMARY KEY, signature BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def register(self, job_description: str) -> str:
+        """Store a JD's text (keeping any existing analysis) and return its id."""
+        jd_id = jd_id_for(job_description)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO job_analyses (jd_id, job_description, analysis, updated_at) "
+                "VALUES (?, ?, NULL, ?)",
+                (jd_id, job_description, time.time()),
+            )
+            self._conn.commit()
+        return jd_id
+
+    def put(self, job_description: str, analysis: str) -> str:
+        """Store the analysis JSON for a JD and return its id."""
+        jd_id = jd_id_for(job_description)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_analyses (jd_id, job_description, analysis, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (jd_id, job_description, analysis, time.time()),
+            )
+            self._conn.commit()
+        return jd_id
+
+    def get_analysis(self, jd_id: str) -> Optional[str]:
+        """Return the stored analysis JSON for ``jd_id``, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT analysis FROM job_analyses WHERE jd_id = ?", (jd_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_text(self, jd_id: str) -> Optional[str]:
+        """Return the original job description text for ``jd_id``, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_description FROM job_analyses WHERE jd_id = ?", (jd_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, job_description: str) -> Optional[str]:
+        """Return the stored analysis for a JD's text, if any."""
+        return self.get_analysis(jd_id_for(job_description))
+
+    def put_signature(self, jd_id: str, signature: bytes) -> None:
+        """Persist the MinHash signature of an analyzed JD."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jd_signatures (jd_id, signature) VALUES (?, ?)", (jd_id, signature)
+            )
+            self._conn.commit()
+
+    def iter_signatures(self):
+        """Yield ``(jd_id, signature_bytes)`` for every analyzed JD."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.jd_id, s.signature FROM jd_signatures s "
+                "JOIN job_analyses a ON a.jd_id = s.jd_id WHERE a.analysis IS NOT NULL"
+            ).fetchall()
+        yield from rows
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def get_jd_store() -> JobAnalysisStore:
+    """Return the process-wide JD analysis store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = os.getenv("JD_STORE_PATH") or str(get_data_dir() / "jd_store.sqlite3")
+                _store = JobAnalysisStore(path)
+    return _store
+
+
+def get_jd_index() -> MinHashIndex:
+    """Return the near-duplicate index, loading stored signatures on first use."""
+    global _index
+    if _index is None:
+        store = get_jd_store()
+        with _index_lock:
+            if _index is None:
+                index = MinHashIndex(threshold=NEAR_DUPLICATE_THRESHOLD)
+                for jd_id, raw in store.iter_signatures():
+                    index.add(jd_id, signature_from_bytes(raw))
+                _index = index
+    return _index
+
+
+def _remember(job_description: str, analysis: str, signature=None) -> None:
+    """Store an analysis and index the JD for near-duplicate lookups."""
+    store = get_jd_store()
+    jd_id = store.put(job_description, analysis)
+    index = get_jd_index()
+    if signature is None:
+        signature = index.signature(job_description)
+    store.put_signature(jd_id, signature_to_bytes(signature))
+    index.add(jd_id, signature)
+
+
+def find_near_duplicate(job_description: str) -> Optional[tuple[str, float]]:
+    """Return ``(jd_id, similarity)`` of a stored near-duplicate JD, if any."""
+    index = get_jd_index()
+    return index.query(index.signature(job_description))
+
+
+async def analyze_job_with_store(job_description: str) -> JobAnalysis:
+    """Return the JD analysis from the store, analyzing and saving it on a miss.
+
+    Exact (normalized) matches are checked first, then near-duplicates
+    found via MinHash. Analyses are validated before they are stored, and a
+    stored one that no longer matches the schema counts as a miss.
+    """
+    if not job_description.strip():
+        return await analyze_job_async(job_description)
+    store = get_jd_store()
+    cached = _stored_analysis(store.lookup(job_description))
+    if cached is not None:
+        return cached
+
+    index = get_jd_index()
+    signature = index.signature(job_description)
+    match = index.query(signature)
+    if match is not None:
+        analysis = _stored_analysis(store.get_analysis(match[0]))
+        if analysis is not None:
+            _remember(job_description, analysis.to_json(), signature)
+            return analysis
+
+    analysis = await analyze_job_async(job_description)
+    _remember(job_description, analysis.to_json(), signature)
+    return analysis
+
+
+async def register_job_description(job_description: str, analyze: bool = True) -> dict:
+    """Register a JD for later reference by id, analyzing it up front by default."""
+    store = get_jd_store()
+    jd_id = store.register(job_description)
+    analysis = _stored_analysis(store.get_analysis(jd_id))
+    if analysis is None and analyze:
+        analysis = await analyze_job_with_store(job_description)
+    return {
+        "jd_id": jd_id,
+        "analyzed": store.get_analysis(jd_id) is not None,
+        "job_analysis": analysis.to_dict() if analysis is not None else None,
+    }
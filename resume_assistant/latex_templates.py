@@ -0,0 +1,229 @@
+"""Render structured resume content into LaTeX with built-in templates.
+
+The writer agent returns only the tailored content as compact JSON::
+
+    {"name": "...", "contact": ["..."],
+     "sections": [{"title": "Summary", "text": "..."},
+                  {"title": "Skills", "lines": ["Languages: Python, Go"]},
+                  {"title": "Experience", "entries": [
+                      {"title": "Role", "org": "Company", "location": "City",
+                       "date": "2022 - Present", "bullets": ["..."]}]}]}
+
+and :func:`render_resume` produces the ``.tex`` locally, escaping every
+text field. Templates are ``string.Template`` fragments; built-ins live in
+:data:`TEMPLATES`, extra ones can be dropped into ``RESUME_TEMPLATE_DIR`` as
+``<name>.json`` with the same keys, and compiled templates are cached.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from string import Template
+from typing import Any, Optional
+
+DEFAULT_TEMPLATE = os.getenv("RESUME_TEMPLATE", "classic")
+
+_ESCAPES = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_SPECIAL = re.compile(r"[\\&%$#_{}~^]")
+_DATE_DASH = re.compile(r"\s+-+\s+|\s*[–—]\s*")
+
+_FRAGMENTS = ("document", "header", "contact", "section", "text", "lines", "entry", "bullets", "bullet")
+
+_COMMON = {
+    "header": "\\begin{center}\n  {\\LARGE\\bfseries $name}$contact\n\\end{center}\n",
+    "contact": "\\\\[2pt]\n  $contact",
+    "text": "$text\\par\n",
+    "lines": "$lines\\par\n",
+    "bullet": "  \\item $text\n",
+}
+
+TEMPLATES: dict[str, dict[str, str]] = {
+    "classic": {
+        **_COMMON,
+        "document": (
+            "\\documentclass[11pt]{article}\n"
+            "\\usepackage[T1]{fontenc}\n"
+            "\\usepackage[utf8]{inputenc}\n"
+            "\\usepackage[margin=0.75in]{geometry}\n"
+            "\\usepackage{enumitem}\n"
+            "\\usepackage[hidelinks]{hyperref}\n"
+            "\\setlist[itemize]{leftmargin=*,itemsep=1pt,topsep=2pt}\n"
+            "\\pagestyle{empty}\n"
+            "\\begin{document}\n$header$body\\end{document}\n"
+        ),
+        "section": "\\section*{$title}\n$content",
+        "entry": "\\textbf{$title}$org$location \\hfill $date\\par\n$bullets",
+        "bullets": "\\begin{itemize}\n$items\\end{itemize}\n",
+    },
+    "modern": {
+        **_COMMON,
+        "document": (
+            "\\documentclass[11pt]{article}\n"
+            "\\usepackage[T1]{fontenc}\n"
+            "\\usepackage[utf8]{inputenc}\n"
+            "\\usepackage[margin=0.7in]{geometry}\n"
+            "\\usepackage{enumitem}\n"
+            "\\usepackage[hidelinks]{hyperref}\n"
+            "\\renewcommand{\\familydefault}{\\sfdefault}\n"
+            "\\setlist[itemize]{leftmargin=1.2em,itemsep=1pt,topsep=2pt}\n"
+            "\\pagestyle{empty}\n"
+            "\\begin{document}\n$header$body\\end{document}\n"
+        ),
+        "section": "\\vspace{6pt}{\\large\\bfseries\\MakeUppercase{$title}}\\\\[-6pt]\n\\rule{\\linewidth}{0.4pt}\n$content",
+        "entry": "\\textbf{$title}$org$location \\hfill \\textit{$date}\\par\n$bullets",
+        "bullets": "\\begin{itemize}\n$items\\end{itemize}\n",
+    },
+    "compact": {
+        **_COMMON,
+        "document": (
+            "\\documentclass[10pt]{article}\n"
+            "\\usepackage[T1]{fontenc}\n"
+            "\\usepackage[utf8]{inputenc}\n"
+            "\\usepackage[margin=0.5in]{geometry}\n"
+            "\\usepackage{enumitem}\n"
+            "\\usepackage[hidelinks]{hyperref}\n"
+            "\\setlist[itemize]{leftmargin=*,nosep}\n"
+            "\\setlength{\\parindent}{0pt}\n"
+            "\\pagestyle{empty}\n"
+            "\\begin{document}\n$header$body\\end{document}\n"
+        ),
+        "header": "{\\Large\\bfseries $name}$contact\n\n",
+        "contact": " \\hfill $contact",
+        "section": "\\subsection*{$title}\n$content",
+        "entry": "\\textbf{$title}$org$location \\hfill $date\\par\n$bullets",
+        "bullets": "\\begin{itemize}\n$items\\end{itemize}\n",
+    },
+}
+
+_cache: dict[str, dict[str, Template]] = {}
+_cache_lock = threading.Lock()
+
+
+def latex_escape(text: Any) -> str:
+    """Escape LaTeX special characters in a plain-text value."""
+    return _SPECIAL.sub(lambda match: _ESCAPES[match.group(0)], str(text))
+
+
+def available_templates() -> list[str]:
+    """Return built-in template names plus any in ``RESUME_TEMPLATE_DIR``."""
+    names = set(TEMPLATES)
+    directory = os.getenv("RESUME_TEMPLATE_DIR")
+    if directory and Path(directory).is_dir():
+        names.update(path.stem for path in Path(directory).glob("*.json"))
+    return sorted(names)
+
+
+def _load_fragments(name: str) -> dict[str, str]:
+    """Return a template's raw fragments, preferring ``RESUME_TEMPLATE_DIR`` over built-ins."""
+    directory = os.getenv("RESUME_TEMPLATE_DIR")
+    if directory:
+        path = Path(directory) / f"{name}.json"
+        if path.is_file():
+            # Custom templates may override only some fragments of the classic layout.
+            return {**TEMPLATES["classic"], **json.loads(path.read_text(encoding="utf-8"))}
+    if name not in TEMPLATES:
+        raise ValueError(f"Unknown resume template: {name!r}; expected one of: {', '.join(available_templates())}")
+    return TEMPLATES[name]
+
+
+def get_template(name: Optional[str] = None) -> dict[str, Template]:
+    """Return the compiled fragments for a template, cached after first use.
+
+    Raises:
+        ValueError: If the template does not exist.
+    """
+    name = name or DEFAULT_TEMPLATE
+    compiled = _cache.get(name)
+    if compiled is None:
+        fragments = _load_fragments(name)
+        compiled = {key: Template(fragments[key]) for key in _FRAGMENTS}
+        with _cache_lock:
+            _cache[name] = compiled
+    return compiled
+
+
+def clear_template_cache() -> None:
+    """Drop compiled templates (after editing files in ``RESUME_TEMPLATE_DIR``)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _items(value: Any) -> list[Any]:
+    """Return a list field as a list of non-empty items (a lone string is one item)."""
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)) or not isinstance(value, (list, tuple)):
+        value = [value]
+    return [item for item in value if item is not None and (isinstance(item, dict) or str(item).strip())]
+
+
+def _bullets(template: dict[str, Template], bullets: Any) -> str:
+    """Render a bullet list, or an empty string when there are none."""
+    items = _items(bullets)
+    if not items:
+        return ""
+    body = "".join(template["bullet"].substitute(text=latex_escape(item)) for item in items)
+    return template["bullets"].substitute(items=body)
+
+
+def _entry(template: dict[str, Template], entry: Any) -> str:
+    """Render one dated entry (job, degree, project) with its bullets."""
+    if not isinstance(entry, dict):
+        return template["text"].substitute(text=latex_escape(entry))
+    org = entry.get("org") or entry.get("organization") or entry.get("company") or ""
+    location = entry.get("location") or ""
+    date = _DATE_DASH.sub(" -- ", str(entry.get("date") or "").strip())
+    return template["entry"].substitute(
+        title=latex_escape(entry.get("title") or ""),
+        org=f", {latex_escape(org)}" if org else "",
+        location=f" ({latex_escape(location)})" if location else "",
+        date=latex_escape(date),
+        bullets=_bullets(template, entry.get("bullets")),
+    )
+
+
+def _section(template: dict[str, Template], section: dict[str, Any]) -> str:
+    """Render one section from its ``text``, ``lines`` and/or ``entries``."""
+    parts: list[str] = []
+    if section.get("text"):
+        parts.append(template["text"].substitute(text=latex_escape(section["text"])))
+    lines = [line for line in _items(section.get("lines")) if not isinstance(line, dict)]
+    if lines:
+        parts.append(template["lines"].substitute(lines=" \\\\\n".join(latex_escape(line) for line in lines)))
+    for entry in _items(section.get("entries")):
+        parts.append(_entry(template, entry))
+    if section.get("bullets"):
+        parts.append(_bullets(template, section["bullets"]))
+    return template["section"].substitute(title=latex_escape(section.get("title") or ""), content="\n".join(parts))
+
+
+def render_resume(content: dict[str, Any], template: Optional[str] = None) -> str:
+    """Render structured resume content as a complete LaTeX document.
+
+    Raises:
+        ValueError: If the template does not exist.
+    """
+    compiled = get_template(template)
+    contact = [latex_escape(item) for item in _items(content.get("contact")) if not isinstance(item, dict)]
+    header = compiled["header"].substitute(
+        name=latex_escape(content.get("name") or ""),
+        contact=compiled["contact"].substitute(contact=" $\\cdot$ ".join(contact)) if contact else "",
+    )
+    sections = [section for section in content.get("sections") or [] if isinstance(section, dict)]
+    body = "\n".join(_section(compiled, section) for section in sections)
+    return compiled["document"].substitute(header=header, body=body)
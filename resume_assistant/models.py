@@ -0,0 +1,226 @@
+"""Typed collector and analyzer outputs with their JSON schemas.
+
+The collector and analyzer run with a ``json_schema`` response format
+(:data:`USER_PROFILE_FORMAT`, :data:`JOB_ANALYSIS_FORMAT`), and their text is
+validated into frozen, slotted :class:`UserProfile` / :class:`JobAnalysis`
+objects once. The graph payload then carries those objects: stages read
+fields directly, and prompts reuse the compact JSON each object encodes on
+first use instead of parsing and re-serializing strings at every stage.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Optional, Union
+
+
+class SchemaError(ValueError):
+    """Model output that does not match the expected JSON schema."""
+
+
+def _string_list() -> dict[str, Any]:
+    """Return the schema for an array of strings."""
+    return {"type": "array", "items": {"type": "string"}}
+
+
+def _nullable_string() -> dict[str, Any]:
+    """Return the schema for a string or null."""
+    return {"type": ["string", "null"]}
+
+
+def _response_format(name: str, properties: dict[str, Any]) -> dict[str, Any]:
+    """Wrap an object schema as a strict OpenAI ``json_schema`` response format."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _json_object(text: str) -> dict[str, Any]:
+    """Return the JSON object in model text, tolerating fences and surrounding prose."""
+    clean = text.replace("```json", "").replace("```", "").strip()
+    if "{" in clean and "}" in clean:
+        clean = clean[clean.find("{") : clean.rfind("}") + 1]
+    try:
+        data = json.loads(clean)
+    except json.JSONDecodeError as exc:
+        raise SchemaError(f"output is not valid JSON ({exc.msg})") from exc
+    if not isinstance(data, dict):
+        raise SchemaError("output is not a JSON object")
+    return data
+
+
+def _text_field(data: dict[str, Any], key: str, problems: list[str]) -> Optional[str]:
+    """Read a string-or-null field, recording a problem for any other type."""
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    problems.append(f"{key} must be a string or null")
+    return None
+
+
+def _list_field(data: dict[str, Any], key: str, problems: list[str]) -> tuple[str, ...]:
+    """Read an array-of-strings field (a lone string counts as one item)."""
+    value = data.get(key)
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or any(isinstance(item, (dict, list)) for item in value):
+        problems.append(f"{key} must be an array of strings")
+        return ()
+    return tuple(str(item).strip() for item in value if item is not None and str(item).strip())
+
+
+class _Model:
+    """Shared conversions for the slotted output models."""
+
+    __slots__ = ()
+    _TEXT_FIELDS: tuple[str, ...] = ()
+    _LIST_FIELDS: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Any):
+        """Validate a decoded JSON object.
+
+        Raises:
+            SchemaError: If the object does not match the schema.
+        """
+        if not isinstance(data, dict):
+            raise SchemaError("output is not a JSON object")
+        known = (*cls._TEXT_FIELDS, *cls._LIST_FIELDS)
+        if not any(key in data for key in known):
+            raise SchemaError(f"output has none of the expected keys: {', '.join(known)}")
+        problems: list[str] = []
+        values: dict[str, Any] = {key: _text_field(data, key, problems) for key in cls._TEXT_FIELDS}
+        values.update({key: _list_field(data, key, problems) for key in cls._LIST_FIELDS})
+        if problems:
+            raise SchemaError("; ".join(problems))
+        return cls(**values)
+
+    @classmethod
+    def from_json(cls, text: str):
+        """Parse and validate model text.
+
+        Raises:
+            SchemaError: If the text is not a JSON object matching the schema.
+        """
+        return cls.from_dict(_json_object(text))
+
+    @classmethod
+    def coerce(cls, value: Any):
+        """Return ``value`` as this model, accepting an instance, a dict, or JSON text.
+
+        Raises:
+            SchemaError: If the value does not match the schema.
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls.from_dict(value)
+        return cls.from_json(str(value))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the fields as a JSON-compatible dict."""
+        return {
+            item.name: list(getattr(self, item.name)) if item.name in self._LIST_FIELDS else getattr(self, item.name)
+            for item in fields(self)
+            if item.name != "_json"
+        }
+
+    def to_json(self) -> str:
+        """Return the compact JSON encoding, computed once per object."""
+        if self._json is None:
+            object.__setattr__(self, "_json", json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")))
+        return self._json
+
+    def __str__(self) -> str:
+        return self.to_json()
+
+
+@dataclass(frozen=True, slots=True)
+class UserProfile(_Model):
+    """Structured profile extracted from a user's resume text."""
+
+    name: Optional[str] = None
+    education: tuple[str, ...] = ()
+    skills: tuple[str, ...] = ()
+    experience: tuple[str, ...] = ()
+    projects: tuple[str, ...] = ()
+    certifications: tuple[str, ...] = ()
+    summary: Optional[str] = None
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    _TEXT_FIELDS = ("name", "summary")
+    _LIST_FIELDS = ("education", "skills", "experience", "projects", "certifications")
+
+
+@dataclass(frozen=True, slots=True)
+class JobAnalysis(_Model):
+    """Structured requirements extracted from a job description."""
+
+    role: Optional[str] = None
+    required_skills: tuple[str, ...] = ()
+    preferred_skills: tuple[str, ...] = ()
+    keywords: tuple[str, ...] = ()
+    experience_level: Optional[str] = None
+    domain: Optional[str] = None
+    _json: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    _TEXT_FIELDS = ("role", "experience_level", "domain")
+    _LIST_FIELDS = ("required_skills", "preferred_skills", "keywords")
+
+
+# Stage inputs: the validated model, or its JSON text from an external caller.
+ProfileLike = Union[UserProfile, str]
+AnalysisLike = Union[JobAnalysis, str]
+
+USER_PROFILE_FORMAT = _response_format(
+    "user_profile",
+    {
+        "name": _nullable_string(),
+        "education": _string_list(),
+        "skills": _string_list(),
+        "experience": _string_list(),
+        "projects": _string_list(),
+        "certifications": _string_list(),
+        "summary": _nullable_string(),
+    },
+)
+JOB_ANALYSIS_FORMAT = _response_format(
+    "job_analysis",
+    {
+        "role": _nullable_string(),
+        "required_skills": _string_list(),
+        "preferred_skills": _string_list(),
+        "keywords": _string_list(),
+        "experience_level": _nullable_string(),
+        "domain": _nullable_string(),
+    },
+)
+
+
+def to_jsonable(value: Union[_Model, Any]) -> Any:
+    """Return a model as a dict and any other value unchanged (for JSON responses)."""
+    return value.to_dict() if isinstance(value, _Model) else value
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook that encodes models as dicts."""
+    if isinstance(value, _Model):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,280 @@
+"""Deterministic resume section parser producing the collector's JSON schema.
+
+Most resumes label their sections explicitly (Education, Skills, Employment,
+Projects, Certifications), so the collector LLM is only needed for what the
+rules cannot place. :func:`parse_resume` returns the profile plus a
+confidence per field; the collector fills only fields below
+``MIN_CONFIDENCE`` and is skipped when every field clears it.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+PROFILE_FIELDS = ("name", "education", "skills", "experience", "projects", "certifications", "summary")
+LIST_FIELDS = ("education", "skills", "experience", "projects", "certifications")
+
+# Fields parsed below this confidence are filled by the collector LLM.
+MIN_CONFIDENCE = float(os.getenv("RESUME_PARSER_MIN_CONFIDENCE", "0.7"))
+
+_HEADING_ALIASES = {
+    "summary": ("summary", "professional summary", "profile", "about", "about me", "objective", "career objective"),
+    "education": ("education", "academic background", "academics", "education and training", "qualifications"),
+    "skills": (
+        "skills",
+        "technical skills",
+        "core skills",
+        "key skills",
+        "core competencies",
+        "competencies",
+        "technologies",
+        "tech stack",
+        "skills and tools",
+        "tools and technologies",
+        # Programming and spoken languages; the schema has no separate field for them.
+        "languages",
+        "programming languages",
+    ),
+    "experience": (
+        "experience",
+        "work experience",
+        "professional experience",
+        "relevant experience",
+        "employment",
+        "employment history",
+        "work history",
+        "career history",
+    ),
+    "projects": ("projects", "software projects", "personal projects", "selected projects", "key projects"),
+    "certifications": (
+        "certifications",
+        "certification",
+        "certificates",
+        "licenses and certifications",
+        "licenses",
+        "courses and certifications",
+    ),
+    # Recognized so they end the previous section, but not part of the schema.
+    "_other": (
+        "additional information",
+        "interests",
+        "hobbies",
+        "volunteering",
+        "volunteer experience",
+        "awards",
+        "honors and awards",
+        "achievements",
+        "publications",
+        "references",
+        "activities",
+        "leadership",
+    ),
+}
+_HEADINGS = {alias: section for section, aliases in _HEADING_ALIASES.items() for alias in aliases}
+
+_HEADING_LINE = re.compile(r"^[#*\s]*([A-Za-z][A-Za-z &/,-]{1,40}?)[\s*]*:?\s*$")
+_INLINE_HEADING = re.compile(r"^[#*\s]*([A-Za-z][A-Za-z &/-]{1,30}?)\s*:\s*(\S.*)$")
+_BULLET = re.compile(r"^\s*(?:[-*•▪●◦–—>]|\d{1,2}[.)])\s+")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_URL = re.compile(r"\b(?:https?://|www\.|linkedin\.com|github\.com)\S*", re.IGNORECASE)
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|to|until)\s*(?:{_DATE}|present|current|now|today)",
+    re.IGNORECASE,
+)
+_NAME = re.compile(r"^[A-Za-z][A-Za-z'.-]*(?:\s+[A-Za-z][A-Za-z'.-]*){1,3}$")
+_SPLIT_SKILLS = re.compile(r"\s*[,;|]\s*")
+# Words that mark a header line as request text ("Please write my resume.") rather than a name.
+_NOT_NAME_WORDS = frozenset(
+    (
+        "please", "write", "create", "make", "build", "update", "improve", "review", "tailor", "help", "need",
+        "want", "can", "could", "would", "is", "am", "are", "my", "me", "i", "you", "your", "we", "our", "this",
+        "here", "below", "resume", "cv", "curriculum", "vitae", "job", "hi", "hello", "dear", "thanks",
+    )
+)
+
+
+@dataclass
+class ProfileParse:
+    """Locally parsed profile with a 0-1 confidence for every schema field."""
+
+    profile: dict[str, Any]
+    confidence: dict[str, float]
+    sections_found: tuple[str, ...] = field(default_factory=tuple)
+
+    def low_confidence_fields(self, threshold: Optional[float] = None) -> list[str]:
+        """Return the fields whose confidence is below ``threshold``."""
+        limit = MIN_CONFIDENCE if threshold is None else threshold
+        return [name for name in PROFILE_FIELDS if self.confidence.get(name, 0.0) < limit]
+
+    def is_complete(self, threshold: Optional[float] = None) -> bool:
+        """Return whether every field is confident enough to skip the LLM."""
+        return not self.low_confidence_fields(threshold)
+
+    def merge(self, llm_profile: dict[str, Any], threshold: Optional[float] = None) -> dict[str, Any]:
+        """Fill low-confidence fields from an LLM-extracted profile."""
+        merged = dict(self.profile)
+        for name in self.low_confidence_fields(threshold):
+            value = llm_profile.get(name)
+            if value not in (None, "", []):
+                merged[name] = value
+        return merged
+
+
+def _normalize_heading(text: str) -> str:
+    """Lower-case a heading candidate and unify ``&``/``and`` and spacing."""
+    text = text.lower().replace("&", " and ").replace("/", " and ")
+    return " ".join(text.replace(",", " ").split())
+
+
+def _heading_section(line: str) -> tuple[Optional[str], str]:
+    """Return ``(section, inline_content)`` if ``line`` is a section heading."""
+    match = _HEADING_LINE.match(line)
+    if match:
+        section = _HEADINGS.get(_normalize_heading(match.group(1)))
+        if section is not None:
+            return section, ""
+    match = _INLINE_HEADING.match(line)
+    if match:
+        section = _HEADINGS.get(_normalize_heading(match.group(1)))
+        if section is not None:
+            return section, match.group(2).strip()
+    return None, ""
+
+
+def is_contact_line(line: str) -> bool:
+    """Return whether a line holds contact details (email, phone, or profile URL)."""
+    return bool(_EMAIL.search(line) or _PHONE.search(line) or _URL.search(line))
+
+
+def _strip_bullet(line: str) -> tuple[bool, str]:
+    """Return ``(is_bullet, text_without_marker)``."""
+    match = _BULLET.match(line)
+    if match:
+        return True, line[match.end() :].strip()
+    return False, line.strip()
+
+
+def _entries(lines: list[str]) -> list[str]:
+    """Group header lines with the bullets beneath them (``Header\\n  - bullet``)."""
+    entries: list[str] = []
+    bullet_indent: Optional[int] = None
+    for line in lines:
+        bullet, text = _strip_bullet(line)
+        if not text:
+            continue
+        indent = len(line) - len(line.lstrip())
+        if bullet and entries:
+            entries[-1] = f"{entries[-1]}\n  - {text}"
+            bullet_indent = indent
+        elif not bullet and bullet_indent is not None and indent > bullet_indent:
+            # Wrapped bullet text indented past the bullet marker.
+            entries[-1] = f"{entries[-1]} {text}"
+        else:
+            entries.append(text)
+            bullet_indent = None
+    return entries
+
+
+def _skills(lines: list[str]) -> list[str]:
+    """Return skill items: categorized lines stay whole, bare lists are split."""
+    skills: list[str] = []
+    for line in lines:
+        _, text = _strip_bullet(line)
+        if not text:
+            continue
+        if ":" in text or len(_SPLIT_SKILLS.split(text)) == 1:
+            skills.append(text)
+        else:
+            skills.extend(item for item in _SPLIT_SKILLS.split(text) if item)
+    return skills
+
+
+def _flat_items(lines: list[str]) -> list[str]:
+    """Return one item per non-empty line, without bullet markers."""
+    return [text for text in (_strip_bullet(line)[1] for line in lines) if text]
+
+
+def _find_name(header: list[str]) -> tuple[Optional[str], float]:
+    """Pick the candidate's name from the lines before the first heading."""
+    for index, line in enumerate(header[:4]):
+        candidate = re.split(r"\s[|•,]\s|\s{2,}", line.strip())[0].strip()
+        if is_contact_line(candidate) or not _NAME.match(candidate):
+            continue
+        words = candidate.split()
+        if candidate.endswith(("!", "?", ":")) or (candidate.endswith(".") and len(words[-1]) > 4):
+            continue  # A sentence, not a name ("Jr." and "Sr." still pass).
+        if any(word.strip(".").lower() in _NOT_NAME_WORDS for word in words):
+            continue
+        if not all(word[0].isupper() for word in words):
+            # Name-shaped but not capitalized like one: let the collector decide.
+            return candidate, 0.5
+        # The first line of a resume is almost always the name.
+        return candidate.title() if candidate.isupper() else candidate, 0.9 if index == 0 else 0.75
+    return None, 0.0
+
+
+def parse_resume(text: str) -> ProfileParse:
+    """Split resume text into the collector schema with per-field confidence."""
+    header: list[str] = []
+    sections: dict[str, list[str]] = {}
+    current: Optional[str] = None
+    for raw_line in text.splitlines():
+        if not raw_line.strip():
+            continue
+        section, inline = _heading_section(raw_line.strip())
+        if section is not None:
+            current = section
+            sections.setdefault(section, [])
+            if inline:
+                sections[section].append(inline)
+            continue
+        if current is None:
+            header.append(raw_line)
+        else:
+            sections[current].append(raw_line)
+
+    profile: dict[str, Any] = {name: [] for name in LIST_FIELDS}
+    confidence: dict[str, float] = {}
+    found = tuple(name for name in sections if name != "_other")
+
+    profile["name"], confidence["name"] = _find_name([line.strip() for line in header])
+
+    for name in ("education", "experience", "projects"):
+        if name in sections:
+            profile[name] = _entries(sections[name])
+    if "skills" in sections:
+        profile["skills"] = _skills(sections["skills"])
+    if "certifications" in sections:
+        profile["certifications"] = _flat_items(sections["certifications"])
+    summary_lines = [_strip_bullet(line)[1] for line in sections.get("summary", [])]
+    profile["summary"] = " ".join(line for line in summary_lines if line) or None
+
+    lowered = text.lower()
+    for name in LIST_FIELDS:
+        if profile[name]:
+            score = 0.9
+            if name in ("education", "experience") and not any(DATE_RANGE.search(e) for e in profile[name]):
+                # Entries usually carry dates; without any, the split is less trustworthy.
+                score = 0.75
+            confidence[name] = score
+        elif name in sections:
+            confidence[name] = 0.3
+        elif name[:6] in lowered:
+            # Mentioned somewhere but not under a recognized heading.
+            confidence[name] = 0.4
+        else:
+            confidence[name] = 0.8
+    # Without a summary section the collector writes one from the rest of the resume.
+    confidence["summary"] = 0.9 if profile["summary"] else 0.4
+
+    if not found:
+        # No recognized headings: nothing here can be trusted.
+        confidence = {name: 0.0 for name in PROFILE_FIELDS}
+    ordered = {name: profile[name] for name in PROFILE_FIELDS}
+    return ProfileParse(profile=ordered, confidence=confidence, sections_found=found)
@@ -0,0 +1,101 @@
+"""Deterministic keyword router for resume assistant requests."""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+
+MODES = ("FULL_PIPELINE", "WRITE_ONLY", "REVIEW_ONLY", "ANALYZE_ONLY")
+
+# Below this confidence the graph falls back to the LLM router.
+MIN_CONFIDENCE = float(os.getenv("RESUME_ROUTER_MIN_CONFIDENCE", "0.6"))
+
+_MODE_PATTERNS: dict[str, list[tuple[re.Pattern, float]]] = {
+    "FULL_PIPELINE": [
+        (re.compile(r"\b(full|complete|end[- ]to[- ]end)\b"), 2.0),
+        (
+            re.compile(
+                r"\b(write|tailor|generate|create)\b"
+                r"(?!.*\b(no|without|skip)\s+(the\s+)?(review|feedback))"
+                r".*\b(review|feedback|score)\b"
+            ),
+            4.0,
+        ),
+        (re.compile(r"\btailor(ed|ing)?\b"), 1.0),
+    ],
+    "WRITE_ONLY": [
+        (re.compile(r"\b(only|just)\s+(write|generate|create|draft)\b"), 2.5),
+        (re.compile(r"\b(no|without|skip)\s+(the\s+)?(review|feedback)\b"), 2.5),
+        (re.compile(r"\b(write|generate|create|draft|build)\b.*\b(resume|cv)\b"), 1.0),
+    ],
+    "REVIEW_ONLY": [
+        (re.compile(r"\b(review|critique|feedback|proofread)\b"), 2.0),
+        (re.compile(r"\b(rate|score|grade|evaluate)\b.*\b(resume|cv)\b"), 2.0),
+        (re.compile(r"\bats\s+(check|score)\b"), 1.5),
+        (re.compile(r"\b(improve|fix)\s+(my|this)\s+(resume|cv)\b"), 1.0),
+    ],
+    "ANALYZE_ONLY": [
+        (re.compile(r"\b(analy[sz]e|break\s+down|summari[sz]e)\b.*\b(job|jd|role|posting|position)\b"), 2.5),
+        (re.compile(r"\bwhat\s+(skills|qualifications|experience)\b"), 2.0),
+        (re.compile(r"\b(job|role)\s+requirements\b"), 1.5),
+        (re.compile(r"\bonly\s+(the\s+)?(analysis|job analysis)\b"), 2.5),
+    ],
+}
+
+_RESUME_HEADINGS = re.compile(
+    r"^\s*(education|skills|experience|employment|projects|certifications|summary)\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """Routing outcome with the chosen mode, its confidence, and its source."""
+
+    mode: str
+    confidence: float
+    source: str = "rules"
+
+
+def normalize_mode(value: str | None) -> str | None:
+    """Return the canonical mode label for ``value`` or ``None`` if unknown."""
+    if not value:
+        return None
+    label = value.strip().upper().replace("-", "_").replace(" ", "_")
+    for mode in MODES:
+        if mode in label:
+            return mode
+    return None
+
+
+def classify_request(user_input: str, job_description: str = "") -> RouteDecision:
+    """Classify a resume request into a workflow mode using keyword rules.
+
+    Confidence combines how strongly the winning mode matched with its
+    margin over the runner-up; requests without a job description are
+    discounted because every workflow relies on the JD analysis.
+    """
+    text = user_input.lower()
+    scores = dict.fromkeys(MODES, 0.0)
+    for mode, patterns in _MODE_PATTERNS.items():
+        for pattern, weight in patterns:
+            if pattern.search(text):
+                scores[mode] += weight
+
+    has_jd = bool(job_description and job_description.strip())
+    if has_jd and len(_RESUME_HEADINGS.findall(user_input)) >= 2:
+        # Raw resume text plus a JD with no stronger intent is a full run.
+        scores["FULL_PIPELINE"] += 2.0
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best_mode, best), (_, runner_up) = ranked[0], ranked[1]
+    if best <= 0:
+        return RouteDecision(mode="FULL_PIPELINE", confidence=0.0)
+
+    margin = (best - runner_up) / best
+    strength = min(1.0, best / 2.0)
+    confidence = margin * strength
+    if not has_jd:
+        confidence *= 0.7
+    return RouteDecision(mode=best_mode, confidence=round(confidence, 3))
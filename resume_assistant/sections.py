@@ -0,0 +1,114 @@
+"""Split collector profiles into independently written resume sections.
+
+Each section of the collector JSON becomes its own writer prompt, so the
+response cache (keyed by agent instructions and prompt) naturally hashes
+the section together with the job analysis: after an edit, only the
+sections whose data changed miss the cache and are regenerated. Results
+are reassembled into the content JSON rendered by ``latex_templates``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+from .models import AnalysisLike, UserProfile
+
+# Document order of the generated sections.
+SECTION_ORDER = ("summary", "skills", "experience", "projects", "education", "certifications")
+SECTION_TITLES = {
+    "summary": "Summary",
+    "skills": "Skills",
+    "experience": "Experience",
+    "projects": "Projects",
+    "education": "Education",
+    "certifications": "Certifications",
+}
+_ENTRY_SECTIONS = ("experience", "projects", "education")
+
+
+def load_profile(user_profile: Any) -> Optional[dict[str, Any]]:
+    """Return the collector profile as a dict, or ``None`` if it is not a JSON object."""
+    if isinstance(user_profile, UserProfile):
+        return user_profile.to_dict()
+    if isinstance(user_profile, dict):
+        return user_profile
+    try:
+        profile = json.loads(user_profile)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    return profile if isinstance(profile, dict) else None
+
+
+def _canonical(value: Any) -> str:
+    """Serialize section data deterministically so equal data gives equal prompts."""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _first_line(item: Any) -> str:
+    """Return the header line of a merged ``Header\\n  - bullet`` entry."""
+    return str(item).strip().splitlines()[0] if str(item).strip() else ""
+
+
+def section_inputs(profile: dict[str, Any]) -> list[tuple[str, Any]]:
+    """Return ``(section, data)`` pairs for the non-empty sections, in document order.
+
+    The summary also sees the skills and role headers, so a new job or
+    skill refreshes it while unrelated edits (a project bullet) do not.
+    """
+    inputs: list[tuple[str, Any]] = []
+    for name in SECTION_ORDER:
+        if name == "summary":
+            data = {
+                "summary": profile.get("summary") or "",
+                "skills": profile.get("skills") or [],
+                "roles": [_first_line(item) for item in profile.get("experience") or []],
+            }
+            if not (data["summary"] or data["skills"] or data["roles"]):
+                continue
+        else:
+            data = profile.get(name)
+            if not data:
+                continue
+        inputs.append((name, data))
+    return inputs
+
+
+def section_prompt(name: str, data: Any, job_analysis: AnalysisLike) -> str:
+    """Build the writer prompt for one section."""
+    return f"Section: {name}\nSection Data: {_canonical(data)}\n\nJob Analysis Requirements: {job_analysis}"
+
+
+def fallback_section(name: str, data: Any) -> dict[str, Any]:
+    """Lay out a section directly from profile data (used when the model output is unusable)."""
+    title = SECTION_TITLES.get(name, name.title())
+    if name == "summary":
+        return {"title": title, "text": str(data.get("summary") or "")}
+    items = data if isinstance(data, list) else [data]
+    if name in _ENTRY_SECTIONS:
+        entries = []
+        for item in items:
+            lines = [line.strip().lstrip("-•* ").strip() for line in str(item).strip().splitlines()]
+            entries.append({"title": lines[0] if lines else "", "bullets": [line for line in lines[1:] if line]})
+        return {"title": title, "entries": entries}
+    return {"title": title, "lines": [str(item) for item in items]}
+
+
+def parse_section(name: str, text: str, data: Any) -> dict[str, Any]:
+    """Parse one section's JSON from the model, falling back to the profile data."""
+    clean = text.replace("```json", "").replace("```", "").strip()
+    if "{" in clean and "}" in clean:
+        clean = clean[clean.find("{") : clean.rfind("}") + 1]
+    try:
+        section = json.loads(clean)
+    except json.JSONDecodeError:
+        return fallback_section(name, data)
+    if not isinstance(section, dict) or not any(section.get(key) for key in ("text", "lines", "entries", "bullets")):
+        return fallback_section(name, data)
+    section.setdefault("title", SECTION_TITLES.get(name, name.title()))
+    return section
+
+
+def assemble(profile: dict[str, Any], sections: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine the profile's name with written sections into renderable content."""
+    return {"name": profile.get("name") or "", "sections": sections}
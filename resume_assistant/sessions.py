@@ -0,0 +1,204 @@
+"""Multi-turn resume sessions: the latest pipeline state kept under a session id.
+
+After a run, the graph saves ``user_profile``, ``job_analysis``, ``resume``
+(plus its content JSON) and ``feedback`` under the request's ``session_id``.
+A follow-up on the same session starts the graph at the executor it needs
+(:func:`plan_follow_up`), so "make the summary shorter" is one writer call
+instead of a full rerun. Sessions live in a bounded, TTL-evicted in-memory
+LRU with an optional SQLite tier (``RESUME_SESSION_SQLITE_PATH``) that
+survives restarts and can be shared between processes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .jd_store import normalize_jd
+from .models import json_default
+from .routing import MIN_CONFIDENCE, classify_request, normalize_mode
+
+# Payload keys persisted between turns.
+SESSION_FIELDS = ("job_description", "user_profile", "job_analysis", "resume", "resume_content", "feedback", "mode")
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_store: Optional["SessionStore"] = None
+_store_lock = threading.Lock()
+
+
+class SessionPlanError(ValueError):
+    """A follow-up whose explicit mode cannot run on the session's stored state."""
+
+
+def new_session_id() -> str:
+    """Return a fresh random session id."""
+    return uuid.uuid4().hex
+
+
+class SessionStore:
+    """LRU of session states with a TTL, optionally backed by SQLite."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 86400.0, path: Optional[str] = None) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sessions: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[dict[str, Any]]:
+        """Return a copy of the live state for ``session_id``, or ``None``."""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[1] <= now:
+                del self._sessions[session_id]
+                entry = None
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT state, expires_at FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(session_id, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return dict(entry[0])
+
+    def save(self, session_id: str, state: dict[str, Any]) -> dict[str, Any]:
+        """Store the session fields of ``state`` and return what was saved."""
+        saved = {key: state[key] for key in SESSION_FIELDS if state.get(key) not in (None, "")}
+        saved["updated_at"] = time.time()
+        expires_at = saved["updated_at"] + self.ttl_seconds
+        with self._lock:
+            self._remember(session_id, (saved, expires_at))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(saved, ensure_ascii=False, default=json_default), expires_at),
+                )
+                self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+                self._conn.commit()
+        return saved
+
+    def delete(self, session_id: str) -> bool:
+        """Forget a session; return whether it existed in memory or on disk."""
+        with self._lock:
+            found = self._sessions.pop(session_id, None) is not None
+            if self._conn is not None:
+                cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._conn.commit()
+                found = found or cursor.rowcount > 0
+        return found
+
+    def stats(self) -> dict[str, Any]:
+        """Return session counts and lookup counters."""
+        return {
+            "sessions": len(self._sessions),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "sqlite": bool(self._conn),
+        }
+
+    def _remember(self, session_id: str, entry: tuple[dict[str, Any], float]) -> None:
+        """Insert into the LRU and evict the least recently used sessions over capacity."""
+        self._sessions[session_id] = entry
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store configured from ``RESUME_SESSION_*``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore(
+                    max_sessions=int(os.getenv("RESUME_SESSION_MAX", "1000")),
+                    ttl_seconds=float(os.getenv("RESUME_SESSION_TTL_SECONDS", "86400")),
+                    path=os.getenv("RESUME_SESSION_SQLITE_PATH") or None,
+                )
+    return _store
+
+
+def plan_follow_up(
+    state: dict[str, Any], user_input: str, job_description: str, mode: Optional[str] = None
+) -> dict[str, Any]:
+    """Return payload fields that resume a session at the right executor.
+
+    The result carries the stored state plus ``resume_at`` (an executor id)
+    and ``mode``; an empty ``resume_at`` means the request runs the graph
+    from the router, reusing only what is still valid.
+
+    Raises:
+        SessionPlanError: If ``mode`` is REVIEW_ONLY and the session has no resume.
+    """
+    new_jd = bool(job_description.strip()) and normalize_jd(job_description) != normalize_jd(
+        state.get("job_description", "")
+    )
+    plan: dict[str, Any] = {key: state[key] for key in SESSION_FIELDS if key in state and key != "mode"}
+    if new_jd or not state.get("job_description"):
+        plan["job_description"] = job_description
+    if new_jd:
+        plan.pop("job_analysis", None)
+        plan.pop("feedback", None)
+
+    explicit = normalize_mode(mode)
+    if explicit == "REVIEW_ONLY":
+        # Never switch an explicit review into a rewrite.
+        if not plan.get("resume"):
+            raise SessionPlanError("REVIEW_ONLY needs a session with a resume; run WRITE_ONLY or FULL_PIPELINE first")
+        if new_jd:
+            return {**plan, "mode": "REVIEW_ONLY", "resume_at": "analyze_job"}
+        return {**plan, "mode": "REVIEW_ONLY", "resume_at": "review_resume"}
+    if explicit == "FULL_PIPELINE" or not state.get("user_profile"):
+        # Start over, keeping the analysis when the JD is unchanged (the analyzer passes it through).
+        return {key: plan[key] for key in ("job_description", "job_analysis") if key in plan}
+    if new_jd:
+        # Retarget the stored profile: analyze the new JD, then rewrite.
+        plan.pop("resume", None)
+        plan.pop("resume_content", None)
+        return {**plan, "mode": "WRITE_ONLY", "resume_at": "analyze_job"}
+
+    decision = classify_request(user_input, "")
+    intent = explicit or (decision.mode if decision.confidence >= MIN_CONFIDENCE else None)
+    if intent == "ANALYZE_ONLY" and plan.get("job_analysis"):
+        return {**plan, "mode": "ANALYZE_ONLY", "resume_at": "emit_output"}
+    if intent == "REVIEW_ONLY" and plan.get("resume"):
+        return {**plan, "mode": "REVIEW_ONLY", "resume_at": "review_resume"}
+    if intent == "WRITE_ONLY" and plan.get("job_analysis"):
+        # A fresh write from the stored profile rather than an edit of the current draft.
+        plan.pop("feedback", None)
+        return {**plan, "mode": "WRITE_ONLY", "resume_at": "write_resume"}
+    if plan.get("resume") and plan.get("job_analysis"):
+        # Anything else is read as a change request against the current resume.
+        plan.pop("feedback", None)
+        return {**plan, "mode": "WRITE_ONLY", "resume_at": "write_resume", "revision": user_input}
+    return {**plan, "mode": "WRITE_ONLY", "resume_at": "analyze_job"}
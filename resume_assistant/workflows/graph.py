@@ -6,8 +6,20 @@ from typing import Any
 
 from agent_framework import WorkflowBuilder, WorkflowContext, executor
 
-from agent_framework_utils import create_agent
-from ..agents import collect_info, analyze_job, write_resume, review_resume
+from agent_framework_utils import emit_event, observe_stage
+from agent_tracing import annotate_span
+from ..agents import (
+    collect_info_async,
+    review_resume_async,
+    revise_resume_async,
+    route_request_async,
+    write_resume_document_async,
+)
+from ..checkpoints import get_checkpoint_store
+from ..jd_store import analyze_job_with_store
+from ..models import JobAnalysis, UserProfile
+from ..routing import MIN_CONFIDENCE, RouteDecision, classify_request, normalize_mode
+from ..sessions import get_session_store
 
 
 def _mode_is(*modes: str):
@@ -18,59 +30,158 @@ def _mode_is(*modes: str):
     return _cond
 
 
+def _routed(*modes: str):
+    """Return a router condition for fresh requests (not session follow-ups) in ``modes``."""
+    def _cond(message: Any) -> bool:
+        return isinstance(message, dict) and not message.get("resume_at") and message.get("mode") in modes
+
+    return _cond
+
+
+def _resumes_at(executor_id: str):
+    """Return a router condition for session follow-ups that start at ``executor_id``."""
+    def _cond(message: Any) -> bool:
+        return isinstance(message, dict) and message.get("resume_at") == executor_id
+
+    return _cond
+
+
+def _either(*conditions):
+    """Return a condition that matches when any of ``conditions`` does."""
+    def _cond(message: Any) -> bool:
+        return any(condition(message) for condition in conditions)
+
+    return _cond
+
+
 def _ensure_payload(message: Any) -> dict:
-    """Normalize incoming workflow message to the expected payload shape."""
-    if isinstance(message, dict):
-        return dict(message)
-    return {"user_input": str(message), "job_description": ""}
+    """Normalize incoming workflow message to the expected payload shape.
+
+    Profiles and analyses given as JSON text or dicts (batch callers,
+    restored sessions and checkpoints) become :class:`UserProfile` /
+    :class:`JobAnalysis` objects, so later stages never re-parse them.
+    """
+    if not isinstance(message, dict):
+        return {"user_input": str(message), "job_description": ""}
+    payload = dict(message)
+    for key, model in (("user_profile", UserProfile), ("job_analysis", JobAnalysis)):
+        if payload.get(key) and not isinstance(payload[key], model):
+            payload[key] = model.coerce(payload[key])
+    return payload
+
+
+def _checkpoint(stage: str, payload: dict) -> None:
+    """Save an executor's output payload when the run has a ``run_id``."""
+    if payload.get("run_id"):
+        get_checkpoint_store().save(payload["run_id"], stage, payload)
+
+
+async def _decide_route(payload: dict) -> RouteDecision:
+    """Pick a mode: session follow-up or explicit request, then keyword rules, then the LLM router."""
+    if payload.get("resume_at"):
+        return RouteDecision(mode=payload["mode"], confidence=1.0, source="session")
+    explicit = normalize_mode(payload.get("mode"))
+    if explicit:
+        return RouteDecision(mode=explicit, confidence=1.0, source="explicit")
+
+    user_input = payload.get("user_input", "")
+    job_description = payload.get("job_description", "")
+    decision = classify_request(user_input, job_description)
+    if decision.confidence >= MIN_CONFIDENCE:
+        return decision
+
+    label = normalize_mode(await route_request_async(user_input, job_description))
+    return RouteDecision(mode=label or decision.mode, confidence=decision.confidence, source="llm")
 
 
 @executor(id="route_request")
 async def route_request(message: dict, ctx: WorkflowContext[dict]) -> None:
     """Select the execution mode based on user request and job description."""
     payload = _ensure_payload(message)
-    selector = create_agent(
-        name="resume_assistant_router",
-        instructions=(
-            "Decide which workflow to use for a resume request.\n"
-            "Return ONLY one of: FULL_PIPELINE, WRITE_ONLY, REVIEW_ONLY, ANALYZE_ONLY."
-        ),
-    )
-    prompt = (
-        "Choose workflow for this request. Return ONLY FULL_PIPELINE, WRITE_ONLY, REVIEW_ONLY, or ANALYZE_ONLY.\n\n"
-        f"User request:\n{payload.get('user_input','')}\n\n"
-        f"Job description provided: {'Yes' if payload.get('job_description') else 'No'}\n\n"
-        f"Job description:\n{payload.get('job_description','')}\n"
-    )
-    mode = (await selector.run(prompt)).text.strip().upper()
-    payload["mode"] = mode
+    async with observe_stage("route_request"):
+        decision = await _decide_route(payload)
+        annotate_span(mode=decision.mode, confidence=decision.confidence, source=decision.source)
+    payload["mode"] = decision.mode
+    payload["route"] = {"confidence": decision.confidence, "source": decision.source}
+    emit_event({"event": "route", "mode": decision.mode, **payload["route"]})
+    _checkpoint("route_request", payload)
     await ctx.send_message(payload)
 
 
 @executor(id="collect_info")
 async def collect_info_node(message: dict, ctx: WorkflowContext[dict]) -> None:
-    """Populate payload with structured user profile data."""
+    """Populate payload with structured user profile data.
+
+    A payload that already carries ``user_profile`` (a run resumed from its
+    checkpoints) is passed through as is.
+    """
     payload = _ensure_payload(message)
-    payload["user_profile"] = collect_info(payload.get("user_input", ""))
+    if not payload.get("user_profile"):
+        async with observe_stage("collect_info"):
+            payload["user_profile"] = await collect_info_async(payload.get("user_input", ""))
+        _checkpoint("collect_info", payload)
     await ctx.send_message(payload)
 
 
+async def _with_job_analysis(message: Any) -> dict:
+    """Return a copy of the payload with structured job analysis attached.
+
+    A payload that already carries ``job_analysis`` (for example, from a
+    batch run that analyzed the JD once up front) is passed through as is.
+    """
+    payload = _ensure_payload(message)
+    if payload.get("job_analysis"):
+        return payload
+    async with observe_stage("analyze_job"):
+        payload["job_analysis"] = await analyze_job_with_store(payload.get("job_description", ""))
+    _checkpoint("analyze_job", payload)
+    return payload
+
+
 @executor(id="analyze_job")
 async def analyze_job_node(message: dict, ctx: WorkflowContext[dict]) -> None:
     """Populate payload with structured job analysis data."""
-    payload = _ensure_payload(message)
-    payload["job_analysis"] = analyze_job(payload.get("job_description", ""))
+    await ctx.send_message(await _with_job_analysis(message))
+
+
+@executor(id="analyze_job_parallel")
+async def analyze_job_parallel_node(message: dict, ctx: WorkflowContext[dict]) -> None:
+    """Analyze the job description alongside profile collection (FULL_PIPELINE)."""
+    await ctx.send_message(await _with_job_analysis(message))
+
+
+@executor(id="join_profile_and_job")
+async def join_profile_and_job_node(messages: list[dict], ctx: WorkflowContext[dict]) -> None:
+    """Merge the parallel collector and analyzer payloads into one."""
+    payload: dict = {}
+    for message in messages:
+        branch = _ensure_payload(message)
+        for key, value in branch.items():
+            if key not in payload or key in ("user_profile", "job_analysis"):
+                payload[key] = value
     await ctx.send_message(payload)
 
 
 @executor(id="write_resume")
 async def write_resume_node(message: dict, ctx: WorkflowContext[dict]) -> None:
-    """Populate payload with generated resume output."""
+    """Populate payload with generated resume output (or revise it for a session follow-up)."""
     payload = _ensure_payload(message)
-    payload["resume"] = write_resume(
-        payload.get("user_profile", ""),
-        payload.get("job_analysis", ""),
-    )
+    async with observe_stage("write_resume"):
+        if payload.get("revision") and payload.get("resume"):
+            resume, content = await revise_resume_async(
+                payload["resume"],
+                payload.pop("revision"),
+                payload.get("job_analysis", ""),
+                payload.get("resume_content"),
+            )
+        else:
+            resume, content = await write_resume_document_async(
+                payload.get("user_profile", ""),
+                payload.get("job_analysis", ""),
+            )
+    payload["resume"] = resume
+    payload["resume_content"] = content
+    _checkpoint("write_resume", payload)
     await ctx.send_message(payload)
 
 
@@ -78,17 +189,17 @@ async def write_resume_node(message: dict, ctx: WorkflowContext[dict]) -> None:
 async def review_resume_node(message: dict, ctx: WorkflowContext[dict]) -> None:
     """Populate payload with resume review feedback."""
     payload = _ensure_payload(message)
-    payload["feedback"] = review_resume(
-        payload.get("resume", ""),
-        payload.get("job_analysis", ""),
-    )
+    async with observe_stage("review_resume"):
+        payload["feedback"] = await review_resume_async(
+            payload.get("resume", ""),
+            payload.get("job_analysis", ""),
+        )
+    _checkpoint("review_resume", payload)
     await ctx.send_message(payload)
 
 
-@executor(id="emit_output")
-async def emit_output_node(message: dict, ctx: WorkflowContext[None, str]) -> None:
-    """Render final text output sections based on selected mode."""
-    payload = _ensure_payload(message)
+def render_output(payload: dict) -> str:
+    """Render final text output sections based on the payload's mode."""
     mode = payload.get("mode", "FULL_PIPELINE")
     sections: list[str] = []
 
@@ -106,7 +217,19 @@ async def emit_output_node(message: dict, ctx: WorkflowContext[None, str]) -> No
     else:
         sections.append(f"## Job Analysis\n{payload.get('job_analysis','')}")
 
-    await ctx.yield_output("\n\n".join(sections))
+    return "\n\n".join(sections)
+
+
+@executor(id="emit_output")
+async def emit_output_node(message: dict, ctx: WorkflowContext[None, str]) -> None:
+    """Render final text output sections based on selected mode."""
+    payload = _ensure_payload(message)
+    async with observe_stage("emit_output"):
+        output = render_output(payload)
+        if payload.get("session_id"):
+            get_session_store().save(payload["session_id"], payload)
+    _checkpoint("emit_output", {**payload, "output": output})
+    await ctx.yield_output(output)
 
 
 def build_graph_workflow():
@@ -114,17 +237,31 @@ def build_graph_workflow():
     router = route_request
     collector = collect_info_node
     analyzer = analyze_job_node
+    parallel_analyzer = analyze_job_parallel_node
+    join = join_profile_and_job_node
     writer = write_resume_node
     reviewer = review_resume_node
     output = emit_output_node
 
     builder = WorkflowBuilder(start_executor=router)
 
-    builder.add_edge(router, collector, condition=_mode_is("FULL_PIPELINE"))
-    builder.add_edge(router, analyzer, condition=_mode_is("WRITE_ONLY", "REVIEW_ONLY", "ANALYZE_ONLY"))
+    # FULL_PIPELINE: profile extraction and JD analysis are independent, so
+    # both run at once and are merged before writing.
+    builder.add_edge(router, collector, condition=_routed("FULL_PIPELINE"))
+    builder.add_edge(router, parallel_analyzer, condition=_routed("FULL_PIPELINE"))
+    builder.add_fan_in_edges([collector, parallel_analyzer], join)
+    builder.add_edge(join, writer)
 
-    builder.add_edge(collector, analyzer)
-    builder.add_edge(analyzer, writer, condition=_mode_is("FULL_PIPELINE", "WRITE_ONLY"))
+    # Session follow-ups carry the stored state and start at the first executor they need.
+    builder.add_edge(
+        router,
+        analyzer,
+        condition=_either(_routed("WRITE_ONLY", "REVIEW_ONLY", "ANALYZE_ONLY"), _resumes_at("analyze_job")),
+    )
+    builder.add_edge(router, writer, condition=_resumes_at("write_resume"))
+    builder.add_edge(router, reviewer, condition=_resumes_at("review_resume"))
+    builder.add_edge(router, output, condition=_resumes_at("emit_output"))
+    builder.add_edge(analyzer, writer, condition=_mode_is("WRITE_ONLY"))
     builder.add_edge(analyzer, reviewer, condition=_mode_is("REVIEW_ONLY"))
     builder.add_edge(analyzer, output, condition=_mode_is("ANALYZE_ONLY"))
 
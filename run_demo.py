@@ -4,7 +4,16 @@ import json
 import os
 from pathlib import Path
 
-from resume_assistant.agents import collect_info, analyze_job, write_resume, review_resume
+from resume_assistant.agents import (
+    WRITER_MODE,
+    analyze_job,
+    collect_info,
+    render_written_resume,
+    review_resume,
+    write_resume,
+    write_resume_content,
+)
+from resume_assistant.models import JobAnalysis, UserProfile
 
 
 def print_section_header(title: str):
@@ -117,9 +126,12 @@ def run_demo():
     print(_summarize_job_analysis(job_analysis))
 
     print_section_header("AGENT 3: RESUME WRITER")
-    resume = write_resume(user_profile, job_analysis, stream=False)
+    if WRITER_MODE == "latex":
+        written = write_resume(user_profile, job_analysis, stream=False)
+    else:
+        written = write_resume_content(user_profile, job_analysis)
+    resume = _save_resume_artifact(written)
     print(resume)
-    _save_resume_artifact(resume)
 
     print_section_header("AGENT 4: RESUME FEEDBACK")
     feedback = review_resume(resume, job_analysis, stream=False)
@@ -129,12 +141,9 @@ def run_demo():
     print("Done.\n")
 
 
-def _clean_profile(profile_json: str) -> str:
+def _clean_profile(profile: UserProfile) -> str:
     """Normalize extracted profile JSON for cleaner display/output."""
-    try:
-        data = json.loads(profile_json)
-    except json.JSONDecodeError:
-        return profile_json
+    data = profile.to_dict()
 
     for key in ["education", "experience", "projects"]:
         data[key] = _merge_bullets(data.get(key, []))
@@ -175,15 +184,10 @@ def _merge_skills(items: list) -> list:
     return cleaned
 
 
-def _summarize_job_analysis(job_analysis: str) -> str:
-    """Build a short, human-readable summary from job analysis JSON."""
-    try:
-        data = json.loads(job_analysis)
-    except json.JSONDecodeError:
-        return job_analysis
-    role = data.get("role") or "Unknown"
-    skills = data.get("required_skills") or []
-    top_skills = ", ".join(skills[:5])
+def _summarize_job_analysis(job_analysis: JobAnalysis) -> str:
+    """Build a short, human-readable summary from the job analysis."""
+    role = job_analysis.role or "Unknown"
+    top_skills = ", ".join(job_analysis.required_skills[:5])
     return f"role: {role}\nrequired_skills: {top_skills}"
 
 
@@ -199,12 +203,17 @@ def _summarize_feedback(feedback: str) -> str:
     return "\n".join(out)
 
 
-def _save_resume_artifact(resume_tex: str) -> None:
-    """Write generated LaTeX resume to the local result directory."""
+def _save_resume_artifact(resume) -> str:
+    """Render writer output with the resume template and save it (plus content JSON) locally."""
     out_dir = Path(__file__).resolve().parent / "resume_result"
     out_dir.mkdir(parents=True, exist_ok=True)
+    if isinstance(resume, dict):
+        content_path = out_dir / "resume.json"
+        content_path.write_text(json.dumps(resume, indent=2, ensure_ascii=False), encoding="utf-8")
+    resume_tex = render_written_resume(resume, os.getenv("RESUME_TEMPLATE") or None)
     out_path = out_dir / "resume.tex"
     out_path.write_text(resume_tex, encoding="utf-8")
+    return resume_tex
 
 
 if __name__ == "__main__":
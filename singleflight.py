@@ -0,0 +1,119 @@
+"""Coalesce identical in-flight requests into one shared execution.
+
+Unlike the response cache, nothing is kept once a call finishes: callers
+that arrive while an identical call is still running simply await the same
+task and receive its result (or its exception).
+
+The shared task runs in an empty :mod:`contextvars` context, so it inherits
+no caller's trace span, event sink, or lane. Whatever it publishes is fanned
+out to the listener of every caller waiting at that moment.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+Listener = Callable[[Any], None]
+
+
+def canonical_key(namespace: str, args: dict[str, Any]) -> str:
+    """Return a stable key for ``args`` regardless of key order or spacing."""
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{namespace}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class _Flight:
+    """One shared execution, the number of callers awaiting it, and their listeners."""
+
+    __slots__ = ("task", "waiters", "listeners")
+
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: list[Listener] = []
+
+    def publish(self, value: Any) -> None:
+        """Send ``value`` to every caller currently waiting."""
+        for listener in list(self.listeners):
+            listener(value)
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share it.
+
+    The shared call runs in its own task, so one caller disconnecting does
+    not cancel it for the others. It is cancelled only when every caller
+    waiting on it has gone away.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self.stats = {"requests": 0, "executions": 0, "coalesced": 0, "errors": 0, "cancelled": 0}
+        self.by_namespace: dict[str, dict[str, int]] = {}
+
+    def _count(self, key: str, field: str) -> None:
+        """Bump a global and a per-namespace counter."""
+        self.stats[field] += 1
+        namespace = key.split(":", 1)[0]
+        counters = self.by_namespace.setdefault(namespace, {"requests": 0, "executions": 0, "coalesced": 0})
+        if field in counters:
+            counters[field] += 1
+
+    async def do(
+        self, key: str, call: Callable[[Listener], Awaitable[T]], listener: Optional[Listener] = None
+    ) -> T:
+        """Return ``call(publish)``'s result, sharing it with identical in-flight calls.
+
+        ``publish`` forwards a value to the ``listener`` of each caller
+        waiting on the shared call when it is published.
+        """
+        self._count(key, "requests")
+        flight = self._flights.get(key)
+        if flight is None:
+            self._count(key, "executions")
+            flight = _Flight()
+            flight.task = contextvars.Context().run(lambda: asyncio.ensure_future(call(flight.publish)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._finish(key, flight))
+        else:
+            self._count(key, "coalesced")
+        flight.waiters += 1
+        if listener is not None:
+            flight.listeners.append(listener)
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                self.stats["cancelled"] += 1
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if listener is not None:
+                flight.listeners.remove(listener)
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        """Forget a finished flight so later calls execute afresh."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def in_flight(self) -> int:
+        """Return the number of executions currently running."""
+        return len(self._flights)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot of the coalescing counters."""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "in_flight": self.in_flight(),
+            "coalesced_ratio": (self.stats["coalesced"] / requests) if requests else 0.0,
+            "by_route": {name: dict(counters) for name, counters in self.by_namespace.items()},
+        }